@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'energy_site.settings')
+# async Varianten der Export-, Berichts- und Berechnungs-Views (settings.ASYNC_VIEWS)
+os.environ.setdefault('ENERGYAPP_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
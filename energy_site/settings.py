@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'energyapp.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -114,3 +116,65 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Klimadaten (Testreferenzjahre, siehe energyapp/logic/climate.py)
+CLIMATE_DATA_DIR = BASE_DIR / "climate"
+CLIMATE_CACHE_DIR = BASE_DIR / "climate" / "cache"
+CLIMATE_DEFAULT_SITE = "Würzburg"
+
+# Ergebnisdateien der Hintergrund-Jobs (energyapp/logic/jobs.py, python manage.py run_jobs)
+EXPORT_ROOT = BASE_DIR / "exports"
+# Laufende Jobs ohne Lebenszeichen seit JOB_STALE_AFTER Sekunden gelten als verwaist
+# (Worker abgestürzt/beendet): sie werden neu eingestellt, nach JOB_MAX_ATTEMPTS Versuchen
+# (Import/Löschen sofort) als fehlgeschlagen markiert
+JOB_STALE_AFTER = 3600
+JOB_MAX_ATTEMPTS = 2
+# Ein Thread je laufendem Job erneuert das Lebenszeichen in diesem Abstand (Sekunden)
+JOB_HEARTBEAT_INTERVAL = 60
+
+# Datei-Cache der Energieberichte je Gebäude (energyapp/logic/report_cache.py), LRU bis MAX_BYTES
+REPORT_CACHE_DIR = EXPORT_ROOT / "reports"
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Berechnungs-API (energyapp/views/batch_calculation.py): max. Größe einer JSON-Anfrage;
+# größere Batches als NDJSON senden (wird zeilenweise gelesen)
+CALC_API_MAX_BYTES = 32 * 1024 * 1024
+
+# Async Views für Exporte, Berichte und Berechnungs-API (energyapp/views/async_views.py).
+# energy_site/asgi.py schaltet sie ein; unter WSGI bleiben die synchronen Views, da
+# Django async Streams dort vor dem Senden komplett puffern würde.
+ASYNC_VIEWS = os.environ.get("ENERGYAPP_ASYNC_VIEWS") == "1"
+
+# Threads für CPU-lastige Arbeit der async Views (energyapp/logic/executor.py); None = Anzahl CPUs
+CPU_EXECUTOR_WORKERS = None
+
+# Historie von python manage.py benchmark (energyapp/logic/benchmark.py)
+BENCHMARK_HISTORY = BASE_DIR / "benchmarks" / "history.json"
+
+# Metriken (energyapp/logic/metrics.py, /metrics im Prometheus-Textformat): jeder Prozess
+# schreibt seine Werte nach METRICS_DIR (lokal je Rechner), /metrics summiert alle Dateien
+# und fasst die beendeter Prozesse zusammen. /metrics verlangt "Authorization: Bearer
+# <METRICS_TOKEN>" (in Prometheus: authorization.credentials); ohne Token ist es abgeschaltet.
+METRICS_DIR = BASE_DIR / "metrics"
+METRICS_TOKEN = os.environ.get("ENERGYAPP_METRICS_TOKEN") or None
+
+# Tests schreiben Metriken in ein temporäres Verzeichnis statt nach METRICS_DIR
+TEST_RUNNER = "energyapp.test_runner.TestRunner"
+
+# Caches: "sheet01" hält die Ergebnisse von Blatt 01 (energyapp/logic/sheet01_cache.py).
+# Schlüssel ist ein Hash der Eingaben, ein Treffer ist also immer aktuell – auch mit einem
+# Cache je Prozess. LocMemCache verdrängt bei MAX_ENTRIES die am längsten nicht benutzten
+# Einträge (LRU); für einen gemeinsamen Cache aller Worker z.B. RedisCache verwenden.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "sheet01": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sheet01",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+SHEET01_CACHE_ALIAS = "sheet01"
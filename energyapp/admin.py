@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Building, GwpManufacturing, GwpCompensation
+from .models import BackgroundJob, Building, GwpManufacturing, GwpCompensation
 
 
 # ---------- Inline: GWP Herstellung direkt im Building ----------
@@ -52,7 +52,7 @@ class BuildingAdmin(admin.ModelAdmin):
 
     # Gruppierung wie im Formular
     fieldsets = (
-        ("Allgemein", {"fields": ("name",)}),
+        ("Allgemein", {"fields": ("name", "standort")}),
         (
             "Geometrie",
             {
@@ -192,3 +192,11 @@ class GwpManufacturingAdmin(admin.ModelAdmin):
 class GwpCompensationAdmin(admin.ModelAdmin):
     list_display = ("building",)
     list_select_related = ("building",)
+
+
+# ---------- Hintergrund-Jobs ----------
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress_done", "progress_total", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("started_at", "finished_at", "worker", "error")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EnergyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'energyapp'
+
+    def ready(self):
+        from energyapp import signals  # noqa: F401  (registriert die Signal-Handler)
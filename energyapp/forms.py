@@ -28,6 +28,7 @@ class BuildingForm(forms.ModelForm):
         model = Building
         fields = [
             "name",
+            "standort",
             "length_ns",
             "width_ow",
             "storeys",
@@ -166,3 +167,13 @@ class EnergyResultSheet01Form(forms.ModelForm):
             "E42_solar_generation_factor",
 
         ]
+
+
+class BuildingImportForm(forms.Form):
+    file = forms.FileField(label="CSV- oder XLSX-Datei")
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".xlsx", ".xlsm")):
+            raise forms.ValidationError("Nur .csv oder .xlsx")
+        return upload
@@ -0,0 +1,166 @@
+"""
+Zustandslose Batch-Berechnung (JSON-API, views/batch_calculation.py).
+
+Eingabe sind Datensätze im Feldschema des Building-Modells (wie beim
+Import: Feldnamen, Prüfung per Field.clean). Berechnet werden je Block von
+Datensätzen Heizwärmebilanz (calc_heating_demand_batch), Monatsbilanz
+(calculate_monthly_batch, gruppiert nach Standort) und Blatt 01
+(calculate_sheet01_batch) – ohne Datenbankzugriff.
+
+Blatt 01 erhält nur, was im Gebäude selbst steckt (Q_h, PV, NGF); Lüftung
+und GWP sind 0, E42 hat den Standardwert von EnergyResultSheet01.
+Alle Ergebnisse sind ungerundet; nicht endliche Werte werden zu None.
+"""
+import json
+import math
+from itertools import islice
+
+import numpy as np
+
+from energyapp.logic.building import RESULT_FIELDS, buildings_to_arrays, calc_heating_demand_batch
+from energyapp.logic.building_import import IMPORT_FIELDS, clean_row
+from energyapp.logic.climate import get_climate_store
+from energyapp.logic.load_profiles import MONTHLY_INPUT_FIELDS, calculate_monthly_batch
+from energyapp.logic.result_sheet_01 import calculate_sheet01_batch
+from energyapp.models import EnergyResultSheet01
+
+CHUNK_SIZE = 2000
+
+# Eingabefelder der Berechnung (Name ist keine Eingabe und daher optional)
+CALC_FIELDS = tuple(name for name in IMPORT_FIELDS if name != "name")
+
+# werden unverändert in das Ergebnis übernommen (Zuordnung beim Aufrufer)
+PASSTHROUGH_FIELDS = ("id", "name")
+
+
+class InvalidRecord:
+    """Platzhalter für eine nicht lesbare Eingabezeile (NDJSON), wird als Fehler gemeldet."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def read_ndjson(lines):
+    """Datensätze aus NDJSON-Zeilen (bytes); Leerzeilen werden übersprungen."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield InvalidRecord(f"Ungültiges JSON: {exc}")
+
+
+def clean_record(record):
+    """Einen Datensatz prüfen -> (Feld-Dict, Fehlerliste [(Feld, Meldung), ...])."""
+    if isinstance(record, InvalidRecord):
+        return None, [(None, record.message)]
+    if not isinstance(record, dict):
+        return None, [(None, "Datensatz muss ein JSON-Objekt sein.")]
+    unknown = [key for key in record if key not in CALC_FIELDS and key not in PASSTHROUGH_FIELDS]
+    columns = [key for key in record if key in CALC_FIELDS]
+    data, errors = clean_row([record[key] for key in columns], columns, CALC_FIELDS)
+    errors += [(key, "Unbekanntes Feld.") for key in unknown]
+    return data, errors
+
+
+def _column(values):
+    """Array -> Liste von floats (NaN/inf -> None, damit gültiges JSON entsteht)."""
+    values = np.asarray(values)
+    if np.isfinite(values).all():
+        return values.tolist()
+    return [value if math.isfinite(value) else None for value in values.tolist()]
+
+
+def _monthly(rows):
+    """Monatsbilanz je Standort-Gruppe; Rückgabe in der Reihenfolge von rows."""
+    store = get_climate_store()
+    by_site = {}
+    for i, data in enumerate(rows):
+        by_site.setdefault(data["standort"], []).append(i)
+
+    results = [None] * len(rows)
+    for site, positions in by_site.items():
+        inputs = {
+            field: [rows[i][field] for i in positions] for field in MONTHLY_INPUT_FIELDS
+        }
+        monthly = calculate_monthly_batch(inputs, store.get(site))
+        months = monthly["monthly_q_h"].tolist()
+        annual = _column(monthly["annual_heating_demand"])
+        specific = _column(monthly["specific_demand"])
+        for j, i in enumerate(positions):
+            results[i] = {
+                "q_h": months[j],
+                "annual_heating_demand": annual[j],
+                "specific_demand": specific[j],
+            }
+    return results
+
+
+def calculate_chunk(rows):
+    """Ergebnisse für geprüfte Datensätze (Liste von Feld-Dicts), je Zeile ein Dict."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        heating = calc_heating_demand_batch(buildings_to_arrays(rows))
+        monthly = _monthly(rows)
+        sheet = calculate_sheet01_batch({
+            "heating_kwh_a": heating["Q_h"],
+            "pv_total_kwh_a": heating["Q_PV_total"],
+            "ngf_m2": heating["ngf_t"],
+            "E42_solar_generation_factor": EnergyResultSheet01._meta.get_field(
+                "E42_solar_generation_factor"
+            ).get_default(),
+        })
+
+    heating = {key: _column(heating[key]) for key in RESULT_FIELDS}
+    sheet = {key: _column(values) for key, values in sheet.items()}
+    return [
+        {
+            "heating": {key: values[i] for key, values in heating.items()},
+            "monthly": monthly[i],
+            "sheet01": {key: values[i] for key, values in sheet.items()},
+        }
+        for i in range(len(rows))
+    ]
+
+
+def calculate_batch(records, start=0):
+    """
+    Ergebnisse für einen Block von Datensätzen (Liste), je Datensatz in Eingabereihenfolge
+      {"index", ["id", "name",] "heating", "monthly", "sheet01"} oder
+      {"index", ["id", "name",] "errors": [{"field", "message"}, ...]}.
+    Die Indizes beginnen bei `start`.
+    """
+    results, valid = [], []
+    for index, record in enumerate(records, start=start):
+        result = {"index": index}
+        if isinstance(record, dict):
+            result.update({key: record[key] for key in PASSTHROUGH_FIELDS if key in record})
+        data, errors = clean_record(record)
+        if errors:
+            result["errors"] = [{"field": field, "message": message} for field, message in errors]
+        else:
+            valid.append((result, data))
+        results.append(result)
+
+    if valid:
+        for (result, _), values in zip(valid, calculate_chunk([data for _, data in valid])):
+            result.update(values)
+    return results
+
+
+def iter_chunks(records, chunk_size=CHUNK_SIZE):
+    """(start, Block) für beliebig viele Datensätze (records darf ein Generator sein)."""
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def calculate_records(records, chunk_size=CHUNK_SIZE):
+    """Berechnet beliebig viele Datensätze blockweise (Ergebnisse wie calculate_batch)."""
+    for start, chunk in iter_chunks(records, chunk_size):
+        yield from calculate_batch(chunk, start)
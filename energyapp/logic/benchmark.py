@@ -0,0 +1,396 @@
+"""
+Benchmarks der Rechenkerne und Exporte mit synthetischen Portfolios
+(python manage.py benchmark).
+
+Je Fall und Portfoliogröße werden Durchsatz (Gebäude/s, bester von mehreren
+Läufen) und Speicher-Peak (tracemalloc, eigener Lauf, da tracemalloc die
+Laufzeit verfälscht) gemessen. Gemessen wird nur die eigentliche Arbeit –
+das Erzeugen der Gebäude und das Befüllen der Datenbank liegen außerhalb.
+
+Die Ergebnisse werden an eine JSON-Historie angehängt; check_regressions
+vergleicht einen Lauf mit dem Median der letzten Läufe auf demselben Rechner.
+"""
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from django.test import RequestFactory
+
+from energyapp.logic.building import (
+    RESULT_FIELDS,
+    calc_heating_demand,
+    calc_heating_demand_batch,
+)
+from energyapp.logic.climate import get_climate_store
+from energyapp.logic.exports import filter_buildings
+from energyapp.logic.load_profiles import (
+    MONTHLY_INPUT_FIELDS,
+    EnergyCalculator,
+    calculate_monthly_batch,
+)
+from energyapp.logic.reports import write_buildings_pdf
+from energyapp.logic.result_sheet_01 import calculate_sheet01, calculate_sheet01_batch
+from energyapp.logic.summer import calc_summer_overheating
+from energyapp.models import Building, EnergyResultSheet01, SummerProtection
+from energyapp.views import building_view
+from energyapp.views.building_view import PDF_SYNC_LIMIT
+
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+CHUNK_SIZE = 10_000
+
+# Zeitmessung: bester von mindestens MIN_REPEAT Läufen und MIN_SECONDS Gesamtzeit;
+# nach MAX_SECONDS (große Portfolios) oder MAX_REPEAT Läufen ist Schluss
+MIN_REPEAT = 3
+MIN_SECONDS = 0.5
+MAX_REPEAT = 50
+MAX_SECONDS = 30.0
+
+# Regressionsschwellen: Durchsatz-Verlust bzw. Speicher-Zuwachs gegenüber der Basis
+MAX_SLOWDOWN = 0.25
+MAX_MEMORY_GROWTH = 0.25
+# Speicher-Unterschiede darunter sind Rauschen (v.a. bei sehr kleinen Portfolios)
+MEMORY_SLACK_BYTES = 256 * 1024
+BASELINE_RUNS = 5
+
+# Wertebereiche der synthetischen Gebäude (wie make_building in tests.py)
+FLOAT_RANGES = {
+    "length_ns": (5, 80),
+    "width_ow": (5, 40),
+    "room_height": (2.5, 3.5),
+    "u_wall": (0.1, 1.5),
+    "u_roof": (0.1, 1.0),
+    "u_floor": (0.1, 1.0),
+    "u_window": (0.6, 3.0),
+    "window_share_n": (0, 80),
+    "window_share_e": (0, 80),
+    "window_share_s": (0, 80),
+    "window_share_w": (0, 80),
+    "g_n": (0.2, 0.8),
+    "g_e": (0.2, 0.8),
+    "g_s": (0.2, 0.8),
+    "g_w": (0.2, 0.8),
+    "air_change_rate": (0.1, 2.0),
+    "degree_days": (1500, 4500),
+    "pv_roof_share": (0, 100),
+    "pv_specific_yield": (100, 250),
+    "pv_self_consumption_share": (0, 100),
+}
+INTEGER_RANGES = {"storeys": (1, 8), "persons": (0, 500)}
+CONSTANT_VALUES = {"person_density": 20.0, "setpoint_temp": 20.0}
+
+
+# --- Synthetische Portfolios -------------------------------------------------
+
+def synthetic_columns(n, seed=0):
+    """Eingaben für n Gebäude als Spalten-Arrays, inkl. Ergebnisse der Heizwärmebilanz."""
+    rng = np.random.default_rng(seed)
+    columns = {field: rng.uniform(low, high, n) for field, (low, high) in FLOAT_RANGES.items()}
+    columns.update(
+        (field, rng.integers(low, high, n, endpoint=True))
+        for field, (low, high) in INTEGER_RANGES.items()
+    )
+    columns.update((field, np.full(n, value)) for field, value in CONSTANT_VALUES.items())
+
+    result = calc_heating_demand_batch(columns)
+    columns.update((field, result[key]) for key, field in RESULT_FIELDS.items())
+    return columns
+
+
+def synthetic_chunks(n, seed=0, chunk_size=CHUNK_SIZE):
+    """(start, Spalten) in Blöcken – deterministisch je seed, unabhängig von der Gesamtgröße."""
+    for start in range(0, n, chunk_size):
+        yield start, synthetic_columns(min(chunk_size, n - start), seed=(seed, start))
+
+
+def synthetic_buildings(start, columns):
+    """Ungespeicherte Buildings aus einem Block von Spalten."""
+    fields = list(columns)
+    values = [columns[field].tolist() for field in fields]
+    return [
+        Building(name=f"Benchmark {start + i}", **dict(zip(fields, row)))
+        for i, row in enumerate(zip(*values))
+    ]
+
+
+def synthetic_summer(buildings, seed=0):
+    """Je Gebäude ein ungespeicherter Sommerschutz-Nachweis."""
+    rng = np.random.default_rng(seed)
+
+    def pick(choices):
+        return rng.choice([key for key, _ in choices], len(buildings)).tolist()
+
+    return [
+        SummerProtection(
+            building=building,
+            orientation=orientation,
+            ngf_m2=building.ngf_t,
+            window_area_m2=building.result_window_area / 4,
+            glazing_category=glazing,
+            shading_type=shading,
+            climate_region=region,
+        )
+        for building, orientation, glazing, shading, region in zip(
+            buildings,
+            pick(SummerProtection.ORIENTATION_CHOICES),
+            pick(SummerProtection.GLAZING_CATEGORY_CHOICES),
+            pick(SummerProtection.SHADING_TYPE_CHOICES),
+            pick(SummerProtection.CLIMATE_REGION_CHOICES),
+        )
+    ]
+
+
+def load_portfolio(n, seed=0, progress=None):
+    """Ersetzt alle Gebäude der (Benchmark-)Datenbank durch n synthetische."""
+    clear_portfolio()
+    for start, columns in synthetic_chunks(n, seed):
+        Building.objects.bulk_create(synthetic_buildings(start, columns))
+        if progress:
+            progress(start + len(columns["length_ns"]))
+
+
+def clear_portfolio():
+    Building.objects.all()._raw_delete(Building.objects.db)
+
+
+# --- Messung ------------------------------------------------------------------
+
+class Meter:
+    """
+    Misst nur die mit `with meter:` umschlossenen Abschnitte: Zeit und –
+    wenn tracemalloc läuft – den höchsten Speicherzuwachs eines Abschnitts.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._start
+        if tracemalloc.is_tracing():
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1] - self._base)
+
+
+# --- Fälle: func(n, meter, seed) ------------------------------------------------
+
+def _scalar(kernel, prepare=None):
+    """Fall für eine skalare Funktion: je Block Gebäude erzeugen, nur die Aufrufe messen."""
+    def run(n, meter, seed):
+        for start, columns in synthetic_chunks(n, seed):
+            items = synthetic_buildings(start, columns)
+            if prepare:
+                items = prepare(items, seed)
+            with meter:
+                for item in items:
+                    kernel(item)
+    return run
+
+
+def _batch(kernel):
+    """Fall für einen Batch-Kernel: je Block die Spalten-Arrays übergeben."""
+    def run(n, meter, seed):
+        for _, columns in synthetic_chunks(n, seed):
+            with meter:
+                kernel(columns)
+    return run
+
+
+def _energy_calculator(building):
+    return EnergyCalculator(building).calculate()
+
+
+_SHEET = EnergyResultSheet01()
+
+
+def _sheet01(building):
+    return calculate_sheet01(building, _SHEET)
+
+
+def _monthly_batch(columns):
+    return calculate_monthly_batch(
+        {field: columns[field] for field in MONTHLY_INPUT_FIELDS}, get_climate_store().get()
+    )
+
+
+def _sheet01_batch(columns):
+    return calculate_sheet01_batch({
+        "heating_kwh_a": columns["result_Q_h"],
+        "pv_total_kwh_a": columns["result_Q_PV_total"],
+        "ngf_m2": columns["ngf_t"],
+        "E42_solar_generation_factor": _SHEET.E42_solar_generation_factor,
+    })
+
+
+def _export_view(view_name, **params):
+    """Fall für einen Export-View (Portfolio liegt bereits in der Datenbank)."""
+    def run(n, meter, seed):
+        request = RequestFactory().get("/", params)
+        with meter:
+            response = getattr(building_view, view_name)(request)
+            for _ in response:
+                pass
+            response.close()
+    return run
+
+
+def _export_pdf(n, meter, seed):
+    """PDF-Export: bis PDF_SYNC_LIMIT der View, darüber der Hintergrund-Job (write_buildings_pdf)."""
+    if n <= PDF_SYNC_LIMIT:
+        return _export_view("building_export_pdf")(n, meter, seed)
+    with tempfile.TemporaryFile() as output, meter:
+        write_buildings_pdf(filter_buildings({}), output)
+
+
+CASES = {
+    "calc_heating_demand": _scalar(calc_heating_demand),
+    "calc_heating_demand_batch": _batch(calc_heating_demand_batch),
+    "energy_calculator": _scalar(_energy_calculator),
+    "calculate_monthly_batch": _batch(_monthly_batch),
+    "calculate_sheet01": _scalar(_sheet01),
+    "calculate_sheet01_batch": _batch(_sheet01_batch),
+    "calc_summer_overheating": _scalar(calc_summer_overheating, prepare=synthetic_summer),
+    "export_csv": _export_view("building_export_csv"),
+    "export_xlsx": _export_view("building_export_xlsx", sheets="all"),
+    "export_pdf": _export_pdf,
+}
+
+# Fälle, die das Portfolio in der Datenbank brauchen
+DB_CASES = ("export_csv", "export_xlsx", "export_pdf")
+
+
+def measure(case, n, seed=0, memory=True):
+    """Ein Fall bei Portfoliogröße n -> Ergebnis-Dict für die Historie."""
+    run = CASES[case]
+    best, total, repeat = None, 0.0, 0
+    while repeat == 0 or (
+        repeat < MAX_REPEAT and total < MAX_SECONDS
+        and (repeat < MIN_REPEAT or total < MIN_SECONDS)
+    ):
+        meter = Meter()
+        run(n, meter, seed)
+        best = meter.seconds if best is None else min(best, meter.seconds)
+        total += meter.seconds
+        repeat += 1
+
+    result = {
+        "case": case,
+        "n": n,
+        "seconds": best,
+        "per_second": n / best if best else None,
+        "repeat": repeat,
+    }
+    if memory:
+        meter = Meter()
+        tracemalloc.start()
+        try:
+            run(n, meter, seed)
+        finally:
+            tracemalloc.stop()
+        result["peak_bytes"] = meter.peak_bytes
+    return result
+
+
+def run_benchmarks(cases, sizes, seed=0, memory=True, progress=None):
+    """
+    Misst alle Fälle für alle Größen. Für DB_CASES wird das Portfolio je
+    Größe einmal geladen (die Datenbank muss eine Wegwerf-Datenbank sein).
+    `progress(result)` nach jeder Messung.
+    """
+    needs_db = any(case in DB_CASES for case in cases)
+    results = []
+    for n in sizes:
+        if needs_db:
+            load_portfolio(n, seed)
+        for case in cases:
+            result = measure(case, n, seed, memory)
+            results.append(result)
+            if progress:
+                progress(result)
+    if needs_db:
+        clear_portfolio()
+    return results
+
+
+# --- Historie und Regressionen -------------------------------------------------
+
+def run_info():
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def load_history(path):
+    path = Path(path)
+    if not path.exists():
+        return {"runs": []}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    tmp.replace(path)
+
+
+def baseline(history, host, case, n, runs=BASELINE_RUNS):
+    """Median von Durchsatz und Speicher-Peak der letzten Läufe (None ohne Vorläufe)."""
+    previous = [
+        result
+        for run in history["runs"] if run["host"] == host
+        for result in run["results"] if result["case"] == case and result["n"] == n
+    ][-runs:]
+    if not previous:
+        return None
+    per_second = [r["per_second"] for r in previous if r.get("per_second")]
+    peak = [r["peak_bytes"] for r in previous if r.get("peak_bytes") is not None]
+    return {
+        "per_second": statistics.median(per_second) if per_second else None,
+        "peak_bytes": statistics.median(peak) if peak else None,
+    }
+
+
+def check_regressions(history, run, max_slowdown=MAX_SLOWDOWN, max_memory_growth=MAX_MEMORY_GROWTH):
+    """Meldungen für alle Ergebnisse von `run`, die die Schwellen gegenüber der Basis reißen."""
+    messages = []
+    for result in run["results"]:
+        base = baseline(history, run["host"], result["case"], result["n"])
+        if base is None:
+            continue
+        label = f"{result['case']} (n={result['n']})"
+
+        per_second = result.get("per_second")
+        if base["per_second"] and per_second and per_second < base["per_second"] * (1 - max_slowdown):
+            messages.append(
+                f"{label}: {per_second:,.0f}/s statt {base['per_second']:,.0f}/s "
+                f"({per_second / base['per_second'] - 1:+.0%})"
+            )
+
+        peak = result.get("peak_bytes")
+        if (
+            base["peak_bytes"] is not None and peak is not None
+            and peak > base["peak_bytes"] * (1 + max_memory_growth) + MEMORY_SLACK_BYTES
+        ):
+            messages.append(
+                f"{label}: Speicher-Peak {peak / 2**20:.1f} MiB statt "
+                f"{base['peak_bytes'] / 2**20:.1f} MiB"
+            )
+    return messages
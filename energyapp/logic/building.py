@@ -1,6 +1,13 @@
+import hashlib
+
+import numpy as np
+from django.db.models import Q
+
+from energyapp.logic.metrics import timed
 from energyapp.models import Building
 
 
+@timed("calc_heating_demand")
 def calc_heating_demand(building: Building) -> dict:
     # Grundgrößen
     length = building.length_ns      # m
@@ -141,3 +148,239 @@ def calc_heating_demand(building: Building) -> dict:
         "ngf_t": ngf_t,
 
     }
+
+
+# Eingabefelder des Building-Modells, die in die Heizwärmebilanz eingehen
+# (Reihenfolge = Spalten der Batch-Berechnung).
+HEATING_INPUT_FIELDS = (
+    "length_ns",
+    "width_ow",
+    "storeys",
+    "room_height",
+    "u_wall",
+    "u_roof",
+    "u_floor",
+    "u_window",
+    "window_share_n",
+    "window_share_e",
+    "window_share_s",
+    "window_share_w",
+    "g_n",
+    "g_e",
+    "g_s",
+    "g_w",
+    "persons",
+    "air_change_rate",
+    "degree_days",
+    "pv_roof_share",
+    "pv_specific_yield",
+    "pv_self_consumption_share",
+)
+
+# Ergebnis-Schlüssel von calc_heating_demand -> Modellfeld am Building
+RESULT_FIELDS = {
+    "Q_T": "result_Q_T",
+    "Q_V": "result_Q_V",
+    "Q_I": "result_Q_I",
+    "Q_S": "result_Q_S",
+    "Q_h": "result_Q_h",
+
+    "H_T": "result_H_T",
+    "H_V": "result_H_V",
+
+    "floor_area": "result_floor_area",
+    "roof_area": "result_roof_area",
+    "opaque_wall_area": "result_opaque_wall_area",
+    "window_area": "result_window_area",
+
+    "Q_S_n": "result_Q_S_n",
+    "Q_S_e": "result_Q_S_e",
+    "Q_S_s": "result_Q_S_s",
+    "Q_S_w": "result_Q_S_w",
+
+    "Q_PV_total": "result_Q_PV_total",
+    "Q_PV_on": "result_Q_PV_on",
+    "Q_PV_off": "result_Q_PV_off",
+
+    "ngf_t": "ngf_t",
+}
+
+
+# Formelstand von calc_heating_demand(_batch): bei jeder Formeländerung hochzählen,
+# dann liefert stale_buildings() alle Gebäude mit veralteten Ergebnissen.
+CALC_VERSION = 1
+
+# Felder, die den Berechnungsstand am Building festhalten
+CALC_STATE_FIELDS = ("calc_fingerprint", "calc_version")
+
+
+def fingerprint_values(values) -> str:
+    """Fingerprint einer Werte-Folge in der Reihenfolge von HEATING_INPUT_FIELDS."""
+    text = repr(tuple(float(v) for v in values))
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def calc_fingerprint(building) -> str:
+    """Fingerprint der Berechnungseingaben eines Buildings (oder dicts)."""
+    if isinstance(building, dict):
+        return fingerprint_values(building[field] for field in HEATING_INPUT_FIELDS)
+    return fingerprint_values(getattr(building, field) for field in HEATING_INPUT_FIELDS)
+
+
+def needs_recalculation(building: Building) -> bool:
+    """True, wenn Eingaben oder Formelstand nicht zu den gespeicherten Ergebnissen passen."""
+    return (
+        building.calc_version != CALC_VERSION
+        or building.calc_fingerprint != calc_fingerprint(building)
+    )
+
+
+def stale_buildings():
+    """Gebäude, deren Ergebnisse mit einem älteren Formelstand (oder nie) berechnet wurden."""
+    return Building.objects.filter(
+        Q(calc_version__lt=CALC_VERSION) | Q(calc_version__isnull=True)
+    )
+
+
+def apply_heating_result(building: Building, result: dict, fingerprint: str = None) -> Building:
+    """
+    Schreibt ein Ergebnis von calc_heating_demand in die result_*-Felder
+    und merkt sich Fingerprint + Formelstand (ohne save).
+    """
+    for key, field in RESULT_FIELDS.items():
+        setattr(building, field, result[key])
+    building.calc_fingerprint = fingerprint or calc_fingerprint(building)
+    building.calc_version = CALC_VERSION
+    return building
+
+
+def buildings_to_arrays(buildings) -> dict:
+    """
+    Baut aus einer Liste von Buildings (oder dicts mit den Feldnamen)
+    die Spalten-Arrays für calc_heating_demand_batch.
+    """
+    rows = list(buildings)
+    columns = {}
+    for field in HEATING_INPUT_FIELDS:
+        values = [
+            row[field] if isinstance(row, dict) else getattr(row, field)
+            for row in rows
+        ]
+        columns[field] = np.asarray(values, dtype=np.float64)
+    return columns
+
+
+@timed("calc_heating_demand_batch")
+def calc_heating_demand_batch(inputs: dict) -> dict:
+    """
+    Vektorisierte Variante von calc_heating_demand für N Gebäude.
+
+    `inputs` enthält je Feld aus HEATING_INPUT_FIELDS ein Array der Länge N
+    (Spalte je Eingabegröße). Rückgabe: dieselben Schlüssel wie
+    calc_heating_demand, jeweils als float64-Array der Länge N.
+    Die Rechenschritte sind 1:1 (inkl. Reihenfolge) aus der skalaren
+    Funktion übernommen, damit die Ergebnisse bitgenau übereinstimmen.
+    """
+    col = {
+        field: np.asarray(inputs[field], dtype=np.float64)
+        for field in HEATING_INPUT_FIELDS
+    }
+
+    # Grundgrößen
+    length = col["length_ns"]
+    width = col["width_ow"]
+    storeys = col["storeys"]
+    h_room = col["room_height"]
+
+    h_building = storeys * h_room
+    floor_area = length * width
+    bgf = floor_area * storeys
+    ngf_t = bgf * 0.8
+
+    roof_area = floor_area
+    floor_area_ceiling = floor_area
+
+    # Fassadenflächen
+    facade_n = length * h_building
+    facade_s = length * h_building
+    facade_e = width * h_building
+    facade_w = width * h_building
+
+    # Fensterflächen je Orientierung
+    win_n = facade_n * (col["window_share_n"] / 100.0)
+    win_s = facade_s * (col["window_share_s"] / 100.0)
+    win_e = facade_e * (col["window_share_e"] / 100.0)
+    win_w = facade_w * (col["window_share_w"] / 100.0)
+
+    window_area = win_n + win_e + win_s + win_w
+
+    # opake Wandflächen
+    opaque_wall_area = (
+        (facade_n - win_n)
+        + (facade_s - win_s)
+        + (facade_e - win_e)
+        + (facade_w - win_w)
+    )
+
+    # Transmission / Lüftung
+    H_T = (
+        col["u_wall"] * opaque_wall_area
+        + col["u_roof"] * roof_area
+        + col["u_floor"] * floor_area_ceiling
+        + col["u_window"] * window_area
+    )
+    V = floor_area * h_room * storeys
+    H_V = 0.34 * col["air_change_rate"] * V
+
+    HDD = col["degree_days"]
+    heating_hours = HDD * 24
+
+    Q_T = H_T * heating_hours / 1000.0
+    Q_V = H_V * heating_hours / 1000.0
+
+    # Innere Gewinne: 80 W/Person, 8 h pro Heiztag
+    occupancy_hours = HDD * 8.0 / 1.0
+    Q_I = col["persons"] * 80.0 * occupancy_hours / 1000.0
+
+    # Solare Gewinne (gleiche Orientierungswerte wie skalar)
+    Q_S_n = win_n * col["g_n"] * 150.0
+    Q_S_e = win_e * col["g_e"] * 300.0
+    Q_S_s = win_s * col["g_s"] * 500.0
+    Q_S_w = win_w * col["g_w"] * 300.0
+    Q_S = Q_S_n + Q_S_e + Q_S_s + Q_S_w
+
+    Q_h = Q_V + Q_T - Q_I - Q_S
+    Q_h = np.where(Q_h < 0, 0.0, Q_h)
+
+    # PV-Bilanz
+    pv_area = roof_area * (col["pv_roof_share"] / 100.0)
+    Q_PV_total = pv_area * col["pv_specific_yield"]
+    Q_PV_on = Q_PV_total * (col["pv_self_consumption_share"] / 100.0)
+    Q_PV_off = Q_PV_total - Q_PV_on
+
+    return {
+        "floor_area": floor_area,
+        "roof_area": roof_area,
+        "opaque_wall_area": opaque_wall_area,
+        "window_area": window_area,
+
+        "H_T": H_T,
+        "H_V": H_V,
+        "Q_T": Q_T,
+        "Q_V": Q_V,
+        "Q_I": Q_I,
+        "Q_S": Q_S,
+        "Q_h": Q_h,
+
+        "Q_S_n": Q_S_n,
+        "Q_S_e": Q_S_e,
+        "Q_S_s": Q_S_s,
+        "Q_S_w": Q_S_w,
+
+        "Q_PV_total": Q_PV_total,
+        "Q_PV_on": Q_PV_on,
+        "Q_PV_off": Q_PV_off,
+
+        "bgf": bgf,
+        "ngf_t": ngf_t,
+    }
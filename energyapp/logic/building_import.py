@@ -0,0 +1,235 @@
+"""
+Massen-Import von Gebäuden aus CSV oder XLSX.
+
+Die Zeilen werden gestreamt (CSV zeilenweise, XLSX mit openpyxl im
+read-only-Modus), jede Zeile gegen die Feld-Regeln des Building-Modells
+geprüft (Field.clean: Typ, Pflichtfeld, max_length, Validatoren). Gültige
+Zeilen werden blockweise mit calc_heating_demand_batch berechnet und per
+bulk_create gespeichert (eine Transaktion pro Block). Fehlerhafte Zeilen
+werden übersprungen und mit Zeilennummer, Feld und Meldung gesammelt.
+
+Spaltenköpfe dürfen Feldnamen (length_ns) oder Beschriftungen
+("Länge Nord/Süd [m]") sein; Dezimalkomma ist erlaubt.
+"""
+import csv
+import io
+import math
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from openpyxl import load_workbook
+
+from energyapp.logic.building import (
+    CALC_VERSION,
+    HEATING_INPUT_FIELDS,
+    RESULT_FIELDS,
+    buildings_to_arrays,
+    calc_heating_demand_batch,
+    fingerprint_values,
+)
+from energyapp.logic.statistics import apply_delta, building_contribution
+from energyapp.models import Building
+
+CHUNK_SIZE = 1000
+
+# höchstens so viele Fehler im Bericht (gezählt werden alle)
+MAX_ERRORS = 10000
+
+# importierbare Eingabefelder (ohne Ergebnisse, ngf_t und Berechnungsstand)
+IMPORT_FIELDS = tuple(
+    field.name
+    for field in Building._meta.concrete_fields
+    if field.editable
+    and not field.primary_key
+    and not field.name.startswith("result_")
+    and field.name != "ngf_t"
+)
+
+REQUIRED_FIELDS = tuple(
+    name for name in IMPORT_FIELDS if not Building._meta.get_field(name).has_default()
+)
+
+
+class BuildingImportError(ValueError):
+    pass
+
+
+def _column_aliases():
+    aliases = {}
+    for name in IMPORT_FIELDS:
+        field = Building._meta.get_field(name)
+        aliases[name.lower()] = name
+        aliases[str(field.verbose_name).strip().lower()] = name
+    return aliases
+
+
+def map_header(header):
+    """Spaltenköpfe -> Feldnamen (None für unbekannte Spalten)."""
+    aliases = _column_aliases()
+    columns = [aliases.get(str(title or "").strip().lower()) for title in header]
+
+    missing = [name for name in REQUIRED_FIELDS if name not in columns]
+    if missing:
+        raise BuildingImportError(f"Pflichtspalten fehlen: {', '.join(missing)}")
+    duplicates = {name for name in columns if name and columns.count(name) > 1}
+    if duplicates:
+        raise BuildingImportError(f"Spalten doppelt: {', '.join(sorted(duplicates))}")
+    return columns
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    first = text.readline()
+    # Excel-CSV aus dem deutschen Raum: Semikolon
+    delimiter = ";" if first.count(";") >= first.count(",") else ","
+    yield from csv.reader(chain([first], text), delimiter=delimiter)
+
+
+def _xlsx_rows(fileobj):
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        # eigener Export: Blatt "Gebäude", sonst das erste Blatt
+        ws = wb["Gebäude"] if "Gebäude" in wb.sheetnames else wb.worksheets[0]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_rows(fileobj, filename):
+    """Rohzeilen (Listen) einer CSV- oder XLSX-Datei, Kopfzeile zuerst."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return _csv_rows(fileobj)
+    if suffix in (".xlsx", ".xlsm"):
+        return _xlsx_rows(fileobj)
+    raise BuildingImportError(f"Dateityp nicht unterstützt: {suffix or filename} (.csv, .xlsx)")
+
+
+def count_rows(path):
+    """Anzahl Datenzeilen (für die Fortschrittsanzeige; bei XLSX laut Blattgröße)."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, "rb") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    wb = load_workbook(path, read_only=True)
+    try:
+        ws = wb["Gebäude"] if "Gebäude" in wb.sheetnames else wb.worksheets[0]
+        return max((ws.max_row or 1) - 1, 0)
+    finally:
+        wb.close()
+
+
+def clean_row(values, columns, fields=IMPORT_FIELDS):
+    """
+    Eine Zeile prüfen -> (Feld-Dict, Fehlerliste [(Feld, Meldung), ...]).
+    Fehlende `fields` werden mit ihrem Standardwert ergänzt oder als Fehler gemeldet.
+    """
+    data, errors = {}, []
+    for name, value in zip(columns, values):
+        if name is None:
+            continue
+        field = Building._meta.get_field(name)
+        if isinstance(value, str):
+            value = value.strip()
+            if value and field.get_internal_type() in ("FloatField", "IntegerField"):
+                value = value.replace(",", ".")
+        if value in (None, ""):
+            continue
+        try:
+            value = field.clean(value, None)
+        except ValidationError as exc:
+            errors.append((name, " ".join(exc.messages)))
+            continue
+        # FloatField akzeptiert "nan", "inf" und "1e999"
+        if isinstance(value, float) and not math.isfinite(value):
+            errors.append((name, "Keine gültige Zahl (nan/unendlich)."))
+            continue
+        data[name] = value
+
+    for name in fields:
+        if name in data or any(error[0] == name for error in errors):
+            continue
+        field = Building._meta.get_field(name)
+        if field.has_default():
+            data[name] = field.get_default()
+        else:
+            errors.append((name, "Pflichtfeld fehlt."))
+    return data, errors
+
+
+def _insert_chunk(rows):
+    """Block berechnen und per bulk_create speichern; Rückgabe: Anzahl."""
+    result = calc_heating_demand_batch(buildings_to_arrays(rows))
+    columns = {key: result[key].tolist() for key in RESULT_FIELDS}
+
+    objs = []
+    for i, data in enumerate(rows):
+        obj = Building(
+            **data,
+            calc_fingerprint=fingerprint_values(data[field] for field in HEATING_INPUT_FIELDS),
+            calc_version=CALC_VERSION,
+        )
+        for key, field in RESULT_FIELDS.items():
+            setattr(obj, field, columns[key][i])
+        objs.append(obj)
+
+    with transaction.atomic():
+        Building.objects.bulk_create(objs, batch_size=CHUNK_SIZE)
+        # bulk_create sendet keine Signale -> Portfolio-Kennzahlen selbst nachführen
+        delta = Counter()
+        for obj in objs:
+            delta.update(building_contribution(obj.__dict__))
+        apply_delta(delta, created=(objs[-1].pk, objs[-1].name))
+    return len(objs)
+
+
+def import_buildings(fileobj, filename, chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    Importiert alle gültigen Zeilen. Rückgabe:
+      {"rows": gelesene Zeilen, "created": gespeicherte Gebäude,
+       "error_count": fehlerhafte Zeilen, "errors": [(Zeile, Feld, Meldung), ...]}
+    Zeilennummern zählen wie in Excel (Kopfzeile = 1).
+    `progress(rows)` wird nach jedem Block aufgerufen.
+    """
+    rows = read_rows(fileobj, filename)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise BuildingImportError("Datei ist leer.")
+    columns = map_header(header)
+
+    summary = {"rows": 0, "created": 0, "error_count": 0, "errors": []}
+    chunk = []
+
+    def flush():
+        if chunk and not dry_run:
+            summary["created"] += _insert_chunk(chunk)
+        chunk.clear()
+        if progress:
+            progress(summary["rows"])
+
+    for line, values in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in values):
+            continue  # Leerzeile
+        summary["rows"] += 1
+        data, errors = clean_row(values, columns)
+        if errors:
+            summary["error_count"] += 1
+            room = MAX_ERRORS - len(summary["errors"])
+            summary["errors"].extend((line, name, message) for name, message in errors[:room])
+            continue
+        chunk.append(data)
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    return summary
+
+
+def write_error_report(errors, fileobj):
+    """Fehlerliste als CSV (Zeile;Feld;Meldung) in eine Textdatei."""
+    writer = csv.writer(fileobj, delimiter=";")
+    writer.writerow(["Zeile", "Feld", "Meldung"])
+    writer.writerows(errors)
@@ -0,0 +1,219 @@
+"""
+Klimadaten-Speicher (Testreferenzjahre) für die Energiebilanz.
+
+Quelldateien liegen in settings.CLIMATE_DATA_DIR als `<Standort>.csv`
+(8760 Zeilen, Semikolon-getrennt, Kopfzeile `temp;N;O;S;W`):
+Außentemperatur [°C] und Strahlung je Orientierung [W/m²] pro Stunde.
+
+Beim ersten Zugriff wird jede Datei einmalig in ein binäres `.npy`
+(settings.CLIMATE_CACHE_DIR) übersetzt; danach wird nur noch dieser Cache
+read-only per Memory-Map geöffnet. Alle Worker-Prozesse teilen sich so die
+Seiten im Page-Cache, und auf dem Request-Pfad wird nichts mehr geparst.
+Mit `python manage.py build_climate_cache` lassen sich die Caches vorab bauen.
+"""
+import csv
+import logging
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+# Spalten der Cache-Matrix (8760 x 5)
+COLUMNS = ("temp", "N", "O", "S", "W")
+HOURS_PER_YEAR = 8760
+DAYS_PER_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Eingebaute Monatsmittel (aus dem Excel, Blatt 03) – werden genutzt, wenn für
+# einen Standort keine Stundenwerte-Datei vorliegt.
+BUILTIN_MONTHLY = {
+    "Würzburg": {
+        "temp": [-1.2, 0.4, 4.3, 8.2, 13.7, 16.4, 18.0, 17.8, 13.1, 8.7, 3.0, -0.2],
+        # Strahlungsdaten Würzburg [W/m² Mittelwert]
+        "N": [17, 22, 40, 55, 83, 89, 86, 70, 51, 32, 17, 10],
+        "O": [35, 36, 74, 89, 146, 130, 137, 121, 88, 60, 28, 18],
+        "S": [70, 55, 92, 93, 123, 115, 120, 119, 107, 92, 43, 34],
+        "W": [25, 29, 56, 72, 112, 114, 112, 97, 71, 47, 22, 18],
+    },
+}
+
+# Tagesgang für aus Monatsmitteln erzeugte Stundenwerte: Temperatur ±4 K um
+# das Monatsmittel (Minimum 3 Uhr, Maximum 15 Uhr), Strahlung als Halbsinus
+# von 6 bis 18 Uhr. Beide Profile erhalten die Monatsmittel.
+DAILY_TEMP_AMPLITUDE = 4.0
+
+# Erste Stunde jedes Monats im Jahr
+MONTH_STARTS = np.concatenate(([0], np.cumsum(DAYS_PER_MONTH)[:-1])) * 24
+
+
+def _daily_profiles():
+    hours = np.arange(24) + 0.5
+    temp = DAILY_TEMP_AMPLITUDE * np.cos(2 * np.pi * (hours - 15) / 24)
+    sun = np.clip(np.sin(np.pi * (hours - 6) / 12), 0.0, None)
+    sun = sun / sun.mean()
+    return temp, sun
+
+
+def synthesize_hourly(monthly: dict) -> np.ndarray:
+    """
+    Erzeugt aus Monatsmitteln ({"temp": [...12], "N": [...12], ...})
+    eine Stundenmatrix (8760 x len(COLUMNS)).
+    """
+    temp_day, sun_day = _daily_profiles()
+    days = np.asarray(DAYS_PER_MONTH)
+
+    data = np.empty((HOURS_PER_YEAR, len(COLUMNS)), dtype=np.float64)
+    for i, column in enumerate(COLUMNS):
+        per_day = np.repeat(np.asarray(monthly[column], dtype=np.float64), days)
+        if column == "temp":
+            hourly = per_day[:, None] + temp_day[None, :]
+        else:
+            hourly = per_day[:, None] * sun_day[None, :]
+        data[:, i] = hourly.ravel()
+    return data
+
+
+def read_try_file(path: Path) -> np.ndarray:
+    """Liest eine Stundenwerte-Datei (`temp;N;O;S;W`) in eine 8760 x 5 Matrix."""
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        reader = csv.DictReader(fh, delimiter=";")
+        missing = [c for c in COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path.name}: Spalten fehlen: {', '.join(missing)}")
+        rows = [
+            [float(row[c].replace(",", ".")) for c in COLUMNS]
+            for row in reader
+        ]
+
+    data = np.asarray(rows, dtype=np.float64)
+    if data.shape != (HOURS_PER_YEAR, len(COLUMNS)):
+        raise ValueError(
+            f"{path.name}: {HOURS_PER_YEAR} Stundenwerte erwartet, {len(rows)} gefunden"
+        )
+    return data
+
+
+@dataclass
+class ClimateData:
+    """Stundenwerte eines Standorts (read-only Memory-Map) + abgeleitete Monatsmittel."""
+    site: str
+    hourly: np.ndarray
+    monthly_temp: list = field(init=False)
+    monthly_rad: dict = field(init=False)
+
+    def __post_init__(self):
+        # Monatsmittel einmalig je Prozess (Excel-Genauigkeit: 2 Nachkommastellen)
+        hours = np.asarray(DAYS_PER_MONTH) * 24
+        means = np.add.reduceat(self.hourly, MONTH_STARTS, axis=0) / hours[:, None]
+        means = np.round(means, 2)
+        self.monthly_temp = means[:, 0].tolist()
+        self.monthly_rad = {
+            column: means[:, i].tolist()
+            for i, column in enumerate(COLUMNS) if column != "temp"
+        }
+
+    def column(self, name: str) -> np.ndarray:
+        return self.hourly[:, COLUMNS.index(name)]
+
+    @property
+    def temp(self) -> np.ndarray:
+        return self.column("temp")
+
+
+class ClimateStore:
+    """Lädt Klimadaten je Standort genau einmal pro Prozess (danach O(1)-Lookup)."""
+
+    def __init__(self, data_dir, cache_dir, default_site):
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir)
+        self.default_site = default_site
+        self._sites = {}
+
+    @staticmethod
+    def _key(site):
+        return (site or "").strip().casefold()
+
+    def get(self, site=None) -> ClimateData:
+        key = self._key(site) or self._key(self.default_site)
+        data = self._sites.get(key)
+        if data is None:
+            data = self._load(site or self.default_site)
+            self._sites[key] = data
+        return data
+
+    def sites(self):
+        """Alle Standorte mit Quelldatei oder eingebauten Monatswerten."""
+        names = {name: None for name in BUILTIN_MONTHLY}
+        if self.data_dir.is_dir():
+            names.update({path.stem: None for path in sorted(self.data_dir.glob("*.csv"))})
+        return list(names)
+
+    def cache_path(self, site) -> Path:
+        return self.cache_dir / f"{slugify(site) or 'site'}.npy"
+
+    def build_cache(self, site, force=False) -> Path:
+        """Übersetzt die Quelldaten eines Standorts in den .npy-Cache (atomar)."""
+        source = self._source_path(site)
+        target = self.cache_path(site)
+
+        if not force and target.exists():
+            if source is None or source.stat().st_mtime <= target.stat().st_mtime:
+                return target
+
+        builtin = {self._key(name): monthly for name, monthly in BUILTIN_MONTHLY.items()}
+        if source is not None:
+            data = read_try_file(source)
+        elif self._key(site) in builtin:
+            data = synthesize_hourly(builtin[self._key(site)])
+        else:
+            raise KeyError(site)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, data)
+        os.replace(tmp, target)
+        return target
+
+    def _source_path(self, site):
+        if not self.data_dir.is_dir():
+            return None
+        for path in self.data_dir.glob("*.csv"):
+            if self._key(path.stem) == self._key(site):
+                return path
+        return None
+
+    def _load(self, site) -> ClimateData:
+        try:
+            path = self.build_cache(site)
+        except KeyError:
+            if self._key(site) == self._key(self.default_site):
+                raise ImproperlyConfigured(
+                    f"Keine Klimadaten für den Standard-Standort {self.default_site!r} "
+                    f"(CLIMATE_DEFAULT_SITE): weder {self.data_dir} enthält eine Datei "
+                    f"noch gibt es eingebaute Monatswerte."
+                ) from None
+            logger.warning(
+                "Keine Klimadaten für Standort %r – verwende %r.", site, self.default_site
+            )
+            return self.get(self.default_site)
+        return ClimateData(site=site, hourly=np.load(path, mmap_mode="r"))
+
+
+@lru_cache(maxsize=None)
+def get_climate_store() -> ClimateStore:
+    return ClimateStore(
+        data_dir=settings.CLIMATE_DATA_DIR,
+        cache_dir=settings.CLIMATE_CACHE_DIR,
+        default_site=settings.CLIMATE_DEFAULT_SITE,
+    )
+
+
+def climate_for(obj=None) -> ClimateData:
+    """Klimadaten für ein Building / EnergyProject (Feld `standort`) oder den Standard-Standort."""
+    return get_climate_store().get(getattr(obj, "standort", None))
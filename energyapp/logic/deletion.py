@@ -0,0 +1,99 @@
+"""
+Mengenbasiertes Löschen von Gebäuden samt abhängiger Datensätze.
+
+Building.objects.all().delete() lädt für die CASCADE-Emulation jedes
+abhängige Objekt (Sommerschutz, Lüftung mit Nutzungsanteilen, GWP,
+Blatt 01) nach Python und sendet Signale je Objekt. Hier wird stattdessen
+je Block von Gebäude-ids pro Tabelle ein einziges DELETE ... WHERE
+building_id IN (...) ausgeführt – in der Reihenfolge "tiefste Abhängigkeit
+zuerst", alles in einer Transaktion pro Block.
+
+Der Lösch-Plan wird aus den Modell-Metadaten abgeleitet (CASCADE rekursiv,
+SET_NULL als UPDATE). Da keine Signale gesendet werden, führt
+purge_buildings die Portfolio-Kennzahlen selbst nach.
+"""
+from django.db import models, router, transaction
+
+from energyapp.logic.statistics import apply_delta, snapshot, subtract
+from energyapp.models import Building
+
+CHUNK_SIZE = 2000
+
+
+class DeletionError(ValueError):
+    pass
+
+
+def deletion_plan(model=Building, path="", _seen=None):
+    """
+    Liste von (Modell, Lookup auf die Gebäude-id, Aktion) – Blätter zuerst.
+    Aktion ist "delete" oder der Name eines auf NULL zu setzenden Feldes.
+    """
+    _seen = set() if _seen is None else _seen
+    plan = []
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            continue
+        related = relation.related_model
+        # z.B. "building_id", verschachtelt "scenario__building_id"
+        lookup = f"{relation.field.name}__{path}" if path else relation.field.attname
+        on_delete = relation.on_delete
+
+        if on_delete is models.CASCADE:
+            if related in _seen:
+                raise DeletionError(f"Zyklische Abhängigkeit über {related.__name__}")
+            _seen.add(related)
+            plan += deletion_plan(related, lookup, _seen)
+            plan.append((related, lookup, "delete"))
+        elif on_delete is models.SET_NULL:
+            plan.append((related, lookup, relation.field.name))
+        elif on_delete is models.DO_NOTHING:
+            continue
+        else:
+            raise DeletionError(
+                f"{related.__name__}.{relation.field.name}: on_delete={on_delete.__name__} "
+                "wird beim Massen-Löschen nicht unterstützt"
+            )
+    return plan
+
+
+def _delete_chunk(ids, plan, using):
+    """Ein Block: Statistik vorher lesen, abhängige Tabellen, dann Gebäude löschen."""
+    before = snapshot(ids)
+    for model, lookup, action in plan:
+        queryset = model._base_manager.using(using).filter(**{f"{lookup}__in": ids})
+        if action == "delete":
+            queryset._raw_delete(using)
+        else:
+            queryset.update(**{action: None})
+    deleted = Building._base_manager.using(using).filter(id__in=ids)._raw_delete(using)
+    apply_delta(subtract({}, before), refresh_last=True)
+    return deleted
+
+
+def purge_buildings(queryset=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Löscht alle Gebäude des Querysets (Standard: alle) blockweise nach id.
+    `progress(done)` nach jedem Block. Rückgabe: Anzahl gelöschter Gebäude.
+    """
+    queryset = Building.objects.all() if queryset is None else queryset
+    using = router.db_for_write(Building)
+    plan = deletion_plan()
+
+    done, last_id = 0, 0
+    while True:
+        ids = list(
+            queryset.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return done
+        with transaction.atomic(using=using):
+            done += _delete_chunk(ids, plan, using)
+        last_id = ids[-1]
+        if progress:
+            progress(done)
+
+
+def project_buildings(project):
+    """Gebäude eines Projekts (Projektname aus Blatt 01)."""
+    return Building.objects.filter(sheet01__project=project)
@@ -0,0 +1,42 @@
+"""
+Begrenzter Thread-Pool für CPU-lastige Arbeit aus den async Views
+(Berechnung, PDF/XLSX-Aufbau, JSON-Kodierung großer Antworten).
+
+Die Event-Loop bleibt dadurch frei für andere Anfragen; höchstens
+settings.CPU_EXECUTOR_WORKERS Aufgaben laufen gleichzeitig, weitere warten
+in der Warteschlange des Pools. Die NumPy-Kernels geben den GIL frei und
+laufen damit echt parallel.
+
+Aufgaben dürfen nicht auf die Datenbank zugreifen – gelesen wird vorher im
+View mit dem async ORM, übergeben werden nur fertige Werte.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor_workers():
+    return getattr(settings, "CPU_EXECUTOR_WORKERS", None) or os.cpu_count() or 1
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=executor_workers(), thread_name_prefix="energyapp-cpu"
+            )
+        return _executor
+
+
+async def run_cpu(func, *args, **kwargs):
+    """func(*args, **kwargs) im Pool ausführen und auf das Ergebnis warten."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
@@ -0,0 +1,310 @@
+"""
+Gebäude-Exporte (CSV/XLSX) mit konstantem Speicherbedarf.
+
+Die Zeilen kommen direkt aus values_list(...).iterator(), es werden also
+nie alle Gebäude als Modell-Instanzen gleichzeitig geladen. Filter (ids,
+Sortierung, geändert seit) werden aus den GET-Parametern gelesen.
+
+XLSX wird im write-only-Modus von openpyxl geschrieben: jedes Blatt landet
+zeilenweise in einer Temp-Datei, gerechnet wird blockweise (Monatsbilanz,
+Blatt 01, GWP je CHUNK_SIZE Gebäude).
+"""
+from datetime import datetime, time
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from energyapp.logic.climate import get_climate_store
+from energyapp.logic.load_profiles import (
+    MONTH_NAMES,
+    MONTHLY_INPUT_FIELDS,
+    calculate_monthly_batch,
+)
+from energyapp.logic.metrics import timed
+from energyapp.logic.portfolio import evaluate_columns, portfolio_columns, portfolio_query
+from energyapp.logic.result_sheet_01 import SHEET01_GWP_FIELDS, SHEET01_OUTPUT
+from energyapp.models import Building
+
+CHUNK_SIZE = 2000
+
+# erlaubte Sortierungen (auch für die Gebäudeliste)
+BUILDING_ORDERS = {
+    "name": "name",
+    "name_desc": "-name",
+    "area": "result_floor_area",
+    "area_desc": "-result_floor_area",
+    "q_h": "result_Q_h",
+    "q_h_desc": "-result_Q_h",
+    "id": "-id",
+}
+
+# Exportspalten: (Kopfzeile, Modellfeld); die ersten elf wie im bisherigen Export,
+# neue Spalten nur hinten anhängen
+EXPORT_COLUMNS = (
+    ("ID", "id"),
+    ("Name", "name"),
+    ("Grundfläche [m²]", "result_floor_area"),
+    ("Q_h [kWh/a]", "result_Q_h"),
+    ("Q_T [kWh/a]", "result_Q_T"),
+    ("Q_V [kWh/a]", "result_Q_V"),
+    ("Q_I [kWh/a]", "result_Q_I"),
+    ("Q_S [kWh/a]", "result_Q_S"),
+    ("PV gesamt [kWh/a]", "result_Q_PV_total"),
+    ("PV Eigenverbrauch [kWh/a]", "result_Q_PV_on"),
+    ("PV Überschuss [kWh/a]", "result_Q_PV_off"),
+    ("NGF_t [m²]", "ngf_t"),
+    ("Q_S Nord [kWh/a]", "result_Q_S_n"),
+    ("Q_S Ost [kWh/a]", "result_Q_S_e"),
+    ("Q_S Süd [kWh/a]", "result_Q_S_s"),
+    ("Q_S West [kWh/a]", "result_Q_S_w"),
+    ("H_T [W/K]", "result_H_T"),
+    ("H_V [W/K]", "result_H_V"),
+)
+
+# abweichende Kopfzeilen im XLSX-Export (wie bisher)
+XLSX_HEADERS = {"result_Q_PV_on": "PV Eigenverb [kWh/a]"}
+
+
+# GET-Parameter, die filter_buildings auswertet (z.B. für Hintergrund-Jobs)
+EXPORT_FILTER_PARAMS = ("ids", "order", "changed_since")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _parse_ids(text):
+    try:
+        return [int(part) for part in text.split(",") if part.strip()]
+    except ValueError as exc:
+        raise ExportError(f"Ungültige ids: {text}") from exc
+
+
+def _parse_since(text):
+    try:
+        value = parse_datetime(text)
+        day = parse_date(text) if value is None else None
+    except ValueError:
+        value = day = None
+    if value is None:
+        if day is None:
+            raise ExportError(f"Ungültiges Datum für changed_since: {text}")
+        value = datetime.combine(day, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def filter_buildings(params, queryset=None):
+    """
+    Wendet die Export-Filter an:
+      ids=1,2,3                 nur diese Gebäude
+      order=name|q_h_desc|...   Sortierung (BUILDING_ORDERS, Standard: id)
+      changed_since=2025-01-31  nur seitdem geänderte Gebäude (auch mit Uhrzeit)
+    """
+    queryset = Building.objects.all() if queryset is None else queryset
+
+    if params.get("ids"):
+        queryset = queryset.filter(id__in=_parse_ids(params["ids"]))
+    if params.get("changed_since"):
+        queryset = queryset.filter(updated_at__gte=_parse_since(params["changed_since"]))
+
+    order = BUILDING_ORDERS.get(params.get("order"), "id")
+    # id als zweites Kriterium -> stabile Reihenfolge
+    return queryset.order_by(order, "id")
+
+
+def export_rows(queryset, columns=EXPORT_COLUMNS, chunk_size=CHUNK_SIZE):
+    """Kopfzeile + Datenzeilen als Generator (leere Werte -> "")."""
+    yield [header for header, _ in columns]
+    rows = queryset.values_list(*(field for _, field in columns)).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield ["" if value is None else value for value in row]
+
+
+async def aiterate(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Wie QuerySet.aiterator(): blockweise lesen, ohne den Event-Loop zu blockieren.
+    aiterator() führt bei values_list die Abfrage noch im Event-Loop aus.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield row
+
+
+async def aexport_rows(queryset, columns=EXPORT_COLUMNS, chunk_size=CHUNK_SIZE):
+    """export_rows für die async Views."""
+    yield [header for header, _ in columns]
+    async for row in aiterate(queryset.values_list(*(field for _, field in columns)), chunk_size):
+        yield ["" if value is None else value for value in row]
+
+
+# Blätter der XLSX-Datei: Schlüssel (?sheets=...) -> Blattname
+XLSX_SHEETS = {
+    "buildings": "Gebäude",
+    "monthly": "Monatsbilanz",
+    "sheet01": "01 Ergebnis Energie",
+    "gwp": "GWP",
+}
+
+SHEET01_COLUMNS = tuple(
+    key for key in SHEET01_OUTPUT if key != "I79" and key not in SHEET01_GWP_FIELDS
+)
+
+
+def parse_sheets(text):
+    """"buildings,monthly" -> ["buildings", "monthly"]; "all" -> alle Blätter."""
+    if text.strip() == "all":
+        return list(XLSX_SHEETS)
+    sheets = [part.strip() for part in text.split(",") if part.strip()]
+    unknown = [key for key in sheets if key not in XLSX_SHEETS]
+    if unknown or not sheets:
+        raise ExportError(
+            f"Unbekannte Blätter: {', '.join(unknown) or text} ({', '.join(XLSX_SHEETS)})"
+        )
+    return list(dict.fromkeys(sheets))
+
+
+def _header(ws, titles):
+    bold = Font(bold=True)
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = bold
+        cells.append(cell)
+    ws.append(cells)
+
+
+def _write_monthly(ws, rows, fields):
+    """Monatsbilanz je Standort-Gruppe mit calculate_monthly_batch."""
+    store = get_climate_store()
+    index = {field: i for i, field in enumerate(fields)}
+    by_site = {}
+    for row in rows:
+        by_site.setdefault(row[index["standort"]], []).append(row)
+
+    results = {}
+    for site, site_rows in by_site.items():
+        inputs = {
+            field: [row[index[field]] for row in site_rows] for field in MONTHLY_INPUT_FIELDS
+        }
+        monthly = calculate_monthly_batch(inputs, store.get(site))
+        for i, row in enumerate(site_rows):
+            results[row[0]] = (
+                monthly["monthly_q_h"][i].round(1).tolist()
+                + [round(float(monthly["annual_heating_demand"][i]), 1),
+                   round(float(monthly["specific_demand"][i]), 2)]
+            )
+
+    for row in rows:
+        ws.append([row[0], row[1], row[index["standort"]]] + results[row[0]])
+
+
+def _write_portfolio(sheets, rows, portfolio_rows):
+    """Blatt 01 und GWP für einen Block (calculate_sheet01_batch über portfolio_rows)."""
+    portfolio = evaluate_columns(portfolio_columns(portfolio_rows))
+    position = {int(pk): i for i, pk in enumerate(portfolio["id"])}
+    cells = portfolio["cells"]
+
+    for row in rows:
+        i = position[row[0]]
+        if "sheet01" in sheets:
+            sheets["sheet01"].append(
+                [row[0], row[1]] + [round(float(cells[key][i]), 3) for key in SHEET01_COLUMNS]
+            )
+        if "gwp" in sheets:
+            sheets["gwp"].append(
+                [row[0], row[1]] + [round(float(cells[key][i]), 3) for key in SHEET01_GWP_FIELDS]
+            )
+
+
+class XlsxExport:
+    """
+    XLSX-Export in Blöcken: add_chunk() je Block, am Ende save().
+    Liest selbst nichts aus der Datenbank – die Zeilen (values_list mit
+    `fields`, bei Blatt 01/GWP zusätzlich portfolio_query) liefert der Aufrufer.
+    """
+
+    def __init__(self, sheets=("buildings",)):
+        self.wb = Workbook(write_only=True)
+        self.ws = {key: self.wb.create_sheet(XLSX_SHEETS[key]) for key in sheets}
+
+        if "buildings" in self.ws:
+            _header(
+                self.ws["buildings"],
+                [XLSX_HEADERS.get(field, header) for header, field in EXPORT_COLUMNS],
+            )
+        if "monthly" in self.ws:
+            _header(self.ws["monthly"], ["ID", "Name", "Standort"]
+                    + [f"Q_h {month} [kWh]" for month in MONTH_NAMES]
+                    + ["Q_h Jahr [kWh/a]", "Q_h spez. [kWh/m²a]"])
+        if "sheet01" in self.ws:
+            _header(self.ws["sheet01"], ["ID", "Name", *SHEET01_COLUMNS])
+        if "gwp" in self.ws:
+            _header(self.ws["gwp"], ["ID", "Name", *SHEET01_GWP_FIELDS])
+
+        self.fields = [field for _, field in EXPORT_COLUMNS]
+        if "monthly" in self.ws:
+            self.fields += [f for f in ("standort", *MONTHLY_INPUT_FIELDS) if f not in self.fields]
+
+    @property
+    def needs_portfolio(self):
+        return "sheet01" in self.ws or "gwp" in self.ws
+
+    @timed("XlsxExport.add_chunk")
+    def add_chunk(self, rows, portfolio_rows=()):
+        """rows: Zeilen mit self.fields; portfolio_rows: portfolio_query derselben Gebäude."""
+        if "buildings" in self.ws:
+            width = len(EXPORT_COLUMNS)
+            for row in rows:
+                self.ws["buildings"].append(row[:width])
+        if "monthly" in self.ws:
+            _write_monthly(self.ws["monthly"], rows, self.fields)
+        if self.needs_portfolio:
+            _write_portfolio(self.ws, rows, portfolio_rows)
+
+    @timed("XlsxExport.save")
+    def save(self, fileobj):
+        self.wb.save(fileobj)
+
+
+def chunk_portfolio_query(rows):
+    """portfolio_query für die Gebäude eines Blocks."""
+    return portfolio_query(Building.objects.filter(id__in=[row[0] for row in rows]))
+
+
+def write_xlsx(queryset, fileobj, sheets=("buildings",), chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Schreibt die gewählten Blätter für alle Gebäude des Querysets nach `fileobj`.
+    Speicherbedarf hängt nur von chunk_size ab, nicht von der Anzahl Gebäude.
+    `progress(done)` wird nach jedem Block aufgerufen.
+    """
+    export = XlsxExport(sheets)
+
+    def flush(rows):
+        portfolio_rows = list(chunk_portfolio_query(rows)) if export.needs_portfolio else ()
+        export.add_chunk(rows, portfolio_rows)
+
+    chunk, done = [], 0
+    for row in queryset.values_list(*export.fields).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            done += len(chunk)
+            chunk = []
+            if progress:
+                progress(done)
+    if chunk:
+        flush(chunk)
+        done += len(chunk)
+
+    export.save(fileobj)
+    if progress:
+        progress(done)
@@ -0,0 +1,387 @@
+"""
+Lokale Job-Queue in der Datenbank (Modell BackgroundJob).
+
+Große Exporte werden nicht im Web-Request gerendert, sondern als Job
+eingestellt. Worker-Prozesse (python manage.py run_jobs) holen sich Jobs
+atomar (UPDATE ... WHERE status='pending'), melden den Fortschritt und legen
+das Ergebnis als Datei unter settings.EXPORT_ROOT ab. Der Nutzer lädt die
+Datei später über die Job-Seite herunter. Jobs, deren Worker ausgefallen ist
+(kein Lebenszeichen seit settings.JOB_STALE_AFTER), stellt
+recover_stale_jobs() wieder ein.
+
+Neue Job-Arten werden mit @job_handler("art") registriert; der Handler
+bekommt den Job und einen ProgressReporter und gibt den Pfad der fertigen
+Datei (oder "") zurück. Arten, die schon Teile in die Datenbank schreiben,
+bevor sie fertig sind, werden mit retry=False registriert: verwaiste Jobs
+dieser Art gelten als fehlgeschlagen statt neu eingestellt zu werden.
+"""
+import csv
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from energyapp.logic.building_import import count_rows, import_buildings, write_error_report
+from energyapp.logic.deletion import project_buildings, purge_buildings
+from energyapp.logic.exports import export_rows, filter_buildings, parse_sheets, write_xlsx
+from energyapp.logic.reports import write_buildings_pdf, write_reports_zip
+from energyapp.logic.sweep import grid_size, parse_grid, run_sweep
+from energyapp.models import BackgroundJob, Building
+
+JOB_HANDLERS: Dict[str, Callable] = {}
+# Job-Arten, die nach einem Ausfall nicht wiederholt werden dürfen
+NO_RETRY_KINDS = set()
+
+# Fortschritt höchstens so oft (Sekunden) in die Datenbank schreiben
+PROGRESS_INTERVAL = 1.0
+
+
+class JobError(ValueError):
+    pass
+
+
+def job_handler(kind: str, retry: bool = True):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        if not retry:
+            NO_RETRY_KINDS.add(kind)
+        return func
+    return register
+
+
+def submit_job(kind: str, params: Optional[dict] = None) -> BackgroundJob:
+    if kind not in JOB_HANDLERS:
+        raise JobError(f"Unbekannte Job-Art: {kind} ({', '.join(sorted(JOB_HANDLERS))})")
+    return BackgroundJob.objects.create(kind=kind, params=params or {})
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def recover_stale_jobs() -> int:
+    """
+    Laufende Jobs ohne Lebenszeichen seit settings.JOB_STALE_AFTER Sekunden
+    wieder einstellen. Als fehlgeschlagen markiert werden sie stattdessen nach
+    settings.JOB_MAX_ATTEMPTS Versuchen oder wenn ihre Art nicht wiederholt
+    werden darf (NO_RETRY_KINDS). Rückgabe: Anzahl betroffener Jobs.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    stale = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    lost = f"Worker ohne Lebenszeichen seit {settings.JOB_STALE_AFTER} s"
+    failed = stale.filter(kind__in=NO_RETRY_KINDS).update(
+        status=BackgroundJob.STATUS_FAILED,
+        error=f"{lost}; Teilergebnisse sind schon gespeichert, daher keine Wiederholung "
+              f"(Stand prüfen und neu starten).",
+        finished_at=timezone.now(),
+    )
+    failed += stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=BackgroundJob.STATUS_FAILED,
+        error=f"{lost}, aufgegeben nach {settings.JOB_MAX_ATTEMPTS} Versuchen.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(
+        status=BackgroundJob.STATUS_PENDING, worker="", started_at=None, heartbeat_at=None,
+        progress_done=0,
+    )
+    return failed + requeued
+
+
+def claim_next_job(worker: str) -> Optional[BackgroundJob]:
+    """Ältesten wartenden Job übernehmen; bei Konkurrenz gewinnt genau ein Worker."""
+    recover_stale_jobs()
+    while True:
+        pk = (
+            BackgroundJob.objects.filter(status=BackgroundJob.STATUS_PENDING)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+        now = timezone.now()
+        claimed = BackgroundJob.objects.filter(pk=pk, status=BackgroundJob.STATUS_PENDING).update(
+            status=BackgroundJob.STATUS_RUNNING, started_at=now, heartbeat_at=now, worker=worker,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=pk)
+
+
+class ProgressReporter:
+    """Schreibt den Fortschritt eines Jobs gedrosselt in die Datenbank."""
+
+    def __init__(self, job: BackgroundJob, interval: float = PROGRESS_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self._last = 0.0
+
+    def total(self, total: int) -> None:
+        self.job.progress_total = total
+        BackgroundJob.objects.filter(pk=self.job.pk).update(progress_total=total)
+
+    def __call__(self, done: int) -> None:
+        now = time.monotonic()
+        total = self.job.progress_total
+        if now - self._last < self.interval and (not total or done < total):
+            return
+        self._last = now
+        self.job.progress_done = done
+        BackgroundJob.objects.filter(pk=self.job.pk).update(progress_done=done)
+
+
+def _beat(job: BackgroundJob) -> None:
+    # nur die eigene Übernahme am Leben halten
+    BackgroundJob.objects.filter(
+        pk=job.pk, status=BackgroundJob.STATUS_RUNNING, worker=job.worker, attempts=job.attempts
+    ).update(heartbeat_at=timezone.now())
+
+
+class Heartbeat:
+    """
+    Thread, der heartbeat_at eines laufenden Jobs alle
+    settings.JOB_HEARTBEAT_INTERVAL Sekunden erneuert – unabhängig davon, ob der
+    Handler Fortschritt meldet (z.B. während reportlab oder workbook.save).
+    """
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"job-{job.pk}-heartbeat", daemon=True
+        )
+
+    def _run(self):
+        try:
+            while not self._stop.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    _beat(self.job)
+                except DatabaseError:
+                    pass  # nächster Versuch im nächsten Intervall
+        finally:
+            connection.close()  # eigene Verbindung dieses Threads
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def export_root() -> Path:
+    return Path(settings.EXPORT_ROOT)
+
+
+def artifact_path(job: BackgroundJob, filename: str) -> Path:
+    path = export_root() / "jobs" / str(job.pk) / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def run_job(job: BackgroundJob) -> bool:
+    """Führt einen (bereits übernommenen) Job aus; True bei Erfolg."""
+    handler = JOB_HANDLERS.get(job.kind)
+    progress = ProgressReporter(job)
+    # nur das Ergebnis der eigenen Übernahme eintragen (der Job kann als verwaist
+    # neu vergeben worden sein)
+    own = BackgroundJob.objects.filter(
+        pk=job.pk, status=BackgroundJob.STATUS_RUNNING, worker=job.worker, attempts=job.attempts
+    )
+    try:
+        if handler is None:
+            raise JobError(f"Unbekannte Job-Art: {job.kind}")
+        with Heartbeat(job):
+            artifact = handler(job, progress)
+    except Exception:
+        own.update(
+            status=BackgroundJob.STATUS_FAILED,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+        return False
+
+    relative = str(Path(artifact).relative_to(export_root())) if artifact else ""
+    own.update(
+        status=BackgroundJob.STATUS_DONE,
+        artifact=relative,
+        progress_done=job.progress_total,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def work(worker: Optional[str] = None, once: bool = False, poll_interval: float = 1.0) -> int:
+    """
+    Worker-Schleife: Jobs abarbeiten, bei leerer Queue warten.
+    Mit once=True endet sie, sobald keine Jobs mehr warten. Rückgabe: Anzahl Jobs.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while True:
+        close_old_connections()
+        job = claim_next_job(worker)
+        if job is None:
+            if once:
+                return count
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        count += 1
+
+
+def _write_atomic(path: Path, write: Callable) -> Path:
+    """Erst in eine .part-Datei schreiben, dann umbenennen (kein halbes Artefakt)."""
+    # eigene Temp-Datei je Versuch (ein verwaister Versuch kann noch laufen)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".part", delete=False
+    ) as fileobj:
+        try:
+            write(fileobj)
+        except BaseException:
+            fileobj.close()
+            os.unlink(fileobj.name)
+            raise
+    os.replace(fileobj.name, path)
+    return path
+
+
+# =========================
+# Job-Arten: Gebäude-Exporte (Filter wie building_export_csv)
+# =========================
+@job_handler("export_pdf")
+def export_pdf_job(job, progress):
+    buildings = filter_buildings(job.params)
+    progress.total(buildings.count())
+    return _write_atomic(
+        artifact_path(job, "buildings_export.pdf"),
+        lambda f: write_buildings_pdf(buildings, f, progress=progress),
+    )
+
+
+@job_handler("export_xlsx")
+def export_xlsx_job(job, progress):
+    buildings = filter_buildings(job.params)
+    sheets = parse_sheets(job.params.get("sheets", "buildings"))
+    progress.total(buildings.count())
+    return _write_atomic(
+        artifact_path(job, "buildings_export.xlsx"),
+        lambda f: write_xlsx(buildings, f, sheets, progress=progress),
+    )
+
+
+@job_handler("export_csv")
+def export_csv_job(job, progress):
+    buildings = filter_buildings(job.params)
+    progress.total(buildings.count())
+    path = artifact_path(job, "buildings_export.csv")
+
+    def write(fileobj):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        writer = csv.writer(text, delimiter=";")
+        rows = export_rows(buildings)
+        writer.writerow(next(rows))
+        for done, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if done % 1000 == 0:
+                progress(done)
+        text.flush()
+        text.detach()
+
+    return _write_atomic(path, write)
+
+
+@job_handler("export_reports")
+def export_reports_job(job, progress):
+    """Ein Energiebericht je Gebäude als ZIP (params["workers"]: Prozesse, Standard: alle Kerne)."""
+    buildings = filter_buildings(job.params)
+    progress.total(buildings.count())
+    return _write_atomic(
+        artifact_path(job, "building_reports.zip"),
+        lambda f: write_reports_zip(buildings, f, workers=job.params.get("workers"), progress=progress),
+    )
+
+
+# =========================
+# Job-Art: Parameterstudie (große Gitter aus views/sweep.py)
+# =========================
+@job_handler("sweep")
+def sweep_job(job, progress):
+    """params: building_id und Bereiche je Feld wie beim View; Ergebnis als CSV."""
+    building = Building.objects.get(pk=job.params["building_id"])
+    grid = parse_grid(job.params)
+    progress.total(grid_size(grid))
+
+    def write(fileobj):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        writer = csv.writer(text, delimiter=";")
+        rows = run_sweep(building, grid)
+        writer.writerow(next(rows))
+        for done, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if done % 10000 == 0:
+                progress(done)
+        text.flush()
+        text.detach()
+
+    return _write_atomic(artifact_path(job, f"building_{building.pk}_sweep.csv"), write)
+
+
+# =========================
+# Job-Art: Gebäude-Import (Datei liegt unter EXPORT_ROOT/imports)
+# =========================
+# jeder Block wird einzeln festgeschrieben: nach einem Ausfall nicht wiederholen
+@job_handler("import_buildings", retry=False)
+def import_buildings_job(job, progress):
+    """Importiert params["path"]; Ergebnis ist der Fehlerbericht als CSV."""
+    source = export_root() / job.params["path"]
+    progress.total(count_rows(source))
+    try:
+        with open(source, "rb") as fileobj:
+            summary = import_buildings(fileobj, source.name, progress=progress)
+    finally:
+        source.unlink(missing_ok=True)
+
+    def write(fileobj):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        text.write(
+            f"# {summary['created']} von {summary['rows']} Zeilen importiert, "
+            f"{summary['error_count']} fehlerhaft\n"
+        )
+        write_error_report(summary["errors"], text)
+        text.flush()
+        text.detach()
+
+    return _write_atomic(artifact_path(job, "import_fehler.csv"), write)
+
+
+# =========================
+# Job-Art: Gebäude löschen (alle, ids=... oder project=...)
+# =========================
+# löscht blockweise und passt die Statistik an: nach einem Ausfall nicht wiederholen
+@job_handler("delete_buildings", retry=False)
+def delete_buildings_job(job, progress):
+    params = job.params
+    if params.get("project"):
+        buildings = project_buildings(params["project"])
+    elif params.get("ids") or params.get("all"):
+        buildings = filter_buildings(params)
+    else:
+        raise JobError("delete_buildings braucht all, ids oder project.")
+    progress.total(buildings.count())
+    purge_buildings(buildings, progress=progress)
+    return ""
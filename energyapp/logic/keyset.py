@@ -0,0 +1,96 @@
+"""
+Keyset-Paginierung ("seek"): statt OFFSET wird ab dem letzten Eintrag der
+vorigen Seite weitergelesen – WHERE (feld, id) > (wert, id) ORDER BY feld, id.
+Mit einem Index auf (feld, id) bleibt jede Seite gleich schnell, egal wie
+weit man blättert.
+
+Sortiert wird immer nach (feld, id) in derselben Richtung; NULL gilt als
+größter Wert (aufsteigend: NULLs am Ende, absteigend: am Anfang). Der Cursor
+für die nächste/vorige Seite wird mit django.core.signing signiert.
+"""
+from django.core import signing
+from django.db.models import F, Q
+
+CURSOR_SALT = "energyapp.keyset"
+
+
+def _ordering(field, descending):
+    if field == "id":
+        return ["-id" if descending else "id"]
+    if descending:
+        return [F(field).desc(nulls_first=True), "-id"]
+    return [F(field).asc(nulls_last=True), "id"]
+
+
+def _after(field, value, pk, descending, nullable):
+    """Q für "echt nach (value, pk)" in der Sortierung (NULL = größter Wert)."""
+    if field == "id":
+        return Q(id__lt=pk) if descending else Q(id__gt=pk)
+
+    if descending:
+        if value is None:
+            return Q(**{f"{field}__isnull": True, "id__lt": pk}) | Q(**{f"{field}__isnull": False})
+        return Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+
+    if value is None:
+        return Q(**{f"{field}__isnull": True, "id__gt": pk})
+    after = Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+    if nullable:
+        after |= Q(**{f"{field}__isnull": True})
+    return after
+
+
+def encode_cursor(order, obj, field, direction):
+    return signing.dumps(
+        {"o": order, "v": getattr(obj, field), "id": obj.pk, "d": direction},
+        salt=CURSOR_SALT, compress=True,
+    )
+
+
+def decode_cursor(token, order):
+    """Cursor prüfen; ungültig oder für eine andere Sortierung -> None (erste Seite)."""
+    if not token:
+        return None
+    try:
+        cursor = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if cursor.get("o") != order or cursor.get("d") not in ("next", "prev"):
+        return None
+    return cursor
+
+
+def keyset_page(queryset, order, order_by, cursor=None, page_size=50):
+    """
+    Eine Seite des Querysets, sortiert nach `order_by` ("feld" oder "-feld").
+    `order` ist der Schlüssel der Sortierung (wird im Cursor mitgeführt).
+    Rückgabe: {"object_list", "next_cursor", "previous_cursor"}.
+    """
+    descending = order_by.startswith("-")
+    field = order_by.lstrip("-")
+    nullable = field != "id" and queryset.model._meta.get_field(field).null
+
+    backwards = cursor is not None and cursor["d"] == "prev"
+    seek_descending = descending != backwards
+
+    qs = queryset.order_by(*_ordering(field, seek_descending))
+    if cursor is not None:
+        qs = qs.filter(_after(field, cursor["v"], cursor["id"], seek_descending, nullable))
+
+    rows = list(qs[: page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, more
+    else:
+        has_next, has_previous = more, cursor is not None
+
+    return {
+        "object_list": rows,
+        "next_cursor": encode_cursor(order, rows[-1], field, "next") if rows and has_next else None,
+        "previous_cursor": (
+            encode_cursor(order, rows[0], field, "prev") if rows and has_previous else None
+        ),
+    }
@@ -1,24 +1,30 @@
 import math
 
+import numpy as np
+
+from energyapp.logic.climate import DAYS_PER_MONTH, MONTH_STARTS, climate_for
+from energyapp.logic.metrics import timed
+
+MONTH_NAMES = ("Jan", "Feb", "Mrz", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez")
+
 
 class EnergyCalculator:
 
-    def __init__(self, building):
+    def __init__(self, building, climate=None):
         self.b = building
+        # Klimadaten des Standorts (einmal je Prozess geladen, siehe logic/climate.py)
+        self.climate = climate or climate_for(building)
+
         # Monatsdaten (aus deinem Excel Blatt 03)
-        self.months = ["Jan", "Feb", "Mrz", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
-        self.days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-        self.temp_ambient = [-1.2, 0.4, 4.3, 8.2, 13.7, 16.4, 18.0, 17.8, 13.1, 8.7, 3.0, -0.2]
-
-        # Strahlungsdaten Würzburg [W/m² Mittelwert]
-        self.rad_data = {
-            'N': [17, 22, 40, 55, 83, 89, 86, 70, 51, 32, 17, 10],
-            'O': [35, 36, 74, 89, 146, 130, 137, 121, 88, 60, 28, 18],
-            'S': [70, 55, 92, 93, 123, 115, 120, 119, 107, 92, 43, 34],
-            'W': [25, 29, 56, 72, 112, 114, 112, 97, 71, 47, 22, 18]
-        }
+        self.months = list(MONTH_NAMES)
+        self.days = list(DAYS_PER_MONTH)
+        self.temp_ambient = self.climate.monthly_temp
 
-    def calculate(self):
+        # Strahlungsdaten [W/m² Mittelwert] je Orientierung
+        self.rad_data = self.climate.monthly_rad
+
+    def _geometry(self):
+        """Geometrie und H-Werte – gemeinsame Basis für Monats- und Stundenbilanz."""
         # --- 1. GEOMETRIE BERECHNEN ---
         floor_area = self.b.length_ns * self.b.width_ow
         roof_area = floor_area
@@ -49,6 +55,28 @@ class EnergyCalculator:
         volume = floor_area * total_height
         h_v = volume * self.b.air_change_rate * 0.34
 
+        return {
+            'floor_area': floor_area,
+            'volume': volume,
+            'aw_n': aw_n,
+            'aw_s': aw_s,
+            'aw_e': aw_e,
+            'aw_w': aw_w,
+            'total_window_area': total_window_area,
+            'h_t': h_t,
+            'h_v': h_v,
+        }
+
+    @timed("EnergyCalculator.calculate")
+    def calculate(self):
+        geo = self._geometry()
+        floor_area = geo['floor_area']
+        volume = geo['volume']
+        aw_n, aw_s, aw_e, aw_w = geo['aw_n'], geo['aw_s'], geo['aw_e'], geo['aw_w']
+        total_window_area = geo['total_window_area']
+        h_t = geo['h_t']
+        h_v = geo['h_v']
+
         # --- 3. MONATS-BILANZ (Blatt 03 & 04) ---
         monthly_results = []
         annual_q_h = 0
@@ -92,4 +120,164 @@ class EnergyCalculator:
                 'bri': round(volume, 1),
                 'window_area': round(total_window_area, 1)
             }
-        }
\ No newline at end of file
+        }
+
+    def calculate_hourly(self):
+        """
+        Stundenbilanz über 8760 h (vektorisiert, ohne Python-Schleife).
+
+        Gleiche Bilanzgleichung wie die Monatsbilanz, aber je Stunde:
+        Q_h = max(0, Q_loss - 0.95 * (Q_s + Q_i)). Die Stundenreihen werden
+        als float32-Arrays [kWh je Stunde = kW] zurückgegeben, die
+        Monatswerte sind daraus aufsummiert.
+        """
+        geo = self._geometry()
+        climate = self.climate
+
+        # Verluste je Stunde [kWh]
+        delta_t = np.maximum(0.0, self.b.setpoint_temp - climate.temp)
+        q_loss = (geo['h_t'] + geo['h_v']) * delta_t / 1000
+
+        # Solare Gewinne (Faktor 0.7 wie Monatsbilanz) + interne Gewinne (70 W/Person)
+        q_s = (geo['aw_n'] * climate.column('N') * self.b.g_n +
+               geo['aw_s'] * climate.column('S') * self.b.g_s +
+               geo['aw_e'] * climate.column('O') * self.b.g_e +
+               geo['aw_w'] * climate.column('W') * self.b.g_w) * 0.7 / 1000
+        q_i = self.b.persons * 70 / 1000
+        q_gain = q_s + q_i
+
+        q_h = np.maximum(0.0, q_loss - 0.95 * q_gain)
+
+        # Monatssummen aus den Stundenwerten
+        starts = MONTH_STARTS
+        m_loss = np.add.reduceat(q_loss, starts)
+        m_gain = np.add.reduceat(np.broadcast_to(q_gain, q_loss.shape), starts)
+        m_h = np.add.reduceat(q_h, starts)
+
+        monthly_results = [
+            {
+                'month': month,
+                'temp': self.temp_ambient[i],
+                'q_loss': round(float(m_loss[i]), 1),
+                'q_gain': round(float(m_gain[i]), 1),
+                'q_h': round(float(m_h[i]), 1),
+            }
+            for i, month in enumerate(self.months)
+        ]
+
+        annual_q_h = float(m_h.sum())
+        floor_area = geo['floor_area']
+
+        return {
+            'monthly_data': monthly_results,
+            'annual_heating_demand': round(annual_q_h, 1),
+            'specific_demand': round(annual_q_h / (floor_area * self.b.storeys), 1),
+            'peak_heating_load': round(float(q_h.max()), 1),  # kW
+            'h_t': round(geo['h_t'], 1),
+            'h_v': round(geo['h_v'], 1),
+            'geometry': {
+                'ngf': round(floor_area * self.b.storeys, 1),
+                'bri': round(geo['volume'], 1),
+                'window_area': round(geo['total_window_area'], 1)
+            },
+            'hourly': {
+                'temp': climate.temp.astype(np.float32),
+                'q_loss': q_loss.astype(np.float32),
+                'q_gain': np.broadcast_to(q_gain, q_loss.shape).astype(np.float32),
+                'q_h': q_h.astype(np.float32),
+            },
+        }
+
+
+
+# Eingabefelder des Building-Modells für die Monatsbilanz (Batch-Spalten)
+MONTHLY_INPUT_FIELDS = (
+    "length_ns",
+    "width_ow",
+    "storeys",
+    "room_height",
+    "u_wall",
+    "u_roof",
+    "u_floor",
+    "u_window",
+    "window_share_n",
+    "window_share_e",
+    "window_share_s",
+    "window_share_w",
+    "g_n",
+    "g_e",
+    "g_s",
+    "g_w",
+    "persons",
+    "air_change_rate",
+    "setpoint_temp",
+)
+
+
+def calculate_monthly_batch(inputs, climate=None):
+    """
+    Monatsbilanz von EnergyCalculator.calculate für N Gebäude auf einmal.
+
+    `inputs` enthält je Feld aus MONTHLY_INPUT_FIELDS ein Array der Länge N.
+    Die Rechenschritte entsprechen 1:1 der skalaren Methode (nur die
+    12 Monate werden noch iteriert), die Werte sind ungerundet.
+    """
+    climate = climate or climate_for()
+    col = {
+        field: np.asarray(inputs[field], dtype=np.float64)
+        for field in MONTHLY_INPUT_FIELDS
+    }
+
+    # --- 1. GEOMETRIE (wie EnergyCalculator._geometry) ---
+    floor_area = col['length_ns'] * col['width_ow']
+    roof_area = floor_area
+    total_height = col['storeys'] * col['room_height']
+
+    area_fac_ns = col['width_ow'] * total_height
+    area_fac_ow = col['length_ns'] * total_height
+
+    aw_n = area_fac_ns * (col['window_share_n'] / 100)
+    aw_s = area_fac_ns * (col['window_share_s'] / 100)
+    aw_e = area_fac_ow * (col['window_share_e'] / 100)
+    aw_w = area_fac_ow * (col['window_share_w'] / 100)
+    total_window_area = aw_n + aw_s + aw_e + aw_w
+
+    opaque_wall_area = (2 * area_fac_ns + 2 * area_fac_ow) - total_window_area
+
+    # --- 2. H-WERTE ---
+    h_t = (opaque_wall_area * col['u_wall'] +
+           roof_area * col['u_roof'] +
+           floor_area * col['u_floor'] * 0.6 +
+           total_window_area * col['u_window'])
+
+    volume = floor_area * total_height
+    h_v = volume * col['air_change_rate'] * 0.34
+
+    # --- 3. MONATS-BILANZ ---
+    temp_ambient = climate.monthly_temp
+    rad_data = climate.monthly_rad
+    monthly_q_h = np.empty((floor_area.shape[0], len(DAYS_PER_MONTH)))
+    annual_q_h = np.zeros_like(floor_area)
+
+    for i, days in enumerate(DAYS_PER_MONTH):
+        hours = days * 24
+        delta_t = np.maximum(0, col['setpoint_temp'] - temp_ambient[i])
+
+        q_loss = (h_t + h_v) * delta_t * hours / 1000
+        q_s = (aw_n * rad_data['N'][i] * col['g_n'] +
+               aw_s * rad_data['S'][i] * col['g_s'] +
+               aw_e * rad_data['O'][i] * col['g_e'] +
+               aw_w * rad_data['W'][i] * col['g_w']) * 0.7 * hours / 1000
+        q_i = (col['persons'] * 70 * hours) / 1000
+
+        q_h = np.maximum(0, q_loss - 0.95 * (q_s + q_i))
+        monthly_q_h[:, i] = q_h
+        annual_q_h = annual_q_h + q_h
+
+    return {
+        'monthly_q_h': monthly_q_h,
+        'annual_heating_demand': annual_q_h,
+        'specific_demand': annual_q_h / (floor_area * col['storeys']),
+        'h_t': h_t,
+        'h_v': h_v,
+    }
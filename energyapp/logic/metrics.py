@@ -0,0 +1,373 @@
+"""
+Laufzeit-Metriken im Prometheus-Textformat (abrufbar unter /metrics).
+
+Erfasst werden Histogramme für
+  - die Antwortzeit je View (energyapp/middleware.py, MetricsMiddleware),
+  - SQL-Abfragen: Dauer je Abfrage und Anzahl je Anfrage, nach View,
+  - die Laufzeit der Rechenkerne und PDF/XLSX-Renderer (Decorator @timed).
+
+Jeder Prozess zählt im Speicher; ein Hintergrund-Thread schreibt die Werte
+alle FLUSH_INTERVAL Sekunden (und beim Beenden) als JSON nach
+settings.METRICS_DIR. /metrics summiert die Dateien aller Prozesse; die
+Dateien beendeter Prozesse werden dabei in ARCHIVE_FILE zusammengeführt,
+damit die Zähler nicht zurückspringen und das Verzeichnis nicht wächst.
+METRICS_DIR muss daher lokal je Rechner sein (Prozess-IDs). Ohne
+METRICS_DIR zeigt /metrics nur den eigenen Prozess.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: Dateien beendeter Prozesse bleiben einzeln liegen
+    fcntl = None
+
+FLUSH_INTERVAL = 1.0
+ARCHIVE_FILE = "archive.json"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+FUNCTION_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120)
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_start_lock = threading.Lock()
+
+
+class Histogram:
+    """Histogramm mit festen Labels; observe(Wert, *Labelwerte)."""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(float(b) for b in buckets)
+        # Labelwerte -> [Anzahl je Bucket (nicht kumuliert) ..., +Inf, Summe]
+        self.series = {}
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        with _lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+            _state["dirty"] = True
+        if _state["flusher"] is None:
+            _start_flusher()
+
+
+REGISTRY = []
+
+REQUEST_DURATION = Histogram(
+    "energyapp_http_request_duration_seconds",
+    "Antwortzeit je View (bei Streaming bis zum letzten Block).",
+    ("view", "method", "status"),
+    LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "energyapp_http_request_queries",
+    "SQL-Abfragen je Anfrage.",
+    ("view",),
+    QUERY_COUNT_BUCKETS,
+)
+QUERY_DURATION = Histogram(
+    "energyapp_db_query_duration_seconds",
+    "Dauer je SQL-Abfrage (View 'none' = außerhalb einer Anfrage).",
+    ("view",),
+    QUERY_BUCKETS,
+)
+FUNCTION_DURATION = Histogram(
+    "energyapp_function_duration_seconds",
+    "Laufzeit der Rechenkerne und Renderer.",
+    ("function",),
+    FUNCTION_BUCKETS,
+)
+
+
+# --- Instrumentierung ------------------------------------------------------------
+
+def timed(name):
+    """Decorator: Laufzeit der Funktion in FUNCTION_DURATION unter `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                FUNCTION_DURATION.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorator
+
+
+class RequestStats:
+    """Zähler einer laufenden Anfrage (über current_request auch in sync_to_async-Threads sichtbar)."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.start = time.perf_counter()
+
+    @property
+    def view(self):
+        # resolver_match ist erst nach der URL-Auflösung gesetzt
+        match = getattr(self.request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.view_name or match.route
+
+
+current_request = contextvars.ContextVar("energyapp_metrics_request", default=None)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """execute_wrapper für jede DB-Verbindung (siehe install_query_wrapper)."""
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+        QUERY_DURATION.observe(time.perf_counter() - start, stats.view if stats else "none")
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Receiver für connection_created: misst alle Abfragen der neuen Verbindung."""
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+# --- Prozess-Dateien -------------------------------------------------------------
+
+_state = {"file": None, "dirty": False, "flusher": None}
+
+
+def _process_file():
+    if _state["file"] is None:
+        _state["file"] = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+    return _state["file"]
+
+
+def _pid(path):
+    try:
+        return int(path.name.split("-", 1)[0])
+    except ValueError:
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Prozess eines anderen Benutzers
+    return True
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None  # gerade ersetzt oder unvollständig
+
+
+def _merge(totals, data):
+    for name, series in data.items():
+        target = totals.setdefault(name, {})
+        for labels, values in series.items():
+            current = target.get(labels)
+            target[labels] = values if current is None else [a + b for a, b in zip(current, values)]
+
+
+def compact(directory):
+    """
+    Führt die Dateien beendeter Prozesse in ARCHIVE_FILE zusammen.
+
+    Die Dateien werden vorher in *.merged umbenannt und erst nach dem
+    Schreiben des Archivs gelöscht; das Archiv merkt sich ihre Namen, so dass
+    ein Abbruch dazwischen beim nächsten Lauf nicht doppelt zählt.
+    """
+    if fcntl is None:
+        return
+    directory = Path(directory)
+    archive_path = directory / ARCHIVE_FILE
+    with open(directory / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read(archive_path) or {"values": {}, "merged": []}
+        pending = []
+        for path in directory.glob("*.merged"):
+            if path.name in archive["merged"]:
+                path.unlink(missing_ok=True)  # schon im Archiv
+            else:
+                pending.append(path)
+        for path in directory.glob("*.json"):
+            pid = _pid(path)
+            if pid is None or pid == os.getpid() or _alive(pid):
+                continue
+            target = path.with_suffix(".merged")
+            path.replace(target)
+            pending.append(target)
+        if not pending:
+            return
+        for path in pending:
+            data = _read(path)
+            if data is not None:
+                _merge(archive["values"], data)
+        archive["merged"] = [path.name for path in pending]
+        tmp = archive_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(archive), encoding="utf-8")
+        tmp.replace(archive_path)
+        for path in pending:
+            path.unlink(missing_ok=True)
+
+
+def snapshot():
+    """Werte dieses Prozesses: {Metrikname: {JSON-Labelwerte: Serie}}."""
+    with _lock:
+        return {
+            metric.name: {json.dumps(labels): list(series) for labels, series in metric.series.items()}
+            for metric in REGISTRY
+        }
+
+
+def flush():
+    """Schreibt die Werte dieses Prozesses nach METRICS_DIR (atomar ersetzt)."""
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory:
+        return
+    with _flush_lock:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / _process_file()
+        tmp = path.with_suffix(".tmp")
+        _state["dirty"] = False
+        tmp.write_text(json.dumps(snapshot()), encoding="utf-8")
+        tmp.replace(path)
+
+
+def _flush_quietly():
+    # Metriken dürfen den Prozess nie stören
+    if not _state["dirty"]:
+        return
+    try:
+        flush()
+    except OSError:
+        pass
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        _flush_quietly()
+
+
+def _start_flusher():
+    # Datei-I/O nie im Anfrage-Thread bzw. in der Event-Loop von ASGI
+    with _start_lock:
+        if _state["flusher"] is None:
+            thread = threading.Thread(target=_flush_loop, name="energyapp-metrics-flush", daemon=True)
+            thread.start()
+            _state["flusher"] = thread
+
+
+def reset():
+    """Alle Werte dieses Prozesses verwerfen (neuer Prozess nach fork, Tests)."""
+    with _lock:
+        for metric in REGISTRY:
+            metric.series.clear()
+    _state["file"] = None
+    _state["dirty"] = False
+
+
+def _after_fork():
+    # Locks können beim fork von einem anderen Thread gehalten worden sein
+    # und der Flush-Thread existiert im Kind nicht mehr
+    global _lock, _flush_lock, _start_lock
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _start_lock = threading.Lock()
+    _state["flusher"] = None
+    reset()
+
+
+atexit.register(_flush_quietly)
+if hasattr(os, "register_at_fork"):
+    # Kind-Prozesse (z.B. ProcessPoolExecutor) zählen in eine eigene Datei
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def collect():
+    """Archiv und Dateien laufender Prozesse plus der aktuellen Werte dieses Prozesses."""
+    totals = {}
+    directory = getattr(settings, "METRICS_DIR", None)
+    if directory and Path(directory).is_dir():
+        directory = Path(directory)
+        try:
+            compact(directory)
+        except OSError:
+            pass  # dann eben ohne Zusammenführen
+        archive = _read(directory / ARCHIVE_FILE)
+        if archive is not None:
+            _merge(totals, archive["values"])
+        own = _process_file()
+        for path in directory.glob("*.json"):
+            if path.name in (own, ARCHIVE_FILE):
+                continue
+            data = _read(path)
+            if data is not None:
+                _merge(totals, data)
+    _merge(totals, snapshot())
+    return totals
+
+
+# --- Textformat ------------------------------------------------------------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _bound(bucket):
+    return str(int(bucket)) if bucket == int(bucket) else repr(bucket)
+
+
+def render(totals=None):
+    """Prometheus-Textformat (Version 0.0.4) aller Histogramme."""
+    totals = collect() if totals is None else totals
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} histogram")
+        for key, series in sorted(totals.get(metric.name, {}).items()):
+            labels = json.loads(key)
+            cumulative = 0
+            for bucket, count in zip(metric.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bucket == float("inf") else _bound(bucket)
+                bucket_labels = _labels(metric.labelnames, labels, f'le="{le}"')
+                lines.append(f"{metric.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _labels(metric.labelnames, labels)
+            lines.append(f"{metric.name}_sum{label_text} {series[-1]!r}")
+            lines.append(f"{metric.name}_count{label_text} {cumulative}")
+    return "\n".join(lines) + "\n"
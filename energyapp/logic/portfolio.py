@@ -0,0 +1,167 @@
+"""
+Portfolio-Auswertung von Ergebnisblatt 01 für alle Gebäude.
+
+Alle Eingaben (Gebäude, Lüftung, GWP Herstellung/Kompensation, E42 aus
+Blatt 01) werden mit EINER Abfrage über LEFT JOINs geladen – unabhängig von
+der Anzahl der Gebäude. Die GWP-Kennwerte (im Modell Properties) werden
+spaltenweise nachgerechnet, danach läuft calculate_sheet01_batch einmal
+über alle Gebäude.
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from energyapp.logic.result_sheet_01 import calculate_sheet01_batch
+from energyapp.models import Building
+
+CHUNK_SIZE = 5000
+
+# Spalte im Ergebnis -> Feld der values_list-Abfrage
+QUERY_FIELDS = {
+    "heating_kwh_a": "result_Q_h",
+    "pv_total_kwh_a": "result_Q_PV_total",
+    "ngf_m2": "ngf_t",
+    "ventilation_kwh_a": "ventilation__result_energy_kwh",
+    "E42_solar_generation_factor": "sheet01__E42_solar_generation_factor",
+    # GWP Herstellung
+    "m_id": "gwp_manufacturing__id",
+    "kg300_new_qty": "gwp_manufacturing__kg300_new_qty",
+    "kg300_new_factor": "gwp_manufacturing__kg300_new_factor",
+    "kg400_new_qty": "gwp_manufacturing__kg400_new_qty",
+    "kg400_new_factor": "gwp_manufacturing__kg400_new_factor",
+    "kg300_existing_qty": "gwp_manufacturing__kg300_existing_qty",
+    "kg300_existing_factor": "gwp_manufacturing__kg300_existing_factor",
+    "kg400_existing_qty": "gwp_manufacturing__kg400_existing_qty",
+    "kg400_existing_factor": "gwp_manufacturing__kg400_existing_factor",
+    "service_life_years": "gwp_manufacturing__service_life_years",
+    # GWP Kompensation
+    "c_id": "gwp_compensation__id",
+    "heat_district_regen_kwh": "gwp_compensation__heat_district_regen_kwh",
+    "factor_heat_regen": "gwp_compensation__factor_heat_regen",
+    "heat_district_avg_kwh": "gwp_compensation__heat_district_avg_kwh",
+    "factor_heat_avg": "gwp_compensation__factor_heat_avg",
+    "gas_kwh": "gwp_compensation__gas_kwh",
+    "factor_gas": "gwp_compensation__factor_gas",
+    "electricity_kwh": "gwp_compensation__electricity_kwh",
+    "factor_electricity": "gwp_compensation__factor_electricity",
+}
+
+# Kennzahlen der Portfolio-Tabelle: Zelle -> Beschriftung
+PORTFOLIO_COLUMNS = {
+    "F54": "Endenergie [kWh/a]",
+    "G54": "Endenergie [kWh/m²a]",
+    "F67": "Strom [kWh/a]",
+    "G67": "Strom [kWh/m²a]",
+    "F80": "Primärenergie [kWh/a]",
+    "G80": "Primärenergie [kWh/m²a]",
+    "F87": "PV-Überschuss [kWh/a]",
+    "gwp_sum_with_existing_per_year": "GWP gesamt [kg CO₂/a]",
+}
+
+
+def portfolio_query(queryset=None):
+    """values_list-Abfrage der Rohdaten (id, name, QUERY_FIELDS...), nach id sortiert."""
+    queryset = Building.objects.all() if queryset is None else queryset
+    return queryset.order_by("id").values_list("id", "name", *QUERY_FIELDS.values())
+
+
+def load_portfolio_inputs(queryset=None) -> Dict[str, np.ndarray]:
+    """
+    Lädt die Rohdaten aller Gebäude als Spalten-Arrays (eine Abfrage).
+    Fehlende Relationen/NULL-Werte werden zu NaN; "present_m"/"present_c"
+    markieren, ob GWP-Daten existieren.
+    """
+    return portfolio_columns(portfolio_query(queryset).iterator(chunk_size=CHUNK_SIZE))
+
+
+def portfolio_columns(rows) -> Dict[str, np.ndarray]:
+    """Zeilen von portfolio_query -> Spalten-Arrays (ohne Datenbankzugriff)."""
+    keys = list(QUERY_FIELDS)
+    ids, names, values = [], [], []
+    for row in rows:
+        ids.append(row[0])
+        names.append(row[1])
+        values.append(row[2:])
+
+    table = np.array(values, dtype=np.float64).reshape(len(values), len(keys))
+    columns = {key: table[:, i] for i, key in enumerate(keys)}
+    columns["present_m"] = ~np.isnan(columns.pop("m_id"))
+    columns["present_c"] = ~np.isnan(columns.pop("c_id"))
+    columns["id"] = np.array(ids, dtype=np.int64)
+    columns["name"] = np.array(names, dtype=object)
+    return columns
+
+
+def gwp_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """GwpManufacturing/GwpCompensation-Properties spaltenweise (wie im Modell)."""
+    c = {k: np.nan_to_num(v) for k, v in columns.items() if k not in ("id", "name")}
+    has_m = columns["present_m"]
+    has_c = columns["present_c"]
+
+    new = c["kg300_new_qty"] * c["kg300_new_factor"] + c["kg400_new_qty"] * c["kg400_new_factor"]
+    existing = (c["kg300_existing_qty"] * c["kg300_existing_factor"]
+                + c["kg400_existing_qty"] * c["kg400_existing_factor"])
+    life = c["service_life_years"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_py = np.where(life != 0, new / life, 0.0)
+        existing_py = np.where(life != 0, existing / life, 0.0)
+
+    operation = (c["heat_district_regen_kwh"] * c["factor_heat_regen"]
+                 + c["heat_district_avg_kwh"] * c["factor_heat_avg"]
+                 + c["gas_kwh"] * c["factor_gas"]
+                 + c["electricity_kwh"] * c["factor_electricity"])
+    without_existing = operation + np.where(has_m, new_py, 0.0)
+    with_existing = without_existing + np.where(has_m, existing_py, 0.0)
+
+    return {
+        "gwp_manufacturing_total": np.where(has_m, new + existing, 0.0),
+        "gwp_manufacturing_new_per_year": np.where(has_m, new_py, 0.0),
+        "gwp_manufacturing_existing_per_year": np.where(has_m, existing_py, 0.0),
+        "gwp_operation_per_year": np.where(has_c, operation, 0.0),
+        "gwp_sum_without_existing_per_year": np.where(has_c, without_existing, 0.0),
+        "gwp_sum_with_existing_per_year": np.where(has_c, with_existing, 0.0),
+    }
+
+
+def evaluate_portfolio(queryset=None) -> Dict[str, Any]:
+    """
+    Blatt 01 für alle Gebäude: {"id", "name", "cells": {Zelle: Array}, "totals"}.
+    Zellen sind ungerundet (wie calculate_sheet01_batch).
+    """
+    return evaluate_columns(load_portfolio_inputs(queryset))
+
+
+def evaluate_columns(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """evaluate_portfolio für bereits geladene Spalten (portfolio_columns)."""
+    inputs = {
+        "heating_kwh_a": columns["heating_kwh_a"],
+        "pv_total_kwh_a": columns["pv_total_kwh_a"],
+        "ngf_m2": columns["ngf_m2"],
+        "ventilation_kwh_a": columns["ventilation_kwh_a"],
+        "E42_solar_generation_factor": columns["E42_solar_generation_factor"],
+        **gwp_columns(columns),
+    }
+    cells = calculate_sheet01_batch(inputs)
+
+    return {
+        "id": columns["id"],
+        "name": columns["name"],
+        "cells": cells,
+        "totals": {key: float(cells[key].sum()) for key in PORTFOLIO_COLUMNS},
+        "count": len(columns["id"]),
+    }
+
+
+def portfolio_rows(
+    portfolio: Dict[str, Any],
+    order: Optional[Iterable[int]] = None,
+    columns: Iterable[str] = tuple(PORTFOLIO_COLUMNS),
+) -> Iterator[list]:
+    """Zeilen [id, name, Zellen...] (gerundet auf 3 Stellen)."""
+    columns = list(columns)
+    index = range(portfolio["count"]) if order is None else order
+    arrays = [portfolio["cells"][key] for key in columns]
+    for i in index:
+        yield [int(portfolio["id"][i]), portfolio["name"][i]] + [
+            round(float(a[i]), 3) for a in arrays
+        ]
@@ -0,0 +1,131 @@
+"""
+Datei-Cache für die Energieberichte je Gebäude (render_building_report).
+
+Ein Bericht liegt als building_<id>_<digest>.pdf in settings.REPORT_CACHE_DIR;
+der Digest ist der Hash aller Berichtswerte (report_digest). Ändern sich die
+Ergebnisse, ändert sich der Dateiname – veraltete Dateien desselben Gebäudes
+werden beim Schreiben entfernt.
+
+Die Größe des Verzeichnisses ist auf settings.REPORT_CACHE_MAX_BYTES
+begrenzt. Verdrängt werden die am längsten nicht gelesenen Dateien (LRU über
+die Änderungszeit, die bei jedem Treffer aktualisiert wird). Das Verzeichnis
+wird dafür nicht bei jedem Schreiben durchsucht, sondern höchstens alle
+EVICT_INTERVAL Sekunden bzw. nach EVICT_FRACTION der Maximalgröße an
+neu geschriebenen Berichten (je Prozess).
+"""
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from energyapp.logic.reports import render_building_report, report_digest
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_INTERVAL = 60.0
+EVICT_FRACTION = 0.1
+
+_evict_lock = threading.Lock()
+_evict_state = {"last": None, "written": 0}
+
+
+def cache_dir() -> Path:
+    path = Path(settings.REPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _max_bytes() -> int:
+    return getattr(settings, "REPORT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def cached_report(values, digest=None) -> Path:
+    """Pfad des Berichts-PDFs; wird bei Bedarf erzeugt."""
+    digest = digest or report_digest(values)
+    directory = cache_dir()
+    path = directory / f"building_{values['id']}_{digest}.pdf"
+
+    try:
+        # Treffer: als zuletzt benutzt markieren
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    # eigene Temp-Datei je Aufruf (Threads/Prozesse rendern evtl. denselben Bericht)
+    data = render_building_report(values)
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f"{path.name}.", suffix=".part", delete=False
+    ) as tmp:
+        try:
+            tmp.write(data)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
+
+    for old in directory.glob(f"building_{values['id']}_*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    if _evict_due(len(data)):
+        evict(keep=path)
+    return path
+
+
+def open_report(values, digest=None):
+    """
+    Bericht als geöffnete Datei (rb). Räumt evict() oder ein paralleles Rendern
+    die Datei zwischen cached_report und open weg, wird neu gerendert; eine
+    einmal geöffnete Datei bleibt auch nach dem Löschen lesbar.
+    """
+    while True:
+        try:
+            return open(cached_report(values, digest), "rb")
+        except FileNotFoundError:
+            continue
+
+
+def _evict_due(written: int) -> bool:
+    """True, wenn das Verzeichnis wieder auf die Maximalgröße geprüft werden soll."""
+    now = time.monotonic()
+    with _evict_lock:
+        _evict_state["written"] += written
+        last = _evict_state["last"]
+        if (
+            last is not None
+            and now - last < EVICT_INTERVAL
+            and _evict_state["written"] < _max_bytes() * EVICT_FRACTION
+        ):
+            return False
+        _evict_state.update(last=now, written=0)
+        return True
+
+
+def evict(keep=None, max_bytes=None) -> int:
+    """Älteste Dateien löschen, bis das Verzeichnis unter max_bytes liegt; Rückgabe: Anzahl."""
+    max_bytes = _max_bytes() if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir()):
+        if not entry.name.endswith(".pdf"):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,329 @@
+"""
+PDF-Berichte mit reportlab.
+
+write_buildings_pdf erzeugt die Gebäudetabelle aller Gebäude. Die Zeilen
+werden blockweise aus values_list gelesen und als einzelne LongTables
+angehängt; LongTable bricht lange Tabellen deutlich schneller um als Table.
+
+render_building_report erzeugt den Energiebericht EINES Gebäudes aus einem
+Dict mit REPORT_FIELDS (siehe report_values) – ohne Modell-Instanz, damit
+er auch in Worker-Prozessen und im Datei-Cache (logic/report_cache.py)
+verwendet werden kann.
+
+write_reports_zip rendert die Berichte vieler Gebäude parallel in einem
+ProcessPoolExecutor (reportlab ist CPU-gebunden) und schreibt sie in der
+Reihenfolge ihrer Fertigstellung in ein ZIP-Archiv.
+"""
+import hashlib
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+
+import django
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    Flowable,
+    LongTable,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from energyapp.logic.metrics import timed
+
+CHUNK_SIZE = 500
+
+BUILDINGS_PDF_COLUMNS = (
+    ("ID", "id"),
+    ("Name", "name"),
+    ("Grundfl. [m²]", "result_floor_area"),
+    ("Q_h [kWh/a]", "result_Q_h"),
+    ("PV on [kWh/a]", "result_Q_PV_on"),
+    ("PV off [kWh/a]", "result_Q_PV_off"),
+)
+
+BUILDINGS_TABLE_STYLE = TableStyle([
+    # Header
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e9ecef")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 10),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+    ("TOPPADDING", (0, 0), (-1, 0), 6),
+
+    # Körper
+    ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+    ("FONTSIZE", (0, 1), (-1, -1), 9),
+    ("BOTTOMPADDING", (0, 1), (-1, -1), 4),
+    ("TOPPADDING", (0, 1), (-1, -1), 4),
+
+    # Gitterlinien
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+
+    # Ausrichtung: ID + Zahlen rechts, Name links
+    ("ALIGN", (0, 1), (0, -1), "RIGHT"),
+    ("ALIGN", (2, 1), (-1, -1), "RIGHT"),
+
+    # wechselnde Zeilenfarben im Body
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1),
+     [colors.white, colors.HexColor("#f8f9fa")]),
+])
+
+# feste Spaltenbreiten, damit alle Teil-Tabellen bündig untereinander stehen
+BUILDINGS_COL_WIDTHS = [14 * mm, 56 * mm, 25 * mm, 25 * mm, 25 * mm, 25 * mm]
+
+
+def fmt(val, decimals=1):
+    """Zahlenformat für Berichte ("-" für fehlende Werte)."""
+    if val is None:
+        return "-"
+    return f"{val:.{decimals}f}"
+
+
+def _document(fileobj):
+    return SimpleDocTemplate(
+        fileobj,
+        pagesize=A4,
+        leftMargin=20 * mm,
+        rightMargin=20 * mm,
+        topMargin=25 * mm,
+        bottomMargin=20 * mm,
+    )
+
+
+class _ProgressMarker(Flowable):
+    """Unsichtbares Element: meldet beim Setzen, wie viele Gebäude schon im PDF stehen."""
+
+    def __init__(self, callback, done):
+        super().__init__()
+        self.callback = callback
+        self.done = done
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        self.callback(self.done)
+
+
+BUILDINGS_PDF_FIELDS = tuple(field for _, field in BUILDINGS_PDF_COLUMNS)
+
+
+def write_buildings_pdf(queryset, fileobj, progress=None, chunk_size=CHUNK_SIZE):
+    """
+    Gebäudetabelle als PDF nach `fileobj`.
+    `progress(done)` wird während des Seitenaufbaus nach jedem Block mit der
+    Anzahl bereits gesetzter Gebäude aufgerufen.
+    """
+    rows = queryset.values_list(*BUILDINGS_PDF_FIELDS).iterator(chunk_size=chunk_size)
+    write_buildings_pdf_rows(rows, queryset.count(), fileobj, progress, chunk_size)
+
+
+@timed("write_buildings_pdf")
+def write_buildings_pdf_rows(rows, count, fileobj, progress=None, chunk_size=CHUNK_SIZE):
+    """write_buildings_pdf für bereits gelesene Zeilen (values_list mit BUILDINGS_PDF_FIELDS)."""
+    styles = getSampleStyleSheet()
+    header = [title for title, _ in BUILDINGS_PDF_COLUMNS]
+
+    elements = [
+        Paragraph("Gebäude-Export – Energiebilanz", styles["Title"]),
+        Spacer(1, 8),
+        Paragraph(f"Anzahl Gebäude: {count}", styles["Normal"]),
+        Spacer(1, 12),
+    ]
+
+    def table(rows):
+        t = LongTable([header] + rows, repeatRows=1, hAlign="LEFT", colWidths=BUILDINGS_COL_WIDTHS)
+        t.setStyle(BUILDINGS_TABLE_STYLE)
+        return t
+
+    def add_chunk(rows, done):
+        elements.append(table(rows))
+        if progress:
+            elements.append(_ProgressMarker(progress, done))
+
+    chunk, done = [], 0
+    for pk, name, area, q_h, pv_on, pv_off in rows:
+        chunk.append([str(pk), name, fmt(area), fmt(q_h), fmt(pv_on), fmt(pv_off)])
+        if len(chunk) >= chunk_size:
+            done += len(chunk)
+            add_chunk(chunk, done)
+            chunk = []
+    if chunk or done == 0:
+        done += len(chunk)
+        add_chunk(chunk, done)
+
+    _document(fileobj).build(elements)
+
+
+# =========================
+# Energiebericht je Gebäude
+# =========================
+# Bei Änderungen am Layout hochzählen -> zwischengespeicherte PDFs werden neu erzeugt
+REPORT_VERSION = 1
+
+REPORT_FIELDS = (
+    "id",
+    "name",
+    "result_floor_area",
+    "setpoint_temp",
+    "result_Q_h",
+    "result_Q_T",
+    "result_Q_V",
+    "result_Q_I",
+    "result_Q_S",
+    "result_Q_PV_total",
+    "result_Q_PV_on",
+    "result_Q_PV_off",
+)
+
+REPORT_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e9ecef")),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+])
+
+
+def report_values(building):
+    """Alle Werte, die in den Bericht eingehen (Modell-Instanz -> Dict)."""
+    return {field: getattr(building, field) for field in REPORT_FIELDS}
+
+
+def report_digest(values):
+    """Hash über alle Berichtswerte; ändert sich genau dann, wenn sich das PDF ändert."""
+    payload = repr((REPORT_VERSION, [values[field] for field in REPORT_FIELDS]))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def report_filename(values):
+    return f"building_{values['id']}_bericht.pdf"
+
+
+def _flow_chart(values):
+    flows = [
+        ("Q_T", values["result_Q_T"] or 0),
+        ("Q_V", values["result_Q_V"] or 0),
+        ("Q_I", values["result_Q_I"] or 0),
+        ("Q_S", values["result_Q_S"] or 0),
+        ("Q_h", values["result_Q_h"] or 0),
+    ]
+
+    drawing = Drawing(400, 200)
+    bc = VerticalBarChart()
+    bc.x = 40
+    bc.y = 40
+    bc.height = 120
+    bc.width = 320
+    bc.data = [[v for (_, v) in flows]]
+    bc.categoryAxis.categoryNames = [lbl for (lbl, _) in flows]
+    bc.categoryAxis.labels.boxAnchor = "n"
+    bc.valueAxis.valueMin = 0
+    bc.barWidth = 20
+    bc.groupSpacing = 10
+    bc.barSpacing = 5
+    bc.bars[0].fillColor = colors.HexColor("#0d6efd")
+
+    drawing.add(bc)
+    return drawing
+
+
+@timed("render_building_report")
+def render_building_report(values):
+    """PDF-Bericht für EIN Gebäude inkl. Tabelle und einfachem Balkendiagramm (Bytes)."""
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Titel
+    elements.append(Paragraph(f"Energiebericht – {values['name']}", styles["Title"]))
+    elements.append(Spacer(1, 10))
+
+    # Kurzinfo
+    info_lines = [
+        f"Gebäude-ID: {values['id']}",
+        f"Grundfläche: {values['result_floor_area'] or '-'} m²",
+        f"Raum-Solltemperatur: {values['setpoint_temp'] or '-'} °C",
+    ]
+    for line in info_lines:
+        elements.append(Paragraph(line, styles["Normal"]))
+    elements.append(Spacer(1, 12))
+
+    # Ergebnis-Tabelle
+    data = [
+        ["Größe", "Wert"],
+        ["Heizwärmebedarf Q_h [kWh/a]", fmt(values["result_Q_h"])],
+        ["Transmissionsverluste Q_T [kWh/a]", fmt(values["result_Q_T"])],
+        ["Lüftungsverluste Q_V [kWh/a]", fmt(values["result_Q_V"])],
+        ["Interne Gewinne Q_I [kWh/a]", fmt(values["result_Q_I"])],
+        ["Solare Gewinne Q_S [kWh/a]", fmt(values["result_Q_S"])],
+        ["PV-Gesamt [kWh/a]", fmt(values["result_Q_PV_total"])],
+        ["PV-Eigenverbrauch [kWh/a]", fmt(values["result_Q_PV_on"])],
+        ["PV-Überschuss [kWh/a]", fmt(values["result_Q_PV_off"])],
+    ]
+    table = Table(data, hAlign="LEFT", colWidths=[70 * mm, 60 * mm])
+    table.setStyle(REPORT_TABLE_STYLE)
+    elements.append(Paragraph("Ergebnisse – Übersicht", styles["Heading2"]))
+    elements.append(table)
+    elements.append(Spacer(1, 16))
+
+    # Balkendiagramm Energieflüsse
+    elements.append(Paragraph("Energieflüsse (jährlich)", styles["Heading2"]))
+    elements.append(Spacer(1, 4))
+    elements.append(_flow_chart(values))
+
+    buffer = BytesIO()
+    _document(buffer).build(elements)
+    return buffer.getvalue()
+
+
+def _render_entry(values):
+    return report_filename(values), render_building_report(values)
+
+
+def write_reports_zip(queryset, fileobj, workers=None, progress=None, chunk_size=CHUNK_SIZE):
+    """
+    Ein Bericht je Gebäude des Querysets als ZIP nach `fileobj`.
+    Höchstens 2 × workers Berichte sind gleichzeitig in Arbeit bzw. im Speicher;
+    workers=1 rendert im eigenen Prozess. `progress(done)` nach jedem Bericht.
+    Rückgabe: Anzahl Berichte.
+    """
+    workers = workers or os.cpu_count() or 1
+    rows = queryset.values(*REPORT_FIELDS).iterator(chunk_size=chunk_size)
+    done = 0
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+
+        def add(filename, data):
+            nonlocal done
+            archive.writestr(filename, data)
+            done += 1
+            if progress:
+                progress(done)
+
+        if workers == 1:
+            for values in rows:
+                add(*_render_entry(values))
+            return done
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            pending = set()
+            for values in rows:
+                pending.add(pool.submit(_render_entry, values))
+                if len(pending) >= 2 * workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        add(*future.result())
+            for future in pending:
+                add(*future.result())
+    return done
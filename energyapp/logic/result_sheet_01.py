@@ -1,7 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
+import numpy as np
+
+from energyapp.logic.metrics import timed
 from energyapp.models import Building, EnergyResultSheet01
 
 
@@ -48,6 +51,16 @@ class ExternalSources:
     wp_cop: float = 0.0
 
 
+# Relationen, die sheet01_inputs liest (inkl. Blatt 01 selbst) – per select_related
+# in derselben Abfrage wie das Gebäude laden
+SHEET01_RELATED = ("sheet01", "ventilation", "gwp_manufacturing", "gwp_compensation")
+
+
+def sheet01_buildings():
+    """Building-Queryset mit allen für Blatt 01 nötigen Relationen (eine Abfrage)."""
+    return Building.objects.select_related(*SHEET01_RELATED)
+
+
 def build_external_sources(building: Building) -> ExternalSources:
     """
     Minimal sinnvolle Zuordnung zu deinem aktuellen Datenmodell:
@@ -97,334 +110,529 @@ def build_external_sources(building: Building) -> ExternalSources:
 
 
 
-def calculate_sheet01(building: Building, sheet: EnergyResultSheet01) -> Dict[str, Any]:
-    """
-    Gibt ein Dict zurück, das du 1:1 als `calc.*` im Template nutzt.
-    Benennung orientiert sich an deinen Excel-Zellen (F22, G22, ...).
-    """
-    ext = build_external_sources(building)
-    # FIXE EXCEL-FAKTOREN
-    E39 = 0.05
-    E40 = 0.05
-    E41 = 0.05
-    E47 = 0.40
-    E48 = 1.10
-    E49 = 0.03
-    E51 = 1.0
-    E52 = 1.0
-    E53 = 1.0
-    I78 = 0.70
+# Eingaben für Zellgraph und calculate_sheet01_batch (Namen wie ExternalSources + E42)
+SHEET01_INPUT_FIELDS = (
+    "heating_kwh_a",
+    "dhw_kwh_a",
+    "ventilation_kwh_a",
+    "lighting_kwh_a",
+    "user_process_kwh_a",
+    "pv_total_kwh_a",
+    "ngf_m2",
+    "E42_solar_generation_factor",
+)
 
-    # EINZIGE EINGABE
-    E42 = _num(sheet.E42_solar_generation_factor)
+# GWP-Kennwerte werden nur durchgereicht (optional, Standard 0)
+SHEET01_GWP_FIELDS = (
+    "gwp_manufacturing_total",
+    "gwp_manufacturing_new_per_year",
+    "gwp_manufacturing_existing_per_year",
+    "gwp_operation_per_year",
+    "gwp_sum_without_existing_per_year",
+    "gwp_sum_with_existing_per_year",
+)
 
-    NGF_t = _num(ext.ngf_m2)
 
-    # =========================
-    # Nutzenergie (F22..F29)
-    # =========================
-    # Heizwärme
-    # Excel-Quelle: ='03 MONATSBILANZ'!O76
-    F22 = _num(ext.heating_kwh_a)
-    # Excel-Quelle: ='03 MONATSBILANZ'!O77 (im Excel schon spezifisch)
-    # Wir berechnen es hier als Näherung: F22 / NGF_t
-    G22 = _safe_div(F22, NGF_t)
+# =========================
+# Zellgraph für Blatt 01
+# =========================
+# Jede Zelle ist mit ihren Abhängigkeiten deklariert (Eingaben -> F22 -> F38
+# ... -> F80). Sheet01Graph merkt sich berechnete Werte; ändert sich eine
+# Eingabe, werden nur die davon abhängigen Zellen verworfen und bei Bedarf
+# neu berechnet. Es lassen sich auch nur einzelne Zellen anfordern.
 
-    # Heizwärme Beleuchtung (Excel: 0 / 0 / Vergleich 5)
-    F23 = 0.0
-    G23 = 0.0
+# FIXE EXCEL-FAKTOREN
+E39 = 0.05
+E40 = 0.05
+E41 = 0.05
+E47 = 0.40
+E48 = 1.10
+E49 = 0.03
+E51 = 1.0
+E52 = 1.0
+E53 = 1.0
+I78 = 0.70  # Deckungsanteil
+E78 = -1.8
+E79 = 1.8
 
-    # Trinkwarmwasser
-    # Excel-Quelle: ='12 LICHT UND WASSER'!L56
-    F24 = _num(ext.dhw_kwh_a)
-    # Excel-Formel: ='12 LICHT UND WASSER'!L56/'04 LASTGANG'!E21
-    # Kommentar: in Excel ist E21 sehr wahrscheinlich NGF_t oder Bezugsfläche -> wir verwenden NGF_t
-    G24 = _safe_div(F24, NGF_t)
+# Systemschalter C46/C47/C48 (Systemtyp + COP fehlen im Modell) -> vorerst 0
+C46 = 0.0
+C47 = 0.0
+C48 = 0.0
 
-    # Luftförderung
-    # Excel-Quelle: ='11 LUFTFÖRDERUNG'!E97
-    F25 = _num(ext.ventilation_kwh_a)
-    # Excel-Formel: ='11 LUFTFÖRDERUNG'!E97/'04 LASTGANG'!E21 -> hier: / NGF_t
-    G25 = _safe_div(F25, NGF_t)
+SHEET01_INPUTS = SHEET01_INPUT_FIELDS + SHEET01_GWP_FIELDS
 
-    # Kälte
-    F26 = 0.0
-    G26 = 0.0
+# Zelle -> (Abhängigkeiten, Funktion)
+SHEET01_CELLS: Dict[str, Tuple[Tuple[str, ...], Callable[..., float]]] = {}
 
-    # Beleuchtung
-    # Excel-Quelle: ='12 LICHT UND WASSER'!L36
-    F27 = _num(ext.lighting_kwh_a)
-    # Excel-Formel: ='12 LICHT UND WASSER'!L36/'04 LASTGANG'!E21 -> / NGF_t
-    G27 = _safe_div(F27, NGF_t)
 
-    # Sonstiges
-    F28 = 0.0
-    G28 = 0.0
+def cell(name: str, *deps: str):
+    def register(func):
+        SHEET01_CELLS[name] = (deps, func)
+        return func
+    return register
+
+
+def _specific_cells(*rows: str) -> None:
+    # G-Spalte: spezifischer Wert je m² NGF_t (=F../NGF_t)
+    for row in rows:
+        SHEET01_CELLS["G" + row] = (("F" + row, "NGF_t"), _safe_div)
+
+
+def _sum_cell(name: str, *deps: str) -> None:
+    SHEET01_CELLS[name] = (deps, lambda *values: sum(values[1:], values[0]))
 
-    # Nutzer (Prozess)
-    # Excel-Quelle: ='10 INNERE WÄRMEQUELLEN'!N49
-    F29 = _num(ext.user_process_kwh_a)
-    # Excel-Quelle: ='10 INNERE WÄRMEQUELLEN'!O49 -> wir berechnen: / NGF_t
-    G29 = _safe_div(F29, NGF_t)
-
-    # Nutzenergiebedarf
-    # Excel-Formel: =SUM(F22:F29)
-    F30 = F22 + F23 + F24 + F25 + F26 + F27 + F28 + F29
-    # Excel-Formel: =SUM(G22:G29)
-    G30 = G22 + G23 + G24 + G25 + G26 + G27 + G28 + G29
-
-    # =========================
-    # Endenergie Wärme (F38..F42)
-    # =========================
-    # Heizwärme s.o
-    # Excel-Formel: =E38*(F22) ; E38 = 1
-    F38 = 1.0 * F22
-    # Excel-Formel: =F38/NGF_t
-    G38 = _safe_div(F38, NGF_t)
-
-    # Übergabe Heiz/Wasser
-    # Excel-Formel: =F22*$E39
-    F39 = F22 * E39
-    G39 = _safe_div(F39, NGF_t)
-
-    # Verteilung Heiz/Wasser
-    # Excel-Formel: =E40*(F22+F39)
-    F40 = E40 * (F22 + F39)
-    G40 = _safe_div(F40, NGF_t)
-
-    # Speicherung Heiz/Wasser
-    # Excel-Formel: =E41*(F22+F39+F40)
-    F41 = E41 * (F22 + F39 + F40)
-    G41 = _safe_div(F41, NGF_t)
-
-    # - Erzeugung Solar
-    # Excel-Formel: =-F22*$E42
-    F42 = -F22 * E42
-    G42 = _safe_div(F42, NGF_t)
-
-    # Erzeugernutzwärmeabgabe
-    # Excel-Formel: =SUM(F38:F42)
-    F43 = F38 + F39 + F40 + F41 + F42
-    # Excel-Formel: =SUM(G38:G42)
-    G43 = G38 + G39 + G40 + G41 + G42
-
-    # =========================
-    # Endenergie (F46..F53)
-    # Hier fehlen dir aktuell Systemtyp + COP im Modell.
-    # Wir setzen die Schalter C46/C47/C48 vorerst auf 0.
-    # =========================
-    # Excel-Formeln:
-    # C46 =IF(OR('00 GEBÄUDEDATEN'!F136="Luft/Wasser Wärmepumpe"; '00 GEBÄUDEDATEN'!F136="Wasser/Wasser Wärmepumpe");1;0)
-    # E46 =IFERROR(1/'00 GEBÄUDEDATEN'!F137;0)
-    # F46 =$F$43*$E46*C46
-    C46 = 0.0
-    E46 = 0.0
-    F46 = F43 * E46 * C46
-    G46 = _safe_div(F46, NGF_t)
-
-    # Fernwärme
-    # C47 =IF('00 GEBÄUDEDATEN'!F136="Fernwärme";1;0)
-    C47 = 0.0
-    F47 = F43 * E47 * C47
-    G47 = _safe_div(F47, NGF_t)
-
-    # Gas
-    # C48 =IF('00 GEBÄUDEDATEN'!F136="Gasheizung";1;0)
-    C48 = 0.0
-    F48 = F43 * E48 * C48
-    G48 = _safe_div(F48, NGF_t)
-
-    # Hilfsenergie Heizung
-    # Excel-Formel: =$F$43*$E49
-    F49 = F43 * E49
-    G49 = _safe_div(F49, NGF_t)
-
-    # Trinkwarmwasser
-    # Excel-Formel: =F24
-    F50 = F24
-    G50 = _safe_div(F50, NGF_t)
-
-    # Luftförderung
-    # Excel-Formel: =F25*$E51
-    F51 = F25 * E51
-    G51 = _safe_div(F51, NGF_t)
-
-    # Beleuchtung
-    # Excel-Formel: =F27*$E52
-    F52 = F27 * E52
-    G52 = _safe_div(F52, NGF_t)
-
-    # Nutzer (Prozess)
-    # Excel-Formel: =F29*$E53
-    F53 = F29 * E53
-    G53 = _safe_div(F53, NGF_t)
-
-    # Endenergiebedarf
-    # Excel-Formel: =SUM(F46:F53)
-    F54 = F46 + F47 + F48 + F49 + F50 + F51 + F52 + F53
-    # Excel-Formel: =SUM(G46:G53)
-    G54 = G46 + G47 + G48 + G49 + G50 + G51 + G52 + G53
-
-    # =========================
-    # Endenergie Strom (F59..F66)
-    # =========================
-    # Excel: E59 = C46 ; F59 = E59*F46
-    E59 = C46
-    F59 = E59 * F46
-    G59 = _safe_div(F59, NGF_t)
-
-    # FW / Gas sind Strom = 0
-    F60 = 0.0
-    G60 = 0.0
-    F61 = 0.0
-    G61 = 0.0
-
-    # Hilfsenergie Heizung: =F49
-    F62 = F49
-    G62 = _safe_div(F62, NGF_t)
-
-    # Trinkwarmwasser (wenn El.): =E63*F50 ; E63=1
-    F63 = 1.0 * F50
-    G63 = _safe_div(F63, NGF_t)
-
-    # Luftförderung / Beleuchtung / Nutzer
-    F64 = F51
-    G64 = _safe_div(F64, NGF_t)
-
-    F65 = F52
-    G65 = _safe_div(F65, NGF_t)
-
-    F66 = F53
-    G66 = _safe_div(F66, NGF_t)
-
-    # Endenergiebedarf Strom: =SUM(F59:F66) / =SUM(G59:G66)
-    F67 = F59 + F60 + F61 + F62 + F63 + F64 + F65 + F66
-    G67 = G59 + G60 + G61 + G62 + G63 + G64 + G65 + G66
-
-    # =========================
-    # Primärenergie (F75..F79)
-    # =========================
-    # Wärme Solar: =$F$42*E75  (E75=0 in Excel)
-    F75 = 0.0
-    G75 = _safe_div(F75, NGF_t)
-
-    # Wärme Fernwärme: =F47*E76 (E76=0,25)
-    F76 = F47 * 0.25
-    G76 = _safe_div(F76, NGF_t)
-
-    # Wärme Gas: =F48*E77 (E77=1,1)
-    F77 = F48 * 1.1
-    G77 = _safe_div(F77, NGF_t)
-
-    # Strom (On-Site)
-    # Excel-Quelle: '05 PHOTOVOLTAIK'!Q111 und F68/I78/E78 etc.
-    # Dein Excel referenziert F68 – das ist in deiner Tabelle "Endenergiebedarf Strom" (F67 hier).
-    # Wir verwenden: F68 ~ F67 (Endenergiebedarf Strom kWh/a) als Näherung.
-    F68_like = F67
-
-    pv_total = _num(ext.pv_total_kwh_a)  # '05 PHOTOVOLTAIK'!Q111
-    I78 = 0.70  # Deckungsanteil
-    E78 = -1.8
 
+def _const_cell(name: str, value: float) -> None:
+    SHEET01_CELLS[name] = ((), lambda: value)
+
+
+@cell("NGF_t", "ngf_m2")
+def _(ngf):
+    # Excel: NGF_t (Name Manager) -> ='00 GEBÄUDEDATEN'!F40
+    ngf = _num(ngf)
+    return ngf if ngf > 0 else 0.0
+
+
+@cell("E42", "E42_solar_generation_factor")
+def _(factor):
+    # EINZIGE EINGABE
+    return _num(factor)
+
+
+# -------------------------
+# Nutzenergie (F22..F29)
+# -------------------------
+# Heizwärme
+# Excel-Quelle: ='03 MONATSBILANZ'!O76
+# G22: im Excel schon spezifisch (O77), wir berechnen F22 / NGF_t
+cell("F22", "heating_kwh_a")(_num)
+# Heizwärme Beleuchtung (Excel: 0 / 0 / Vergleich 5)
+_const_cell("F23", 0.0)
+_const_cell("G23", 0.0)
+# Trinkwarmwasser
+# Excel-Quelle: ='12 LICHT UND WASSER'!L56
+# Excel-Formel G24: ='12 LICHT UND WASSER'!L56/'04 LASTGANG'!E21 -> hier: / NGF_t
+cell("F24", "dhw_kwh_a")(_num)
+# Luftförderung
+# Excel-Quelle: ='11 LUFTFÖRDERUNG'!E97
+cell("F25", "ventilation_kwh_a")(_num)
+# Kälte
+_const_cell("F26", 0.0)
+_const_cell("G26", 0.0)
+# Beleuchtung
+# Excel-Quelle: ='12 LICHT UND WASSER'!L36
+cell("F27", "lighting_kwh_a")(_num)
+# Sonstiges
+_const_cell("F28", 0.0)
+_const_cell("G28", 0.0)
+# Nutzer (Prozess)
+# Excel-Quelle: ='10 INNERE WÄRMEQUELLEN'!N49
+cell("F29", "user_process_kwh_a")(_num)
+_specific_cells("22", "24", "25", "27", "29")
+
+# Nutzenergiebedarf
+# Excel-Formel: =SUM(F22:F29) / =SUM(G22:G29)
+_sum_cell("F30", *(f"F{row}" for row in range(22, 30)))
+_sum_cell("G30", *(f"G{row}" for row in range(22, 30)))
+
+# -------------------------
+# Endenergie Wärme (F38..F42)
+# -------------------------
+# Heizwärme, Excel-Formel: =E38*(F22) ; E38 = 1
+cell("F38", "F22")(lambda f22: 1.0 * f22)
+# Übergabe Heiz/Wasser, Excel-Formel: =F22*$E39
+cell("F39", "F22")(lambda f22: f22 * E39)
+# Verteilung Heiz/Wasser, Excel-Formel: =E40*(F22+F39)
+cell("F40", "F22", "F39")(lambda f22, f39: E40 * (f22 + f39))
+# Speicherung Heiz/Wasser, Excel-Formel: =E41*(F22+F39+F40)
+cell("F41", "F22", "F39", "F40")(lambda f22, f39, f40: E41 * (f22 + f39 + f40))
+# - Erzeugung Solar, Excel-Formel: =-F22*$E42
+cell("F42", "F22", "E42")(lambda f22, e42: -f22 * e42)
+_specific_cells("38", "39", "40", "41", "42")
+
+# Erzeugernutzwärmeabgabe
+# Excel-Formel: =SUM(F38:F42) / =SUM(G38:G42)
+_sum_cell("F43", "F38", "F39", "F40", "F41", "F42")
+_sum_cell("G43", "G38", "G39", "G40", "G41", "G42")
+
+# -------------------------
+# Endenergie (F46..F53)
+# -------------------------
+# Excel-Formeln:
+# C46 =IF(OR('00 GEBÄUDEDATEN'!F136="Luft/Wasser Wärmepumpe"; '00 GEBÄUDEDATEN'!F136="Wasser/Wasser Wärmepumpe");1;0)
+# E46 =IFERROR(1/'00 GEBÄUDEDATEN'!F137;0)
+# F46 =$F$43*$E46*C46
+_const_cell("E46", 0.0)
+cell("F46", "F43", "E46")(lambda f43, e46: f43 * e46 * C46)
+# Fernwärme, C47 =IF('00 GEBÄUDEDATEN'!F136="Fernwärme";1;0)
+cell("F47", "F43")(lambda f43: f43 * E47 * C47)
+# Gas, C48 =IF('00 GEBÄUDEDATEN'!F136="Gasheizung";1;0)
+cell("F48", "F43")(lambda f43: f43 * E48 * C48)
+# Hilfsenergie Heizung, Excel-Formel: =$F$43*$E49
+cell("F49", "F43")(lambda f43: f43 * E49)
+# Trinkwarmwasser, Excel-Formel: =F24
+cell("F50", "F24")(lambda f24: f24)
+# Luftförderung, Excel-Formel: =F25*$E51
+cell("F51", "F25")(lambda f25: f25 * E51)
+# Beleuchtung, Excel-Formel: =F27*$E52
+cell("F52", "F27")(lambda f27: f27 * E52)
+# Nutzer (Prozess), Excel-Formel: =F29*$E53
+cell("F53", "F29")(lambda f29: f29 * E53)
+_specific_cells("46", "47", "48", "49", "50", "51", "52", "53")
+
+# Endenergiebedarf
+# Excel-Formel: =SUM(F46:F53) / =SUM(G46:G53)
+_sum_cell("F54", *(f"F{row}" for row in range(46, 54)))
+_sum_cell("G54", *(f"G{row}" for row in range(46, 54)))
+
+# -------------------------
+# Endenergie Strom (F59..F66)
+# -------------------------
+# Excel: E59 = C46 ; F59 = E59*F46
+_const_cell("E59", C46)
+cell("F59", "E59", "F46")(lambda e59, f46: e59 * f46)
+# FW / Gas sind Strom = 0
+_const_cell("F60", 0.0)
+_const_cell("G60", 0.0)
+_const_cell("F61", 0.0)
+_const_cell("G61", 0.0)
+# Hilfsenergie Heizung: =F49
+cell("F62", "F49")(lambda f49: f49)
+# Trinkwarmwasser (wenn El.): =E63*F50 ; E63=1
+cell("F63", "F50")(lambda f50: 1.0 * f50)
+# Luftförderung / Beleuchtung / Nutzer
+cell("F64", "F51")(lambda f51: f51)
+cell("F65", "F52")(lambda f52: f52)
+cell("F66", "F53")(lambda f53: f53)
+_specific_cells("59", "62", "63", "64", "65", "66")
+
+# Endenergiebedarf Strom: =SUM(F59:F66) / =SUM(G59:G66)
+_sum_cell("F67", *(f"F{row}" for row in range(59, 67)))
+_sum_cell("G67", *(f"G{row}" for row in range(59, 67)))
+
+# -------------------------
+# Primärenergie (F75..F79)
+# -------------------------
+# Wärme Solar: =$F$42*E75  (E75=0 in Excel)
+_const_cell("F75", 0.0)
+# Wärme Fernwärme: =F47*E76 (E76=0,25)
+cell("F76", "F47")(lambda f47: f47 * 0.25)
+# Wärme Gas: =F48*E77 (E77=1,1)
+cell("F77", "F48")(lambda f48: f48 * 1.1)
+
+# Strom (On-Site)
+# Excel-Quelle: '05 PHOTOVOLTAIK'!Q111 und F68/I78/E78 etc.
+# Dein Excel referenziert F68 – das ist in deiner Tabelle "Endenergiebedarf Strom" (F67 hier).
+# Wir verwenden: F68 ~ F67 (Endenergiebedarf Strom kWh/a) als Näherung.
+cell("pv_total", "pv_total_kwh_a")(_num)  # '05 PHOTOVOLTAIK'!Q111
+
+
+@cell("F78", "F67", "pv_total")
+def _(f68_like, pv_total):
     # Excel-Formel:
     # =IF(PV_total > F68; F68*I78*E78; PV_total*I78*E78)
-    base_on = F68_like if pv_total > F68_like else pv_total
-    F78 = base_on * I78 * E78
-    G78 = _safe_div(F78, NGF_t)
+    base_on = f68_like if pv_total > f68_like else pv_total
+    return base_on * I78 * E78
 
-    # Strom (Off-Site): =$F$68*I79*E79 ; E79=1,8 ; I79=1-I75-I76
-    # I75/I76 bei dir kommen aus PV-Aufteilung; noch nicht modelliert -> wir setzen I79 = 1 - I78 als pragmatisches Default
-    I79 = max(0.0, 1.0 - I78)
-    E79 = 1.8
-    F79 = F68_like * I79 * E79
-    G79 = _safe_div(F79, NGF_t)
 
-    # Primärenergiebedarf: =SUM(F75:F79), =SUM(G75:G79)
-    F80 = F75 + F76 + F77 + F78 + F79
-    G80 = G75 + G76 + G77 + G78 + G79
+# Strom (Off-Site): =$F$68*I79*E79 ; E79=1,8 ; I79=1-I75-I76
+# I75/I76 bei dir kommen aus PV-Aufteilung; noch nicht modelliert -> wir setzen I79 = 1 - I78 als pragmatisches Default
+_const_cell("I79", max(0.0, 1.0 - I78))
+cell("F79", "F67", "I79")(lambda f68_like, i79: f68_like * i79 * E79)
+_specific_cells("75", "76", "77", "78", "79")
+
+# Primärenergiebedarf: =SUM(F75:F79), =SUM(G75:G79)
+_sum_cell("F80", *(f"F{row}" for row in range(75, 80)))
+_sum_cell("G80", *(f"G{row}" for row in range(75, 80)))
+
 
+@cell("F87", "pv_total", "F78")
+def _(pv_total, f78):
     # Überschuss Strom (On-Site):
     # Excel-Formel: ='05 PHOTOVOLTAIK'!Q111-'01 ERGEBNIS ENERGIE'!F78/E78
     # Hinweis: F78/E78 gibt den kWh/a-Anteil zurück (weil E78=-1,8), passt als Rückrechnung.
-    F87 = pv_total - _safe_div(F78, E78) if E78 != 0 else pv_total
-    G87 = _safe_div(F87, NGF_t)
+    return pv_total - _safe_div(f78, E78) if E78 != 0 else pv_total
 
-    # =========================
-    # GWP (Zusatzblock für Summary-Übersicht)
-    # =========================
-    m = getattr(building, "gwp_manufacturing", None)
-    c = getattr(building, "gwp_compensation", None)
 
-    gwp_manufacturing_total = _num(getattr(m, "total_gwp", 0)) if m else 0.0
-    gwp_manufacturing_new_py = _num(getattr(m, "new_per_year", 0)) if m else 0.0
-    gwp_manufacturing_existing_py = _num(getattr(m, "existing_per_year", 0)) if m else 0.0
+_specific_cells("87")
 
-    gwp_operation_py = _num(getattr(c, "operation_total_per_year", 0)) if c else 0.0
-    gwp_sum_without_existing_py = _num(getattr(c, "sum_without_existing", 0)) if c else 0.0
-    gwp_sum_with_existing_py = _num(getattr(c, "sum_with_existing", 0)) if c else 0.0
+# GWP (Zusatzblock für Summary-Übersicht): Eingaben werden durchgereicht
+for _name in SHEET01_GWP_FIELDS:
+    cell(_name + "_value", _name)(_num)
 
 
-    return {
-        # Nutzenergie
-        "F22": round(F22, 3), "G22": round(G22, 3),
-        "F24": round(F24, 3), "G24": round(G24, 3),
-        "F25": round(F25, 3), "G25": round(G25, 3),
-        "F27": round(F27, 3), "G27": round(G27, 3),
-        "F29": round(F29, 3), "G29": round(G29, 3),
-        "F30": round(F30, 3), "G30": round(G30, 3),
+def _downstream_closure() -> Dict[str, frozenset]:
+    """Für jeden Knoten: alle Zellen, die direkt oder indirekt davon abhängen."""
+    direct: Dict[str, set] = {name: set() for name in SHEET01_INPUTS}
+    direct.update({name: set() for name in SHEET01_CELLS})
+    for name, (deps, _) in SHEET01_CELLS.items():
+        for dep in deps:
+            if dep not in direct:
+                raise ValueError(f"Zelle {name}: unbekannte Abhängigkeit {dep}")
+            direct[dep].add(name)
 
-        # Endenergie Wärme
-        "F38": round(F38, 3), "G38": round(G38, 3),
-        "F39": round(F39, 3), "G39": round(G39, 3),
-        "F40": round(F40, 3), "G40": round(G40, 3),
-        "F41": round(F41, 3), "G41": round(G41, 3),
-        "F42": round(F42, 3), "G42": round(G42, 3),
-        "F43": round(F43, 3), "G43": round(G43, 3),
+    closure: Dict[str, frozenset] = {}
 
-        # Endenergie gesamt
-        "E46": round(E46, 3), "F46": round(F46, 3), "G46": round(G46, 3),
-        "F47": round(F47, 3), "G47": round(G47, 3),
-        "F48": round(F48, 3), "G48": round(G48, 3),
-        "F49": round(F49, 3), "G49": round(G49, 3),
-        "F50": round(F50, 3), "G50": round(G50, 3),
-        "F51": round(F51, 3), "G51": round(G51, 3),
-        "F52": round(F52, 3), "G52": round(G52, 3),
-        "F53": round(F53, 3), "G53": round(G53, 3),
-        "F54": round(F54, 3), "G54": round(G54, 3),
+    def visit(node):
+        if node not in closure:
+            found = set()
+            for child in direct[node]:
+                found.add(child)
+                found |= visit(child)
+            closure[node] = frozenset(found)
+        return closure[node]
 
-        # Endenergie Strom
-        "E59": round(E59, 3),
-        "F59": round(F59, 3), "G59": round(G59, 3),
-        "F60": round(F60, 3), "G60": round(G60, 3),
-        "F61": round(F61, 3), "G61": round(G61, 3),
-        "F62": round(F62, 3), "G62": round(G62, 3),
-        "F63": round(F63, 3), "G63": round(G63, 3),
-        "F64": round(F64, 3), "G64": round(G64, 3),
-        "F65": round(F65, 3), "G65": round(G65, 3),
-        "F66": round(F66, 3), "G66": round(G66, 3),
-        "F67": round(F67, 3), "G67": round(G67, 3),
+    for node in direct:
+        visit(node)
+    return closure
 
-        # Primärenergie
-        "F75": round(F75, 3), "G75": round(G75, 3),
-        "F76": round(F76, 3), "G76": round(G76, 3),
-        "F77": round(F77, 3), "G77": round(G77, 3),
-        "F78": round(F78, 3), "G78": round(G78, 3),
-        "F79": round(F79, 3), "G79": round(G79, 3),
-        "F80": round(F80, 3), "G80": round(G80, 3),
 
-        # Deckungsanteil Off-Site als Info
-        "I79": f"{round(I79 * 100, 1)}%",
+SHEET01_DOWNSTREAM = _downstream_closure()
 
+# Ausgabezellen (Reihenfolge wie im Template) -> Zelle im Graphen
+SHEET01_OUTPUT: Dict[str, str] = {
+    key: key
+    for key in (
+        # Nutzenergie
+        "F22", "G22", "F24", "G24", "F25", "G25", "F27", "G27", "F29", "G29", "F30", "G30",
+        # Endenergie Wärme
+        "F38", "G38", "F39", "G39", "F40", "G40", "F41", "G41", "F42", "G42", "F43", "G43",
+        # Endenergie gesamt
+        "E46", "F46", "G46", "F47", "G47", "F48", "G48", "F49", "G49", "F50", "G50",
+        "F51", "G51", "F52", "G52", "F53", "G53", "F54", "G54",
+        # Endenergie Strom
+        "E59", "F59", "G59", "F60", "G60", "F61", "G61", "F62", "G62", "F63", "G63",
+        "F64", "G64", "F65", "G65", "F66", "G66", "F67", "G67",
+        # Primärenergie
+        "F75", "G75", "F76", "G76", "F77", "G77", "F78", "G78", "F79", "G79", "F80", "G80",
+        # Deckungsanteil Off-Site als Info
+        "I79",
         # Überschuss
-        "F87": round(F87, 3), "G87": round(G87, 3),
+        "F87", "G87",
+    )
+}
+# GWP Summary
+SHEET01_OUTPUT.update({name: name + "_value" for name in SHEET01_GWP_FIELDS})
 
-        # GWP Summary
-        "gwp_manufacturing_total": round(gwp_manufacturing_total, 3),
-        "gwp_manufacturing_new_per_year": round(gwp_manufacturing_new_py, 3),
-        "gwp_manufacturing_existing_per_year": round(gwp_manufacturing_existing_py, 3),
 
-        "gwp_operation_per_year": round(gwp_operation_py, 3),
-        "gwp_sum_without_existing_per_year": round(gwp_sum_without_existing_py, 3),
-        "gwp_sum_with_existing_per_year": round(gwp_sum_with_existing_py, 3),
+def _format(key: str, value: float) -> Any:
+    if key == "I79":
+        return f"{round(value * 100, 1)}%"
+    return round(value, 3)
+
+
+class Sheet01Graph:
+    """
+    Memoisierte Auswertung des Zellgraphen für ein Gebäude.
+
+    set_inputs() verwirft nur die Zellen, die von geänderten Eingaben
+    abhängen; values() rechnet nur angefragte und noch nicht bekannte Zellen.
+    """
 
+    def __init__(self, inputs: Optional[Dict[str, Any]] = None):
+        self.inputs: Dict[str, Any] = dict.fromkeys(SHEET01_INPUTS, 0.0)
+        self._values: Dict[str, float] = {}
+        self.evaluations = 0  # Anzahl tatsächlich berechneter Zellen
+        if inputs:
+            self.set_inputs(inputs)
+
+    def set_inputs(self, inputs: Dict[str, Any]) -> set:
+        """Übernimmt geänderte Eingaben; Rückgabe: verworfene Zellen."""
+        invalid = set()
+        for name, value in inputs.items():
+            if name not in self.inputs:
+                raise KeyError(f"Unbekannte Eingabe: {name}")
+            if self.inputs[name] != value:
+                self.inputs[name] = value
+                invalid |= SHEET01_DOWNSTREAM[name]
+        for name in invalid:
+            self._values.pop(name, None)
+        return invalid
+
+    def value(self, name: str) -> Any:
+        if name in self.inputs:
+            return self.inputs[name]
+        if name not in self._values:
+            deps, func = SHEET01_CELLS[name]
+            self._values[name] = func(*(self.value(dep) for dep in deps))
+            self.evaluations += 1
+        return self._values[name]
+
+    def values(self, cells: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Gerundete Ausgabewerte (alle oder nur `cells`, unbekannte werden ignoriert)."""
+        keys = SHEET01_OUTPUT if cells is None else [k for k in cells if k in SHEET01_OUTPUT]
+        return {key: _format(key, self.value(SHEET01_OUTPUT[key])) for key in keys}
+
+
+def sheet01_inputs(building: Building, sheet: EnergyResultSheet01) -> Dict[str, Any]:
+    """Eingaben des Zellgraphen aus Gebäude, externen Quellen und Blatt 01."""
+    ext = build_external_sources(building)
+
+    m = getattr(building, "gwp_manufacturing", None)
+    c = getattr(building, "gwp_compensation", None)
+
+    return {
+        "heating_kwh_a": ext.heating_kwh_a,
+        "dhw_kwh_a": ext.dhw_kwh_a,
+        "ventilation_kwh_a": ext.ventilation_kwh_a,
+        "lighting_kwh_a": ext.lighting_kwh_a,
+        "user_process_kwh_a": ext.user_process_kwh_a,
+        "pv_total_kwh_a": ext.pv_total_kwh_a,
+        "ngf_m2": ext.ngf_m2,
+        "E42_solar_generation_factor": sheet.E42_solar_generation_factor,
+        "gwp_manufacturing_total": _num(getattr(m, "total_gwp", 0)) if m else 0.0,
+        "gwp_manufacturing_new_per_year": _num(getattr(m, "new_per_year", 0)) if m else 0.0,
+        "gwp_manufacturing_existing_per_year": _num(getattr(m, "existing_per_year", 0)) if m else 0.0,
+        "gwp_operation_per_year": _num(getattr(c, "operation_total_per_year", 0)) if c else 0.0,
+        "gwp_sum_without_existing_per_year": _num(getattr(c, "sum_without_existing", 0)) if c else 0.0,
+        "gwp_sum_with_existing_per_year": _num(getattr(c, "sum_with_existing", 0)) if c else 0.0,
     }
+
+
+def evaluate_sheet01(
+    inputs: Dict[str, Any],
+    cells: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Wertet den Zellgraphen für fertige Eingaben (siehe sheet01_inputs) aus;
+    mit `cells` nur diese Zellen und ihre Vorgänger. Ergebnisse über Requests
+    hinweg hält logic/sheet01_cache.py (keine zweite Cache-Ebene hier).
+    """
+    return Sheet01Graph(inputs).values(cells)
+
+
+@timed("calculate_sheet01")
+def calculate_sheet01(
+    building: Building,
+    sheet: EnergyResultSheet01,
+    cells: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Gibt ein Dict zurück, das du 1:1 als `calc.*` im Template nutzt.
+    Benennung orientiert sich an deinen Excel-Zellen (F22, G22, ...).
+
+    Mit `cells` werden nur diese Zellen (plus Vorgänger) berechnet.
+    """
+    return evaluate_sheet01(sheet01_inputs(building, sheet), cells)
+
+
+def _safe_div_arr(a, b):
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    out = np.zeros(a.shape)
+    np.divide(a, b, out=out, where=(b != 0))
+    return out
+
+
+@timed("calculate_sheet01_batch")
+def calculate_sheet01_batch(inputs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Vektorisierte Variante von calculate_sheet01 für N Gebäude/Stichproben.
+
+    `inputs` enthält je Feld aus SHEET01_INPUT_FIELDS ein Array (fehlende
+    Felder = 0). Rückgabe: dieselben Zellen wie calculate_sheet01, aber
+    ungerundet als float64-Arrays (ohne die Info-Zelle "I79").
+    """
+    n = max(np.size(v) for v in inputs.values())
+
+    def col(name):
+        value = inputs.get(name)
+        if value is None:
+            return np.zeros(n)
+        return np.nan_to_num(np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)))
+
+    # fixe Excel-Faktoren E39..E79, I78 und C46..C48: Modulkonstanten oben
+    I79 = max(0.0, 1.0 - I78)
+
+    E42 = col("E42_solar_generation_factor")
+    NGF_t = col("ngf_m2")
+    NGF_t = np.where(NGF_t <= 0, 0.0, NGF_t)
+    zero = np.zeros(n)
+
+    c = {}
+
+    def spec(cell):
+        return _safe_div_arr(c["F" + cell], NGF_t)
+
+    # Nutzenergie
+    c["F22"] = col("heating_kwh_a")
+    c["F24"] = col("dhw_kwh_a")
+    c["F25"] = col("ventilation_kwh_a")
+    c["F27"] = col("lighting_kwh_a")
+    c["F29"] = col("user_process_kwh_a")
+    for cell in ("22", "24", "25", "27", "29"):
+        c["G" + cell] = spec(cell)
+    c["F30"] = c["F22"] + 0.0 + c["F24"] + c["F25"] + 0.0 + c["F27"] + 0.0 + c["F29"]
+    c["G30"] = c["G22"] + 0.0 + c["G24"] + c["G25"] + 0.0 + c["G27"] + 0.0 + c["G29"]
+
+    # Endenergie Wärme
+    F22 = c["F22"]
+    c["F38"] = 1.0 * F22
+    c["F39"] = F22 * E39
+    c["F40"] = E40 * (F22 + c["F39"])
+    c["F41"] = E41 * (F22 + c["F39"] + c["F40"])
+    c["F42"] = -F22 * E42
+    for cell in ("38", "39", "40", "41", "42"):
+        c["G" + cell] = spec(cell)
+    c["F43"] = c["F38"] + c["F39"] + c["F40"] + c["F41"] + c["F42"]
+    c["G43"] = c["G38"] + c["G39"] + c["G40"] + c["G41"] + c["G42"]
+
+    # Endenergie (Systemschalter C46..C48 wie skalar)
+    c["E46"] = zero
+    c["F46"] = c["F43"] * 0.0 * C46
+    c["F47"] = c["F43"] * E47 * C47
+    c["F48"] = c["F43"] * E48 * C48
+    c["F49"] = c["F43"] * E49
+    c["F50"] = c["F24"]
+    c["F51"] = c["F25"] * E51
+    c["F52"] = c["F27"] * E52
+    c["F53"] = c["F29"] * E53
+    for cell in ("46", "47", "48", "49", "50", "51", "52", "53"):
+        c["G" + cell] = spec(cell)
+    c["F54"] = (c["F46"] + c["F47"] + c["F48"] + c["F49"]
+                + c["F50"] + c["F51"] + c["F52"] + c["F53"])
+    c["G54"] = (c["G46"] + c["G47"] + c["G48"] + c["G49"]
+                + c["G50"] + c["G51"] + c["G52"] + c["G53"])
+
+    # Endenergie Strom
+    c["E59"] = zero + C46
+    c["F59"] = C46 * c["F46"]
+    c["F60"] = zero
+    c["F61"] = zero
+    c["F62"] = c["F49"]
+    c["F63"] = 1.0 * c["F50"]
+    c["F64"] = c["F51"]
+    c["F65"] = c["F52"]
+    c["F66"] = c["F53"]
+    for cell in ("59", "62", "63", "64", "65", "66"):
+        c["G" + cell] = spec(cell)
+    c["G60"] = zero
+    c["G61"] = zero
+    c["F67"] = (c["F59"] + c["F60"] + c["F61"] + c["F62"]
+                + c["F63"] + c["F64"] + c["F65"] + c["F66"])
+    c["G67"] = (c["G59"] + c["G60"] + c["G61"] + c["G62"]
+                + c["G63"] + c["G64"] + c["G65"] + c["G66"])
+
+    # Primärenergie
+    F68_like = c["F67"]
+    pv_total = col("pv_total_kwh_a")
+    base_on = np.where(pv_total > F68_like, F68_like, pv_total)
+    c["F75"] = zero
+    c["F76"] = c["F47"] * 0.25
+    c["F77"] = c["F48"] * 1.1
+    c["F78"] = base_on * I78 * E78
+    c["F79"] = F68_like * I79 * E79
+    for cell in ("75", "76", "77", "78", "79"):
+        c["G" + cell] = spec(cell)
+    c["F80"] = c["F75"] + c["F76"] + c["F77"] + c["F78"] + c["F79"]
+    c["G80"] = c["G75"] + c["G76"] + c["G77"] + c["G78"] + c["G79"]
+
+    # Überschuss Strom
+    c["F87"] = pv_total - c["F78"] / E78
+    c["G87"] = spec("87")
+
+    # GWP (durchgereicht)
+    for name in SHEET01_GWP_FIELDS:
+        c[name] = col(name)
+
+    return c
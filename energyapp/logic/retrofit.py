@@ -0,0 +1,194 @@
+"""
+Sanierungs-Optimierer: günstigste Maßnahmenkombination für einen Ziel-Heizwärmebedarf.
+
+Ausgangspunkt ist ein Gebäude und ein Maßnahmenkatalog (neue U-Werte für
+Wand/Dach/Boden/Fenster, neue g-Werte, jeweils mit Kosten). Je Bauteil wird
+höchstens eine Maßnahme gewählt ("keine Maßnahme" ist immer möglich).
+
+Das Modell in calc_heating_demand ist linear in den U- und g-Werten:
+Q_h = max(0, Q_V + Q_T - Q_I - Q_S). Die Wirkung jeder Einzelmaßnahme
+(dQ gegenüber dem Bestand) wird deshalb einmal mit calc_heating_demand_batch
+bestimmt; alle Kombinationen ergeben sich danach per Broadcasting als
+Summe der Einzelwirkungen – ohne je Kombination neu zu rechnen.
+"""
+import math
+
+import numpy as np
+
+from energyapp.logic.building import HEATING_INPUT_FIELDS, calc_heating_demand_batch
+
+MAX_COMBINATIONS = 2_000_000
+
+# Bauteil -> (geänderte U-Wert-Spalte, Bezugsfläche aus calc_heating_demand)
+COMPONENTS = {
+    "wall": ("u_wall", "opaque_wall_area"),
+    "roof": ("u_roof", "roof_area"),
+    "floor": ("u_floor", "floor_area"),
+    "window": ("u_window", "window_area"),
+}
+G_FIELDS = ("g_n", "g_e", "g_s", "g_w")
+
+# Standard-Katalog (grobe Richtwerte, Kosten je m² Bauteilfläche)
+DEFAULT_MEASURES = [
+    {"component": "wall", "name": "WDVS 12 cm", "u": 0.28, "cost_per_m2": 140},
+    {"component": "wall", "name": "WDVS 20 cm", "u": 0.18, "cost_per_m2": 180},
+    {"component": "roof", "name": "Dach 20 cm", "u": 0.20, "cost_per_m2": 160},
+    {"component": "roof", "name": "Dach 30 cm", "u": 0.14, "cost_per_m2": 210},
+    {"component": "floor", "name": "Kellerdecke 10 cm", "u": 0.30, "cost_per_m2": 60},
+    {"component": "window", "name": "2-fach Wärmeschutz", "u": 1.1, "g": 0.60, "cost_per_m2": 450},
+    {"component": "window", "name": "3-fach Wärmeschutz", "u": 0.7, "g": 0.50, "cost_per_m2": 600},
+    {"component": "window", "name": "3-fach Sonnenschutz", "u": 0.7, "g": 0.35, "cost_per_m2": 650},
+]
+
+
+class RetrofitError(ValueError):
+    pass
+
+
+def _number(m, key, minimum=0.0, maximum=None):
+    value = m[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise RetrofitError(f"Maßnahme {m.get('name')!r}: {key!r} muss eine Zahl sein")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise RetrofitError(f"Maßnahme {m.get('name')!r}: {key!r} außerhalb des zulässigen Bereichs")
+
+
+def _validate(measures):
+    if not isinstance(measures, (list, tuple)):
+        raise RetrofitError("measures muss eine Liste von Maßnahmen sein")
+    for m in measures:
+        if not isinstance(m, dict):
+            raise RetrofitError(f"Maßnahme muss ein Objekt sein, nicht {m!r}")
+        if not isinstance(m.get("name"), str) or not m["name"]:
+            raise RetrofitError(f"Maßnahme ohne Namen: {m!r}")
+        if m.get("component") not in COMPONENTS:
+            raise RetrofitError(
+                f"Unbekanntes Bauteil {m.get('component')!r} ({', '.join(COMPONENTS)})"
+            )
+        if "u" not in m and "g" not in m:
+            raise RetrofitError(f"Maßnahme {m.get('name')!r}: 'u' oder 'g' fehlt")
+        if "g" in m and m["component"] != "window":
+            raise RetrofitError(f"Maßnahme {m.get('name')!r}: 'g' nur für Fenster")
+        if "cost" not in m and "cost_per_m2" not in m:
+            raise RetrofitError(f"Maßnahme {m.get('name')!r}: 'cost' oder 'cost_per_m2' fehlt")
+        for key, maximum in (("u", None), ("g", 1.0), ("cost", None), ("cost_per_m2", None)):
+            if key in m:
+                _number(m, key, maximum=maximum)
+
+
+def _q_h_raw(result):
+    # Heizwärmebedarf vor der Begrenzung auf >= 0
+    return result["Q_V"] + result["Q_T"] - result["Q_I"] - result["Q_S"]
+
+
+def measure_effects(building, measures):
+    """
+    Wirkung jeder Einzelmaßnahme: dQ_h (ungekappt) und Kosten.
+    Alle Varianten werden in einem einzigen Batch-Aufruf gerechnet.
+    """
+    base = {field: float(getattr(building, field)) for field in HEATING_INPUT_FIELDS}
+    n = len(measures) + 1  # Zeile 0 = Bestand
+    inputs = {field: np.full(n, value) for field, value in base.items()}
+
+    for i, m in enumerate(measures, start=1):
+        u_field, _ = COMPONENTS[m["component"]]
+        if "u" in m:
+            inputs[u_field][i] = float(m["u"])
+        if "g" in m:
+            for g_field in G_FIELDS:
+                inputs[g_field][i] = float(m["g"])
+
+    result = calc_heating_demand_batch(inputs)
+    raw = _q_h_raw(result)
+
+    effects = []
+    for i, m in enumerate(measures, start=1):
+        _, area_key = COMPONENTS[m["component"]]
+        area = float(result[area_key][0])
+        cost = float(m["cost"]) if "cost" in m else float(m["cost_per_m2"]) * area
+        effects.append({**m, "dQ": float(raw[i] - raw[0]), "cost": round(cost, 2)})
+
+    return {
+        "base_raw": float(raw[0]),
+        "base_Q_h": float(result["Q_h"][0]),
+        "ngf_t": float(result["ngf_t"][0]),
+        "effects": effects,
+    }
+
+
+def optimize_retrofit(building, target_specific, measures=None):
+    """
+    Sucht die günstigste Kombination mit Q_h / NGF_t <= target_specific [kWh/m²a]
+    und liefert zusätzlich die Pareto-Front Kosten vs. Q_h.
+    """
+    measures = DEFAULT_MEASURES if measures is None else measures
+    _validate(measures)
+
+    info = measure_effects(building, measures)
+    ngf_t = info["ngf_t"]
+    if ngf_t <= 0:
+        raise RetrofitError("NGF_t des Gebäudes ist 0 – kein spezifischer Bedarf möglich")
+
+    # Optionen je Bauteil: Index 0 = keine Maßnahme
+    slots = []
+    for component in COMPONENTS:
+        options = [e for e in info["effects"] if e["component"] == component]
+        if options:
+            slots.append((component, [None] + options))
+
+    combinations = 1
+    for _, options in slots:
+        combinations *= len(options)
+    if combinations > MAX_COMBINATIONS:
+        raise RetrofitError(f"Zu viele Kombinationen ({combinations} > {MAX_COMBINATIONS})")
+
+    # Kosten und dQ aller Kombinationen per äußerer Summe (Broadcasting)
+    cost = np.zeros(())
+    d_q = np.zeros(())
+    for _, options in slots:
+        cost = np.add.outer(cost, [0.0] + [o["cost"] for o in options[1:]])
+        d_q = np.add.outer(d_q, [0.0] + [o["dQ"] for o in options[1:]])
+    shape = cost.shape
+    cost = cost.ravel()
+    q_h = np.maximum(0.0, info["base_raw"] + d_q.ravel())
+    specific = q_h / ngf_t
+
+    def describe(flat_index):
+        idx = np.unravel_index(flat_index, shape) if shape else ()
+        chosen = [
+            options[k]["name"] for (_, options), k in zip(slots, idx) if k
+        ]
+        return {
+            "measures": chosen,
+            "cost": round(float(cost[flat_index]), 2),
+            "Q_h": round(float(q_h[flat_index]), 1),
+            "specific": round(float(specific[flat_index]), 2),
+        }
+
+    feasible = np.flatnonzero(specific <= target_specific)
+    best = None
+    if feasible.size:
+        # günstigste zulässige Kombination, bei Gleichstand der geringere Bedarf
+        order = np.lexsort((q_h[feasible], cost[feasible]))
+        best = describe(feasible[order[0]])
+
+    # Pareto-Front: nach Kosten sortiert, nur Punkte mit echt kleinerem Q_h
+    order = np.lexsort((q_h, cost))
+    running_min = np.minimum.accumulate(q_h[order])
+    improves = np.concatenate(([True], running_min[1:] < running_min[:-1]))
+    pareto = [describe(i) for i in order[improves]]
+
+    return {
+        "target_specific": target_specific,
+        "base": {
+            "Q_h": round(info["base_Q_h"], 1),
+            "specific": round(info["base_Q_h"] / ngf_t, 2),
+        },
+        "combinations": combinations,
+        "best": best,
+        "pareto": pareto,
+        "measures": [
+            {k: e[k] for k in ("component", "name", "cost", "dQ")} for e in info["effects"]
+        ],
+    }
+
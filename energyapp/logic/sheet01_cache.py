@@ -0,0 +1,58 @@
+"""
+Ergebnis-Cache für Ergebnisblatt 01.
+
+Ergebnisse werden unter einem Hash ihrer Eingaben abgelegt (Gebäude,
+Blatt 01, Lüftung, GWP Herstellung/Kompensation). Der Hash wird bei jedem
+Aufruf aus den aktuellen Eingaben gebildet – die verknüpften Objekte
+bringt sheet01_buildings() per select_related in derselben Abfrage mit.
+Ein Treffer ist damit immer aktuell, auch wenn die Eingaben in einem
+anderen Prozess (Worker, recalculate_buildings, Jobs) geändert wurden;
+ein Verwerfen von Einträgen ist nicht nötig, alte fallen per LRU heraus.
+
+Backend: settings.CACHES[SHEET01_CACHE_ALIAS] (Standard: LocMemCache mit
+LRU-Verdrängung), austauschbar gegen Redis/Memcached. Das ist die einzige
+Cache-Ebene für Blatt 01; bei einem Fehlschlag wird der Zellgraph frisch
+ausgewertet.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from energyapp.logic.result_sheet_01 import evaluate_sheet01, sheet01_inputs
+
+# Bei Änderungen an den Formeln hochzählen -> alte Einträge werden nie mehr getroffen
+SHEET01_CACHE_VERSION = 1
+
+
+def _cache():
+    return caches[getattr(settings, "SHEET01_CACHE_ALIAS", "default")]
+
+
+def input_hash(inputs: Dict[str, Any]) -> str:
+    payload = json.dumps([SHEET01_CACHE_VERSION, sorted(inputs.items())], default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _result_key(digest: str) -> str:
+    return f"sheet01:res:{digest}"
+
+
+def cached_sheet01(building, sheet, cells: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """calculate_sheet01 mit Cache; gespeichert wird immer das komplette Blatt."""
+    inputs = sheet01_inputs(building, sheet)
+    if building.pk is None:
+        return evaluate_sheet01(inputs, cells)
+
+    cache = _cache()
+    key = _result_key(input_hash(inputs))
+    result = cache.get(key)
+    if result is None:
+        result = evaluate_sheet01(inputs)
+        cache.set(key, result, timeout=None)
+
+    if cells is None:
+        return result
+    return {key: result[key] for key in cells if key in result}
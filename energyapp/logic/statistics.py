@@ -0,0 +1,213 @@
+"""
+Portfolio-Kennzahlen (Modell PortfolioStatistics, genau eine Zeile).
+
+Jedes Gebäude und jeder GWP-Datensatz trägt einen festen "Beitrag" zu den
+Summen bei (building_contribution usw.). Bei einer Änderung wird nur die
+Differenz neuer minus alter Beitrag per UPDATE ... SET x = x + delta
+verbucht – das Dashboard liest dann eine Zeile statt die Gebäude-Tabelle
+zu aggregieren.
+
+Verbucht wird
+  - über Signale (energyapp/signals.py) bei save()/delete() einzelner Objekte,
+  - in den Massen-Schreibpfaden (Neuberechnung, Import, Löschen) über
+    track_buildings() bzw. apply_delta(), da bulk_* keine Signale senden.
+reconcile_statistics() rechnet alles neu (python manage.py reconcile_statistics)
+und gleicht Rundungsdrift und Schreibpfade ohne Verbuchung aus.
+"""
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db.models import BigIntegerField, Case, CharField, F, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from energyapp.models import Building, GwpCompensation, GwpManufacturing, PortfolioStatistics
+
+CHUNK_SIZE = 5000
+
+STATISTICS_PK = 1
+
+# Building-Felder, die in die Kennzahlen eingehen
+STAT_VALUE_FIELDS = ("result_Q_h", "ngf_t", "result_Q_PV_total", "result_Q_PV_on", "result_Q_PV_off")
+
+# Klassen des spezifischen Heizwärmebedarfs [kWh/m²a]: (Obergrenze, Feld)
+SPECIFIC_DEMAND_BINS = (
+    (50, "specific_lt_50"),
+    (100, "specific_50_100"),
+    (150, "specific_100_150"),
+    (200, "specific_150_200"),
+    (250, "specific_200_250"),
+    (None, "specific_ge_250"),
+)
+
+# Summenfelder der Statistik-Zeile (alles außer letztem Gebäude und Zeitstempeln)
+SUM_FIELDS = (
+    "building_count",
+    "q_h_count", "q_h_sum",
+    "specific_count", "specific_sum",
+    *(field for _, field in SPECIFIC_DEMAND_BINS),
+    "pv_total_sum", "pv_on_sum", "pv_off_sum",
+    "gwp_manufacturing_count", "gwp_manufacturing_sum",
+    "gwp_operation_count", "gwp_operation_sum",
+)
+
+MANUFACTURING_FIELDS = tuple(
+    f.name for f in GwpManufacturing._meta.concrete_fields if f.name not in ("id", "building")
+)
+COMPENSATION_FIELDS = tuple(
+    f.name for f in GwpCompensation._meta.concrete_fields if f.name not in ("id", "building")
+)
+
+
+def specific_bin(value):
+    for upper, field in SPECIFIC_DEMAND_BINS:
+        if upper is None or value < upper:
+            return field
+
+
+def building_contribution(values):
+    """Beitrag eines Gebäudes (Dict mit STAT_VALUE_FIELDS) zu den Summen."""
+    q_h = values["result_Q_h"]
+    ngf = values["ngf_t"]
+    delta = Counter(
+        building_count=1,
+        pv_total_sum=values["result_Q_PV_total"] or 0,
+        pv_on_sum=values["result_Q_PV_on"] or 0,
+        pv_off_sum=values["result_Q_PV_off"] or 0,
+    )
+    if q_h is not None:
+        delta["q_h_count"] += 1
+        delta["q_h_sum"] += q_h
+        if ngf:
+            specific = q_h / ngf
+            delta["specific_count"] += 1
+            delta["specific_sum"] += specific
+            delta[specific_bin(specific)] += 1
+    return delta
+
+
+def manufacturing_contribution(manufacturing):
+    return Counter(gwp_manufacturing_count=1, gwp_manufacturing_sum=manufacturing.total_per_year)
+
+
+def compensation_contribution(compensation):
+    return Counter(gwp_operation_count=1, gwp_operation_sum=compensation.operation_total_per_year)
+
+
+def subtract(new, old):
+    """new - old als Dict (Counter würde negative Werte verwerfen)."""
+    return {key: new.get(key, 0) - old.get(key, 0) for key in set(new) | set(old)}
+
+
+def _last_building_subquery(field):
+    return Subquery(Building.objects.order_by("-id").values(field)[:1])
+
+
+def apply_delta(delta, created=None, renamed=None, refresh_last=False):
+    """
+    Verbucht `delta` (Feld -> Änderung) mit einem UPDATE.
+    created:      (id, name) eines neuen Gebäudes – wird letztes Gebäude, falls id größer
+    renamed:      (id, name) – Name nachführen, falls es das letzte Gebäude ist
+    refresh_last: letztes Gebäude per Unterabfrage neu bestimmen (nach Löschungen)
+    """
+    updates = {key: F(key) + value for key, value in delta.items() if value}
+
+    if refresh_last:
+        updates["last_building_id"] = _last_building_subquery("id")
+        updates["last_building_name"] = Coalesce(_last_building_subquery("name"), Value(""))
+    elif created is not None:
+        pk, name = created
+        newer = Q(last_building_id__lt=pk) | Q(last_building_id__isnull=True)
+        updates["last_building_id"] = Case(
+            When(newer, then=Value(pk)), default=F("last_building_id"), output_field=BigIntegerField()
+        )
+        updates["last_building_name"] = Case(
+            When(newer, then=Value(name)), default=F("last_building_name"), output_field=CharField()
+        )
+    elif renamed is not None:
+        pk, name = renamed
+        updates["last_building_name"] = Case(
+            When(last_building_id=pk, then=Value(name)),
+            default=F("last_building_name"),
+            output_field=CharField(),
+        )
+
+    if not updates:
+        return
+    updates["updated_at"] = timezone.now()
+    if not PortfolioStatistics.objects.filter(pk=STATISTICS_PK).update(**updates):
+        # noch keine Zeile: komplett berechnen (enthält die Änderung bereits)
+        reconcile_statistics()
+
+
+def snapshot(ids):
+    """Summierte Beiträge der Gebäude `ids` inkl. ihrer GWP-Datensätze (3 Abfragen)."""
+    total = Counter()
+    for values in Building.objects.filter(id__in=ids).values(*STAT_VALUE_FIELDS):
+        total.update(building_contribution(values))
+    for values in GwpManufacturing.objects.filter(building_id__in=ids).values(*MANUFACTURING_FIELDS):
+        total.update(manufacturing_contribution(GwpManufacturing(**values)))
+    for values in GwpCompensation.objects.filter(building_id__in=ids).values(*COMPENSATION_FIELDS):
+        total.update(compensation_contribution(GwpCompensation(**values)))
+    return total
+
+
+@contextmanager
+def track_buildings(ids, refresh_last=False):
+    """
+    Für Massenänderungen an bestehenden Gebäuden (bulk_update, Löschen):
+    Beiträge vorher/nachher vergleichen und die Differenz verbuchen.
+    """
+    ids = list(ids)
+    before = snapshot(ids)
+    yield
+    apply_delta(subtract(snapshot(ids), before), refresh_last=refresh_last)
+
+
+def _sum_rows(queryset, fields, contribution, model=None):
+    total = Counter()
+    for values in queryset.values(*fields).iterator(chunk_size=CHUNK_SIZE):
+        total.update(contribution(model(**values) if model else values))
+    return total
+
+
+def compute_statistics():
+    """Alle Summen aus der Datenbank neu berechnen (gestreamt)."""
+    total = _sum_rows(Building.objects.all(), STAT_VALUE_FIELDS, building_contribution)
+    total.update(_sum_rows(
+        GwpManufacturing.objects.all(), MANUFACTURING_FIELDS, manufacturing_contribution, GwpManufacturing
+    ))
+    total.update(_sum_rows(
+        GwpCompensation.objects.all(), COMPENSATION_FIELDS, compensation_contribution, GwpCompensation
+    ))
+    last = Building.objects.order_by("-id").values("id", "name").first() or {}
+
+    values = {field: total.get(field, 0) for field in SUM_FIELDS}
+    values["last_building_id"] = last.get("id")
+    values["last_building_name"] = last.get("name", "")
+    return values
+
+
+def reconcile_statistics(values=None):
+    """Statistik-Zeile komplett neu schreiben (values: Ergebnis von compute_statistics)."""
+    values = dict(values or compute_statistics())
+    values["reconciled_at"] = timezone.now()
+    stats, _ = PortfolioStatistics.objects.update_or_create(pk=STATISTICS_PK, defaults=values)
+    return stats
+
+
+def get_statistics():
+    """Statistik-Zeile lesen (eine Abfrage); fehlt sie, wird sie einmal berechnet."""
+    return PortfolioStatistics.objects.filter(pk=STATISTICS_PK).first() or reconcile_statistics()
+
+
+def specific_distribution(stats):
+    """[(Beschriftung, Anzahl, Anteil %), ...] für das Dashboard."""
+    rows, lower = [], 0
+    for upper, field in SPECIFIC_DEMAND_BINS:
+        label = f"{lower}–{upper}" if upper is not None else f"≥ {lower}"
+        count = getattr(stats, field)
+        share = 100.0 * count / stats.specific_count if stats.specific_count else 0.0
+        rows.append((label, count, share))
+        lower = upper
+    return rows
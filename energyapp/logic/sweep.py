@@ -0,0 +1,194 @@
+"""
+Parameterstudie ("Sweep") für Gebäudevarianten.
+
+Ausgehend von einem Basis-Gebäude werden alle Kombinationen der angegebenen
+Parameterbereiche (kartesisches Produkt) berechnet – Heizwärmebedarf nach
+calc_heating_demand und Monatsbilanz nach EnergyCalculator. Gerechnet wird
+blockweise mit den Batch-Funktionen; große Gitter werden zusätzlich auf
+einen ProcessPoolExecutor verteilt. Die Ergebnisse kommen als Generator
+von Zeilen zurück und können so direkt gestreamt werden.
+
+Im Web-Request wird nur bis SYNC_SWEEP_LIMIT Varianten direkt (in einem
+Prozess) gerechnet; größere Gitter laufen als Hintergrund-Job "sweep".
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import numpy as np
+
+from energyapp.logic.building import HEATING_INPUT_FIELDS, calc_heating_demand_batch
+from energyapp.logic.climate import get_climate_store
+from energyapp.logic.load_profiles import MONTHLY_INPUT_FIELDS, calculate_monthly_batch
+
+# Alle Eingabefelder, die variiert werden dürfen
+SWEEP_FIELDS = tuple(dict.fromkeys(HEATING_INPUT_FIELDS + MONTHLY_INPUT_FIELDS))
+
+MAX_SWEEP_POINTS = 1_000_000
+# bis zu so vielen Varianten rechnet der View direkt, darüber als Hintergrund-Job
+SYNC_SWEEP_LIMIT = 100_000
+CHUNK_SIZE = 50_000
+# Ab dieser Gitter-Größe wird auf mehrere Prozesse verteilt
+PARALLEL_THRESHOLD = 200_000
+
+# Ergebnisspalten (zusätzlich zu den variierten Parametern)
+RESULT_COLUMNS = (
+    "Q_T",
+    "Q_V",
+    "Q_I",
+    "Q_S",
+    "Q_h",
+    "Q_h_specific",
+    "Q_PV_total",
+    "Q_PV_on",
+    "Q_PV_off",
+    "ngf_t",
+    "monthly_Q_h",
+    "monthly_specific_demand",
+)
+
+
+class SweepError(ValueError):
+    pass
+
+
+def parse_range(text):
+    """
+    "0.7:1.3:0.1" -> [0.7, 0.8, ..., 1.3]  (start:stop:schritt, inkl. stop)
+    "20,40,60"    -> [20.0, 40.0, 60.0]
+    "0.9"         -> [0.9]
+    """
+    text = text.strip().replace(" ", "")
+    try:
+        if ":" in text:
+            values = [float(part) for part in text.split(":")]
+            start, stop, step = values
+        else:
+            values = [float(part) for part in text.split(",") if part]
+    except ValueError as exc:
+        raise SweepError(f"Ungültiger Wert: {text}") from exc
+
+    if not all(math.isfinite(value) for value in values):
+        raise SweepError(f"Nur endliche Werte erlaubt: {text}")
+    if ":" not in text:
+        if len(values) > MAX_SWEEP_POINTS:
+            raise SweepError(f"Zu viele Werte ({len(values)} > {MAX_SWEEP_POINTS})")
+        return values
+
+    if step <= 0 or stop < start:
+        raise SweepError(f"Ungültiger Bereich: {text}")
+    # Anzahl prüfen, bevor etwas angelegt wird (z.B. 0:1e9:1 oder winzige Schritte)
+    points = (stop - start) / step
+    if not math.isfinite(points) or points + 1 > MAX_SWEEP_POINTS:
+        raise SweepError(f"Zu viele Werte in {text} (max. {MAX_SWEEP_POINTS})")
+    count = math.floor(points + 1e-9) + 1
+    return np.round(start + step * np.arange(count), 10).tolist()
+
+
+def parse_grid(params):
+    """Liest {feld: bereich} aus einem dict/QueryDict; unbekannte Schlüssel werden ignoriert."""
+    grid = {}
+    for field in SWEEP_FIELDS:
+        if field in params:
+            values = parse_range(params[field])
+            if not values:
+                raise SweepError(f"Keine Werte für {field}")
+            grid[field] = values
+    if not grid:
+        raise SweepError(
+            "Mindestens ein Parameterbereich nötig, z.B. u_window=0.7:1.3:0.1"
+        )
+    return grid
+
+
+def grid_size(grid):
+    size = 1
+    for values in grid.values():
+        size *= len(values)
+    return size
+
+
+def check_grid(grid):
+    """Anzahl der Varianten; SweepError über MAX_SWEEP_POINTS (auch vor dem Einstellen als Job)."""
+    total = grid_size(grid)
+    if total > MAX_SWEEP_POINTS:
+        raise SweepError(f"Zu viele Varianten ({total} > {MAX_SWEEP_POINTS})")
+    return total
+
+
+def _grid_chunks(base, grid, chunk_size):
+    """Zerlegt das kartesische Produkt in Blöcke von Eingabe-Spalten."""
+    fields = list(grid)
+    shape = [len(grid[f]) for f in fields]
+    total = grid_size(grid)
+    axes = [np.asarray(grid[f], dtype=np.float64) for f in fields]
+
+    for start in range(0, total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, total))
+        index = np.unravel_index(flat, shape)
+        inputs = {
+            field: np.full(flat.shape, base[field], dtype=np.float64)
+            for field in SWEEP_FIELDS
+        }
+        for field, axis, idx in zip(fields, axes, index):
+            inputs[field] = axis[idx]
+        yield inputs
+
+
+def evaluate_chunk(inputs, site=None):
+    """Berechnet einen Block von Varianten (auch in Worker-Prozessen nutzbar)."""
+    heating = calc_heating_demand_batch(inputs)
+    monthly = calculate_monthly_batch(inputs, get_climate_store().get(site))
+
+    ngf_t = heating["ngf_t"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        specific = np.where(ngf_t > 0, heating["Q_h"] / ngf_t, 0.0)
+
+    columns = {key: heating[key] for key in RESULT_COLUMNS if key in heating}
+    columns["Q_h_specific"] = specific
+    columns["monthly_Q_h"] = monthly["annual_heating_demand"]
+    columns["monthly_specific_demand"] = monthly["specific_demand"]
+    return columns
+
+
+def _rows(inputs, columns, fields):
+    values = [inputs[f].tolist() for f in fields] + [columns[c].tolist() for c in RESULT_COLUMNS]
+    return zip(*values)
+
+
+def run_sweep(building, grid, workers=None):
+    """
+    Prüft das Gitter und gibt einen Generator über die Ergebniszeilen zurück.
+
+    Erste Zeile: Kopfzeile (variierte Felder + RESULT_COLUMNS),
+    danach je Variante ein Tupel in derselben Reihenfolge.
+    """
+    total = check_grid(grid)
+    base = {field: float(getattr(building, field)) for field in SWEEP_FIELDS}
+    site = getattr(building, "standort", None)
+    return _iter_sweep(base, site, grid, total, workers)
+
+
+def _iter_sweep(base, site, grid, total, workers):
+    fields = list(grid)
+    yield tuple(fields) + RESULT_COLUMNS
+
+    chunks = _grid_chunks(base, grid, CHUNK_SIZE)
+
+    if total < PARALLEL_THRESHOLD or workers == 1:
+        for inputs in chunks:
+            yield from _rows(inputs, evaluate_chunk(inputs, site), fields)
+        return
+
+    # Große Gitter: Blöcke auf Prozesse verteilen, Reihenfolge bleibt erhalten
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        pending = []
+        for inputs in chunks:
+            pending.append((inputs, pool.submit(evaluate_chunk, inputs, site)))
+            if len(pending) >= 2 * workers:
+                done_inputs, future = pending.pop(0)
+                yield from _rows(done_inputs, future.result(), fields)
+        for done_inputs, future in pending:
+            yield from _rows(done_inputs, future.result(), fields)
@@ -0,0 +1,172 @@
+"""
+Monte-Carlo-Unsicherheitsanalyse für Heizwärmebedarf und Ergebnisblatt 01.
+
+Für die unsicheren Eingaben eines Gebäudes (U-Werte, Luftwechsel,
+Heizgradtage, Personen, ...) werden Verteilungen angegeben. Daraus werden
+N Stichproben als NumPy-Arrays gezogen und komplett vektorisiert durch
+calc_heating_demand_batch -> calculate_sheet01_batch gerechnet.
+Ergebnis: Kennwerte, Perzentile und Histogramme für Q_h, F54 und F80.
+"""
+import math
+
+import numpy as np
+
+from energyapp.logic.building import HEATING_INPUT_FIELDS, calc_heating_demand_batch
+from energyapp.logic.result_sheet_01 import build_external_sources, calculate_sheet01_batch
+
+DEFAULT_SAMPLES = 20_000
+MAX_SAMPLES = 500_000
+HISTOGRAM_BINS = 30
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Standard-Verteilungen, falls keine angegeben werden:
+# Normalverteilung um den Gebäudewert mit relativer Standardabweichung
+DEFAULT_DISTRIBUTIONS = {
+    "u_wall": {"dist": "normal", "rel_sd": 0.10},
+    "u_roof": {"dist": "normal", "rel_sd": 0.10},
+    "u_floor": {"dist": "normal", "rel_sd": 0.10},
+    "u_window": {"dist": "normal", "rel_sd": 0.10},
+    "air_change_rate": {"dist": "normal", "rel_sd": 0.20},
+    "degree_days": {"dist": "normal", "rel_sd": 0.10},
+    "persons": {"dist": "normal", "rel_sd": 0.20},
+}
+
+DISTRIBUTIONS = ("normal", "uniform", "triangular")
+
+
+class UncertaintyError(ValueError):
+    pass
+
+
+def parse_distribution(text):
+    """
+    Kurzschreibweise aus der URL:
+      "normal:0.05"          -> Normal, sd=0.05, Mittelwert = Gebäudewert
+      "normal:0.3:0.05"      -> Normal, mean=0.3, sd=0.05
+      "normal%:10"           -> Normal, relative sd = 10 %
+      "uniform:0.2:0.4"      -> Gleichverteilung [0.2, 0.4]
+      "triangular:0.2:0.3:0.4"
+    """
+    kind, _, rest = text.partition(":")
+    try:
+        values = [float(v) for v in rest.split(":") if v]
+    except ValueError as exc:
+        raise UncertaintyError(f"Ungültige Verteilung: {text}") from exc
+    if not all(math.isfinite(v) for v in values):
+        raise UncertaintyError(f"Ungültige Verteilung (nur endliche Zahlen): {text}")
+
+    if kind == "normal%" and len(values) == 1:
+        return {"dist": "normal", "rel_sd": values[0] / 100.0}
+    if kind == "normal" and len(values) == 1:
+        return {"dist": "normal", "sd": values[0]}
+    if kind == "normal" and len(values) == 2:
+        return {"dist": "normal", "mean": values[0], "sd": values[1]}
+    if kind == "uniform" and len(values) == 2:
+        return {"dist": "uniform", "low": values[0], "high": values[1]}
+    if kind == "triangular" and len(values) == 3:
+        return {"dist": "triangular", "low": values[0], "mode": values[1], "high": values[2]}
+    raise UncertaintyError(f"Ungültige Verteilung: {text}")
+
+
+def _finite(kind, *values):
+    # nan/inf ließen rng.normal/uniform mit ValueError bzw. OverflowError scheitern
+    if not all(math.isfinite(v) for v in values):
+        raise UncertaintyError(f"{kind}: Parameter müssen endliche Zahlen sein")
+
+
+def _sample(rng, spec, base, n):
+    kind = spec.get("dist", "normal")
+    if kind == "normal":
+        mean = spec.get("mean", base)
+        sd = spec["sd"] if "sd" in spec else abs(mean) * spec.get("rel_sd", 0.0)
+        _finite(kind, mean, sd)
+        if sd < 0:
+            raise UncertaintyError("Standardabweichung muss >= 0 sein")
+        values = rng.normal(mean, sd, n)
+    elif kind == "uniform":
+        _finite(kind, spec["low"], spec["high"], spec["high"] - spec["low"])
+        if spec["high"] < spec["low"]:
+            raise UncertaintyError("uniform: high < low")
+        values = rng.uniform(spec["low"], spec["high"], n)
+    elif kind == "triangular":
+        _finite(kind, spec["low"], spec["mode"], spec["high"], spec["high"] - spec["low"])
+        if not spec["low"] <= spec["mode"] <= spec["high"] or spec["low"] == spec["high"]:
+            raise UncertaintyError("triangular: low <= mode <= high verletzt")
+        values = rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    else:
+        raise UncertaintyError(f"Unbekannte Verteilung: {kind} ({', '.join(DISTRIBUTIONS)})")
+    # physikalische Eingaben sind nicht negativ
+    return np.clip(values, 0.0, None)
+
+
+def draw_samples(building, distributions, n, seed=None):
+    """Zieht n Stichproben je Eingabefeld; nicht variierte Felder bleiben konstant."""
+    unknown = set(distributions) - set(HEATING_INPUT_FIELDS)
+    if unknown:
+        raise UncertaintyError(f"Unbekannte Eingaben: {', '.join(sorted(unknown))}")
+
+    rng = np.random.default_rng(seed)
+    inputs = {}
+    for field in HEATING_INPUT_FIELDS:
+        base = float(getattr(building, field))
+        spec = distributions.get(field)
+        inputs[field] = _sample(rng, spec, base, n) if spec else np.full(n, base)
+    return inputs
+
+
+def summarize(values):
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "std": round(float(values.std()), 3),
+        "min": round(float(values.min()), 3),
+        "max": round(float(values.max()), 3),
+        "percentiles": {
+            f"p{p}": round(float(v), 3)
+            for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+        },
+        "histogram": {
+            "counts": counts.tolist(),
+            "bin_edges": np.round(edges, 3).tolist(),
+        },
+    }
+
+
+def run_uncertainty(building, sheet=None, distributions=None, samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Monte-Carlo-Lauf für ein Gebäude.
+
+    Heizung/PV kommen aus den Stichproben, die übrigen Sheet01-Eingaben
+    (Lüftung, TWW, ...) und E42 aus den gespeicherten Daten des Gebäudes.
+    """
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise UncertaintyError(f"samples muss zwischen 1 und {MAX_SAMPLES} liegen")
+    distributions = DEFAULT_DISTRIBUTIONS if distributions is None else distributions
+
+    inputs = draw_samples(building, distributions, samples, seed)
+    heating = calc_heating_demand_batch(inputs)
+
+    ext = build_external_sources(building)
+    cells = calculate_sheet01_batch({
+        "heating_kwh_a": heating["Q_h"],
+        "pv_total_kwh_a": heating["Q_PV_total"],
+        "ngf_m2": heating["ngf_t"],
+        "ventilation_kwh_a": ext.ventilation_kwh_a,
+        "dhw_kwh_a": ext.dhw_kwh_a,
+        "lighting_kwh_a": ext.lighting_kwh_a,
+        "user_process_kwh_a": ext.user_process_kwh_a,
+        "E42_solar_generation_factor": (
+            sheet.E42_solar_generation_factor if sheet is not None else 0.0
+        ),
+    })
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "distributions": distributions,
+        "results": {
+            "Q_h": summarize(heating["Q_h"]),
+            "F54": summarize(cells["F54"]),
+            "F80": summarize(cells["F80"]),
+        },
+    }
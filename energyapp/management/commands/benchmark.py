@@ -0,0 +1,114 @@
+"""
+Benchmarks der Rechenkerne und Exporte mit synthetischen Portfolios
+(siehe energyapp/logic/benchmark.py).
+
+    python manage.py benchmark
+    python manage.py benchmark --sizes 1,1000 --case calc_heating_demand --case export_csv
+    python manage.py benchmark --no-save --max-slowdown 0.1
+
+Durchsatz und Speicher-Peak werden an settings.BENCHMARK_HISTORY angehängt
+und mit dem Median der letzten Läufe auf diesem Rechner verglichen; reißt
+ein Fall die Schwellen, endet der Befehl mit einem Fehler (für CI).
+Die Export-Fälle laufen gegen eine eigene Test-Datenbank, die Daten der
+Anwendung bleiben unberührt.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from energyapp.logic.benchmark import (
+    CASES,
+    DB_CASES,
+    DEFAULT_SIZES,
+    MAX_MEMORY_GROWTH,
+    MAX_SLOWDOWN,
+    check_regressions,
+    load_history,
+    run_benchmarks,
+    run_info,
+    save_history,
+)
+
+
+def _parse_sizes(text):
+    try:
+        sizes = [int(part.replace("_", "")) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise CommandError(f"Ungültige Größen: {text!r}")
+    if not sizes or min(sizes) < 1:
+        raise CommandError("--sizes braucht Größen >= 1.")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = "Misst Durchsatz und Speicher der Rechenkerne und Exporte und prüft auf Regressionen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+            help="Portfoliogrößen, z.B. 1,1000,100000 (Standard: %(default)s).",
+        )
+        parser.add_argument(
+            "--case", action="append", choices=sorted(CASES), default=None,
+            help="Nur diesen Fall messen (mehrfach möglich, Standard: alle).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed der synthetischen Portfolios.")
+        parser.add_argument(
+            "--history", default=str(settings.BENCHMARK_HISTORY),
+            help="JSON-Historie (Standard: settings.BENCHMARK_HISTORY).",
+        )
+        parser.add_argument(
+            "--no-save", action="store_true", help="Ergebnis nicht an die Historie anhängen."
+        )
+        parser.add_argument(
+            "--no-memory", action="store_true", help="Ohne Speicher-Messung (halbe Laufzeit)."
+        )
+        parser.add_argument(
+            "--max-slowdown", type=float, default=MAX_SLOWDOWN,
+            help="Erlaubter Durchsatz-Verlust gegenüber der Basis (Standard: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-memory-growth", type=float, default=MAX_MEMORY_GROWTH,
+            help="Erlaubter Speicher-Zuwachs gegenüber der Basis (Standard: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        cases = options["case"] or list(CASES)
+
+        def progress(result):
+            line = f"{result['case']:<28} n={result['n']:>9,}  {result['seconds']:9.4f} s"
+            if result["per_second"]:
+                line += f"  {result['per_second']:>12,.0f}/s"
+            if "peak_bytes" in result:
+                line += f"  {result['peak_bytes'] / 2**20:8.1f} MiB"
+            self.stdout.write(line)
+
+        # Export-Fälle brauchen eine eigene Datenbank (wird danach verworfen)
+        old_config = None
+        if any(case in DB_CASES for case in cases):
+            old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            results = run_benchmarks(
+                cases, sizes, seed=options["seed"], memory=not options["no_memory"],
+                progress=progress,
+            )
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+
+        history = load_history(options["history"])
+        run = {**run_info(), "seed": options["seed"], "results": results}
+        regressions = check_regressions(
+            history, run, options["max_slowdown"], options["max_memory_growth"]
+        )
+        if not options["no_save"]:
+            history["runs"].append(run)
+            save_history(options["history"], history)
+            self.stdout.write(f"Ergebnisse an {options['history']} angehängt.")
+
+        if regressions:
+            for message in regressions:
+                self.stderr.write(message)
+            raise CommandError(f"{len(regressions)} Regression(en) gegenüber der Basis.")
+        self.stdout.write(self.style.SUCCESS("Keine Regressionen."))
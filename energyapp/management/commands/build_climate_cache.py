@@ -0,0 +1,39 @@
+"""
+Übersetzt alle Klimadaten-Dateien (settings.CLIMATE_DATA_DIR) vorab in den
+binären .npy-Cache, damit Web-Worker beim Start nur noch Memory-Maps öffnen.
+
+    python manage.py build_climate_cache
+    python manage.py build_climate_cache --site Würzburg --force
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from energyapp.logic.climate import get_climate_store
+
+
+class Command(BaseCommand):
+    help = "Baut den .npy-Cache für die Klimadaten aller (oder einzelner) Standorte."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--site", action="append", default=None,
+            help="Nur diesen Standort übersetzen (mehrfach möglich).",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Cache auch dann neu bauen, wenn er aktuell ist.",
+        )
+
+    def handle(self, *args, **options):
+        store = get_climate_store()
+        sites = options["site"] or store.sites()
+
+        for site in sites:
+            try:
+                path = store.build_cache(site, force=options["force"])
+            except KeyError:
+                raise CommandError(f"Keine Klimadaten für Standort {site!r} gefunden.")
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"{site}: {path}")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(sites)} Standort(e) im Cache."))
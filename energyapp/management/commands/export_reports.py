@@ -0,0 +1,53 @@
+"""
+Energiebericht (PDF) je Gebäude für das ganze Portfolio als ZIP.
+
+    python manage.py export_reports berichte.zip
+    python manage.py export_reports berichte.zip --workers 8 --ids 1,2,3
+    python manage.py export_reports berichte.zip --changed-since 2025-01-31
+
+Die Berichte werden parallel gerendert (write_reports_zip) und in der
+Reihenfolge ihrer Fertigstellung ins Archiv geschrieben. Im Web-Interface
+gibt es denselben Export als Hintergrund-Job ("alle Berichte als ZIP").
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from energyapp.logic.exports import ExportError, filter_buildings
+from energyapp.logic.reports import write_reports_zip
+
+
+class Command(BaseCommand):
+    help = "Schreibt einen PDF-Energiebericht je Gebäude in ein ZIP-Archiv."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path, help="Ziel-Datei (.zip)")
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Anzahl Prozesse (Standard: alle Kerne, 1 = im Prozess).",
+        )
+        parser.add_argument("--ids", default="", help="Nur diese Gebäude, z.B. 1,2,3")
+        parser.add_argument("--order", default="", help="Sortierung wie beim CSV-Export")
+        parser.add_argument(
+            "--changed-since", default="", help="Nur seit diesem Datum geänderte Gebäude",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers muss >= 1 sein.")
+        try:
+            buildings = filter_buildings({
+                "ids": options["ids"],
+                "order": options["order"],
+                "changed_since": options["changed_since"],
+            })
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+        output = options["output"]
+        tmp = output.with_name(output.name + ".part")
+        with open(tmp, "wb") as fileobj:
+            count = write_reports_zip(buildings, fileobj, workers=options["workers"])
+        tmp.replace(output)
+
+        self.stdout.write(self.style.SUCCESS(f"{count} Bericht(e) nach {output} geschrieben."))
@@ -0,0 +1,68 @@
+"""
+Massen-Import von Gebäuden aus CSV oder XLSX.
+
+    python manage.py import_buildings gebaeude.xlsx
+    python manage.py import_buildings gebaeude.csv --dry-run
+    python manage.py import_buildings gebaeude.csv --errors fehler.csv
+
+Gültige Zeilen werden blockweise berechnet und per bulk_create gespeichert,
+fehlerhafte Zeilen übersprungen und (mit Zeilennummer) gemeldet.
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from energyapp.logic.building_import import (
+    CHUNK_SIZE,
+    BuildingImportError,
+    import_buildings,
+    write_error_report,
+)
+
+
+class Command(BaseCommand):
+    help = "Importiert Gebäude aus einer CSV- oder XLSX-Datei."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="CSV- oder XLSX-Datei")
+        parser.add_argument(
+            "--chunk-size", type=int, default=CHUNK_SIZE,
+            help=f"Gebäude pro Block/Transaktion (Standard: {CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Nur prüfen, nichts speichern.",
+        )
+        parser.add_argument(
+            "--errors", type=Path, default=None,
+            help="Fehlerbericht als CSV in diese Datei schreiben.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.is_file():
+            raise CommandError(f"Datei nicht gefunden: {path}")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size muss >= 1 sein.")
+
+        try:
+            with open(path, "rb") as fileobj:
+                summary = import_buildings(
+                    fileobj, path.name,
+                    chunk_size=options["chunk_size"],
+                    dry_run=options["dry_run"],
+                )
+        except BuildingImportError as exc:
+            raise CommandError(str(exc))
+
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8-sig", newline="") as f:
+                write_error_report(summary["errors"], f)
+        else:
+            for line, field, message in summary["errors"][:20]:
+                self.stderr.write(f"Zeile {line}, {field}: {message}")
+
+        verb = "geprüft" if options["dry_run"] else "importiert"
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['rows'] - summary['error_count']} von {summary['rows']} Zeilen {verb}, "
+            f"{summary['error_count']} fehlerhaft."
+        ))
@@ -0,0 +1,46 @@
+"""
+Gebäude mengenbasiert löschen (siehe energyapp/logic/deletion.py).
+
+    python manage.py purge_buildings --all
+    python manage.py purge_buildings --project "Machbarkeitsstudie Nord"
+    python manage.py purge_buildings --ids 1,2,3 --chunk-size 5000
+
+Abhängige Datensätze (Lüftung, GWP, Sommerschutz, Blatt 01) werden je Block
+mit einem DELETE pro Tabelle entfernt, ohne sie nach Python zu laden.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from energyapp.logic.deletion import CHUNK_SIZE, project_buildings, purge_buildings
+from energyapp.logic.exports import ExportError, filter_buildings
+
+
+class Command(BaseCommand):
+    help = "Löscht Gebäude samt abhängiger Daten blockweise per SQL."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--all", action="store_true", help="Alle Gebäude löschen.")
+        target.add_argument("--project", help="Alle Gebäude dieses Projekts (Blatt 01).")
+        target.add_argument("--ids", help="Nur diese Gebäude, z.B. 1,2,3")
+        parser.add_argument(
+            "--chunk-size", type=int, default=CHUNK_SIZE,
+            help=f"Gebäude pro Block/Transaktion (Standard: {CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size muss >= 1 sein.")
+        if options["project"]:
+            buildings = project_buildings(options["project"])
+        else:
+            try:
+                buildings = filter_buildings({"ids": options["ids"] or ""})
+            except ExportError as exc:
+                raise CommandError(str(exc))
+
+        deleted = purge_buildings(
+            buildings,
+            chunk_size=options["chunk_size"],
+            progress=lambda done: self.stdout.write(f"{done} gelöscht ..."),
+        )
+        self.stdout.write(self.style.SUCCESS(f"{deleted} Gebäude gelöscht."))
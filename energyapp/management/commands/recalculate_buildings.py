@@ -0,0 +1,184 @@
+"""
+Neuberechnung aller Gebäude nach einer Formeländerung.
+
+    python manage.py recalculate_buildings
+    python manage.py recalculate_buildings --workers 4 --chunk-size 5000
+    python manage.py recalculate_buildings --checkpoint recalc.json --resume
+
+Die Gebäude werden nach id gestreamt, in Blöcken mit
+calc_heating_demand_batch berechnet und per bulk_update zurückgeschrieben
+(eine Transaktion pro Block). Nach jedem Block wird die zuletzt
+verarbeitete id in die Checkpoint-Datei geschrieben, sodass ein
+abgebrochener Lauf mit --resume fortgesetzt werden kann.
+
+Gebäude, deren Eingaben-Fingerprint und Formelstand (CALC_VERSION) zu den
+gespeicherten Ergebnissen passen, werden übersprungen (--force: alle).
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from energyapp.logic.building import (
+    CALC_STATE_FIELDS,
+    CALC_VERSION,
+    HEATING_INPUT_FIELDS,
+    RESULT_FIELDS,
+    calc_heating_demand_batch,
+    fingerprint_values,
+)
+from energyapp.logic.statistics import track_buildings
+from energyapp.models import Building
+
+
+def _iter_chunks(since_id, chunk_size, force=False):
+    """
+    Liefert (ids, fingerprints, inputs) je Block, sortiert nach id.
+    Gebäude mit aktuellem Fingerprint und Formelstand werden übersprungen.
+    """
+    rows = (
+        Building.objects.filter(id__gt=since_id)
+        .order_by("id")
+        .values_list("id", "calc_fingerprint", "calc_version", *HEATING_INPUT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for pk, old_fingerprint, version, *values in rows:
+        fingerprint = fingerprint_values(values)
+        if not force and version == CALC_VERSION and fingerprint == old_fingerprint:
+            continue
+        chunk.append((pk, fingerprint, values))
+        if len(chunk) >= chunk_size:
+            yield _to_arrays(chunk)
+            chunk = []
+    if chunk:
+        yield _to_arrays(chunk)
+
+
+def _to_arrays(chunk):
+    data = np.asarray([values for _, _, values in chunk], dtype=np.float64)
+    ids = [pk for pk, _, _ in chunk]
+    fingerprints = [fingerprint for _, fingerprint, _ in chunk]
+    inputs = {
+        field: data[:, i] for i, field in enumerate(HEATING_INPUT_FIELDS)
+    }
+    return ids, fingerprints, inputs
+
+
+def _write_chunk(ids, fingerprints, result):
+    """Schreibt die Ergebnisse eines Blocks per bulk_update (eine Transaktion)."""
+    columns = {key: result[key].tolist() for key in RESULT_FIELDS}
+    now = timezone.now()
+    objs = []
+    for i, pk in enumerate(ids):
+        obj = Building(
+            id=pk, calc_fingerprint=fingerprints[i], calc_version=CALC_VERSION, updated_at=now,
+        )
+        for key, field in RESULT_FIELDS.items():
+            setattr(obj, field, columns[key][i])
+        objs.append(obj)
+
+    # bulk_update sendet keine Signale -> Portfolio-Kennzahlen über track_buildings
+    with transaction.atomic(), track_buildings(ids):
+        Building.objects.bulk_update(
+            objs, [*RESULT_FIELDS.values(), *CALC_STATE_FIELDS, "updated_at"]
+        )
+
+
+def _read_checkpoint(path):
+    if not path.exists():
+        return 0
+    try:
+        return int(json.loads(path.read_text())["last_id"])
+    except (ValueError, KeyError) as exc:
+        raise CommandError(f"Checkpoint-Datei {path} ist ungültig: {exc}")
+
+
+def _write_checkpoint(path, last_id, processed):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "processed": processed}))
+    tmp.replace(path)
+
+
+class Command(BaseCommand):
+    help = "Berechnet die result_*-Felder aller Gebäude blockweise neu."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Anzahl Gebäude pro Block/Transaktion (Standard: 2000).",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Anzahl Prozesse für die Berechnung (Standard: 1 = im Prozess).",
+        )
+        parser.add_argument(
+            "--since-id", type=int, default=0,
+            help="Nur Gebäude mit id > SINCE_ID neu berechnen.",
+        )
+        parser.add_argument(
+            "--checkpoint", type=Path, default=None,
+            help="Datei, in die nach jedem Block die letzte id geschrieben wird.",
+        )
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Ab der letzten id aus --checkpoint fortsetzen.",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Auch Gebäude mit aktuellem Fingerprint neu berechnen.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        checkpoint = options["checkpoint"]
+        since_id = options["since_id"]
+
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size und --workers müssen >= 1 sein.")
+        if options["resume"]:
+            if checkpoint is None:
+                raise CommandError("--resume benötigt --checkpoint.")
+            since_id = max(since_id, _read_checkpoint(checkpoint))
+
+        chunks = _iter_chunks(since_id, chunk_size, options["force"])
+        processed = 0
+        last_id = since_id
+
+        for ids, fingerprints, result in self._calculate(chunks, workers):
+            _write_chunk(ids, fingerprints, result)
+            processed += len(ids)
+            last_id = ids[-1]
+            if checkpoint is not None:
+                _write_checkpoint(checkpoint, last_id, processed)
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"{processed} Gebäude berechnet (bis id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{processed} Gebäude neu berechnet (letzte id: {last_id})."
+        ))
+
+    def _calculate(self, chunks, workers):
+        """Berechnet die Blöcke der Reihe nach – optional auf einem Prozesspool."""
+        if workers == 1:
+            for ids, fingerprints, inputs in chunks:
+                yield ids, fingerprints, calc_heating_demand_batch(inputs)
+            return
+
+        # Höchstens 2 Blöcke pro Prozess gleichzeitig in Arbeit halten,
+        # die Ergebnisse aber in id-Reihenfolge schreiben (Checkpoint!).
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            pending = []
+            for ids, fingerprints, inputs in chunks:
+                pending.append((ids, fingerprints, pool.submit(calc_heating_demand_batch, inputs)))
+                if len(pending) >= 2 * workers:
+                    ids_done, fingerprints_done, future = pending.pop(0)
+                    yield ids_done, fingerprints_done, future.result()
+            for ids_done, fingerprints_done, future in pending:
+                yield ids_done, fingerprints_done, future.result()
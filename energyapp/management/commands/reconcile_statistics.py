@@ -0,0 +1,36 @@
+"""
+Portfolio-Kennzahlen (Dashboard) komplett neu berechnen.
+
+    python manage.py reconcile_statistics
+
+Die Kennzahlen werden bei jeder Änderung inkrementell nachgeführt; dieser
+Befehl (z.B. nächtlich per cron) gleicht Rundungsdrift und Änderungen an
+der Anwendung vorbei (SQL, Admin-Massenaktionen) aus.
+"""
+from django.core.management.base import BaseCommand
+
+from energyapp.logic.statistics import STATISTICS_PK, compute_statistics, reconcile_statistics
+from energyapp.models import PortfolioStatistics
+
+
+class Command(BaseCommand):
+    help = "Berechnet die Portfolio-Kennzahlen des Dashboards neu."
+
+    def handle(self, *args, **options):
+        before = PortfolioStatistics.objects.filter(pk=STATISTICS_PK).first()
+        expected = compute_statistics()
+        drift = {}
+        if before is not None:
+            drift = {
+                field: (getattr(before, field), value)
+                for field, value in expected.items()
+                if getattr(before, field) != value
+            }
+        stats = reconcile_statistics(expected)
+
+        for field, (old, new) in sorted(drift.items()):
+            self.stdout.write(f"{field}: {old} -> {new}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Kennzahlen für {stats.building_count} Gebäude neu berechnet "
+            f"({len(drift)} Abweichung(en))."
+        ))
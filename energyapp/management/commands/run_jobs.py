@@ -0,0 +1,74 @@
+"""
+Worker für Hintergrund-Jobs (große Exporte, siehe energyapp/logic/jobs.py).
+
+    python manage.py run_jobs                 # ein Worker, läuft dauerhaft
+    python manage.py run_jobs --workers 4     # vier Worker-Prozesse
+    python manage.py run_jobs --once          # wartende Jobs abarbeiten, dann Ende
+
+Jeder Worker übernimmt Jobs atomar aus der Tabelle BackgroundJob; mehrere
+Worker (auch auf verschiedenen Rechnern) kommen sich also nicht in die Quere.
+Jobs abgestürzter Worker werden beim Start und vor jeder Übernahme nach
+settings.JOB_STALE_AFTER wieder eingestellt.
+"""
+import multiprocessing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from energyapp.logic.jobs import recover_stale_jobs, work
+
+
+def _worker_main(once, poll_interval):
+    work(once=once, poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Arbeitet wartende Hintergrund-Jobs (Exporte) ab."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Anzahl Worker-Prozesse (Standard: 1)",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Beenden, sobald keine Jobs mehr warten",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Wartezeit in Sekunden bei leerer Queue (Standard: 1.0)",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        once = options["once"]
+        poll_interval = options["poll_interval"]
+        if workers < 1:
+            raise CommandError("--workers muss >= 1 sein.")
+
+        recovered = recover_stale_jobs()
+        if recovered:
+            self.stdout.write(f"{recovered} verwaiste(n) Job(s) wieder eingestellt bzw. aufgegeben.")
+
+        if workers == 1:
+            count = work(once=once, poll_interval=poll_interval)
+            self.stdout.write(self.style.SUCCESS(f"{count} Job(s) abgearbeitet."))
+            return
+
+        # Verbindungen nicht in die Kindprozesse vererben
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_main, args=(once, poll_interval))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS(f"{workers} Worker beendet."))
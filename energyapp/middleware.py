@@ -0,0 +1,72 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from energyapp.logic.metrics import (
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    RequestStats,
+    current_request,
+)
+
+
+class MetricsMiddleware:
+    """
+    Antwortzeit und SQL-Abfragen je View (siehe logic/metrics.py).
+    Bei gestreamten Antworten wird erst nach dem letzten Block gemessen,
+    damit Exporte mit ihrer vollen Laufzeit erscheinen. Für WSGI und ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats(request)
+        current_request.set(stats)
+        return self._track(request, self.get_response(request), stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats(request)
+        current_request.set(stats)
+        return self._track(request, await self.get_response(request), stats)
+
+    def _track(self, request, response, stats):
+        def finish():
+            REQUEST_DURATION.observe(
+                time.perf_counter() - stats.start, stats.view, request.method, str(response.status_code)
+            )
+            REQUEST_QUERIES.observe(stats.queries, stats.view)
+            current_request.set(None)
+
+        if response.streaming:
+            response.streaming_content = _finish_after(response, finish)
+        else:
+            finish()
+        return response
+
+
+def _finish_after(response, finish):
+    """streaming_content, der nach dem letzten Block (oder Abbruch) finish() aufruft."""
+    content = response.streaming_content
+
+    if response.is_async:
+        async def stream():
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                finish()
+    else:
+        def stream():
+            try:
+                yield from content
+            finally:
+                finish()
+    return stream()
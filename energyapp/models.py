@@ -8,6 +8,9 @@ from django.core.validators import MinValueValidator
 class Building(models.Model):
     name = models.CharField(max_length=100)
 
+    # Standort (Auswahl der Klimadaten, siehe logic/climate.py)
+    standort = models.CharField("Standort", max_length=100, default="Würzburg")
+
     # Geometrie
     length_ns = models.FloatField("Länge Nord/Süd [m]")
     width_ow = models.FloatField("Breite Ost/West [m]")
@@ -88,6 +91,21 @@ class Building(models.Model):
     result_Q_PV_on = models.FloatField(null=True, blank=True)
     result_Q_PV_off = models.FloatField(null=True, blank=True)
 
+    # Fingerprint der Eingaben, mit denen die Ergebnisse berechnet wurden,
+    # und Formelstand (siehe logic/building.py: calc_fingerprint, CALC_VERSION)
+    calc_fingerprint = models.CharField(max_length=32, blank=True, default="", editable=False)
+    calc_version = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+
+    # Zeitpunkt der letzten Änderung (Filter "changed_since" der Exporte)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
+
+    class Meta:
+        # Sortierungen der Gebäudeliste (Keyset-Paginierung über feld, id)
+        indexes = [
+            models.Index(fields=["name", "id"], name="building_name_id_idx"),
+            models.Index(fields=["result_Q_h", "id"], name="building_q_h_id_idx"),
+            models.Index(fields=["result_floor_area", "id"], name="building_area_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -727,3 +745,115 @@ class EnergyResultSheet01(models.Model):
 
     def __str__(self):
         return f"EnergyResultSheet01 – {self.building.name}"
+
+
+# ============================
+# Hintergrund-Jobs (große Exporte, siehe logic/jobs.py)
+# ============================
+class BackgroundJob(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "wartet"),
+        (STATUS_RUNNING, "läuft"),
+        (STATUS_DONE, "fertig"),
+        (STATUS_FAILED, "fehlgeschlagen"),
+    ]
+
+    kind = models.CharField("Art", max_length=50)
+    params = models.JSONField("Parameter", default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
+    )
+
+    # Fortschritt: erledigte / gesamte Einheiten (z.B. Gebäude)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+
+    # Ergebnisdatei relativ zu settings.EXPORT_ROOT
+    artifact = models.CharField(max_length=255, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    worker = models.CharField(max_length=100, blank=True, default="")
+    # Anzahl Übernahmen (> 1: Worker war ausgefallen, siehe recover_stale_jobs)
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Lebenszeichen des Workers (bei Übernahme, dann alle JOB_HEARTBEAT_INTERVAL Sekunden)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return 100.0 if self.status == self.STATUS_DONE else 0.0
+        return round(100.0 * self.progress_done / self.progress_total, 1)
+
+    @property
+    def finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.kind}, {self.status})"
+
+
+# ============================
+# Portfolio-Kennzahlen (eine Zeile, siehe logic/statistics.py)
+# ============================
+class PortfolioStatistics(models.Model):
+    """
+    Summen über alle Gebäude für das Dashboard. Wird bei jeder Änderung
+    inkrementell nachgeführt (Signale, Massen-Schreibpfade) und regelmäßig
+    mit "python manage.py reconcile_statistics" komplett neu berechnet.
+    """
+    building_count = models.IntegerField(default=0)
+    last_building_id = models.BigIntegerField(null=True, blank=True)
+    last_building_name = models.CharField(max_length=100, blank=True, default="")
+
+    # Heizwärmebedarf (nur Gebäude mit Ergebnis)
+    q_h_count = models.IntegerField(default=0)
+    q_h_sum = models.FloatField(default=0)
+
+    # spezifischer Heizwärmebedarf Q_h / NGF_t [kWh/m²a]
+    specific_count = models.IntegerField(default=0)
+    specific_sum = models.FloatField(default=0)
+    specific_lt_50 = models.IntegerField(default=0)
+    specific_50_100 = models.IntegerField(default=0)
+    specific_100_150 = models.IntegerField(default=0)
+    specific_150_200 = models.IntegerField(default=0)
+    specific_200_250 = models.IntegerField(default=0)
+    specific_ge_250 = models.IntegerField(default=0)
+
+    # PV
+    pv_total_sum = models.FloatField(default=0)
+    pv_on_sum = models.FloatField(default=0)
+    pv_off_sum = models.FloatField(default=0)
+
+    # GWP [kg CO2/a]
+    gwp_manufacturing_count = models.IntegerField(default=0)
+    gwp_manufacturing_sum = models.FloatField(default=0)
+    gwp_operation_count = models.IntegerField(default=0)
+    gwp_operation_sum = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def q_h_mean(self):
+        return self.q_h_sum / self.q_h_count if self.q_h_count else None
+
+    @property
+    def specific_mean(self):
+        return self.specific_sum / self.specific_count if self.specific_count else None
+
+    @property
+    def gwp_total_sum(self):
+        return self.gwp_manufacturing_sum + self.gwp_operation_sum
+
+    def __str__(self):
+        return f"Portfolio-Kennzahlen ({self.building_count} Gebäude)"
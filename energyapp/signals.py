@@ -0,0 +1,99 @@
+"""
+Signal-Handler:
+  - führen die Portfolio-Kennzahlen nach (siehe energyapp/logic/statistics.py),
+  - messen die SQL-Abfragen jeder Datenbankverbindung (siehe energyapp/logic/metrics.py).
+"""
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from energyapp.logic.metrics import install_query_wrapper
+from energyapp.logic.statistics import (
+    STAT_VALUE_FIELDS,
+    apply_delta,
+    building_contribution,
+    compensation_contribution,
+    manufacturing_contribution,
+    subtract,
+)
+from energyapp.models import Building, GwpCompensation, GwpManufacturing
+
+# GWP-Modelle mit Beitrag zu den Portfolio-Kennzahlen
+STATISTICS_CONTRIBUTIONS = {
+    GwpManufacturing: manufacturing_contribution,
+    GwpCompensation: compensation_contribution,
+}
+
+
+# =========================
+# Portfolio-Kennzahlen
+# =========================
+def _touches(update_fields, fields):
+    return update_fields is None or not set(update_fields).isdisjoint(fields)
+
+
+def _building_values(instance, old=None):
+    # nicht geladene (deferred) Felder wurden nicht gespeichert -> alter Wert
+    return {
+        field: instance.__dict__[field] if field in instance.__dict__ else (old or {}).get(field)
+        for field in STAT_VALUE_FIELDS
+    }
+
+
+@receiver(pre_save, sender=Building)
+def building_statistics_before(sender, instance, update_fields=None, **kwargs):
+    # alten Beitrag nur lesen, wenn sich Kennzahl-Felder ändern können
+    instance._statistics_old = None
+    if not instance._state.adding and _touches(update_fields, STAT_VALUE_FIELDS):
+        instance._statistics_old = (
+            Building.objects.filter(pk=instance.pk).values(*STAT_VALUE_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Building)
+def building_statistics_after(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_delta(
+            building_contribution(_building_values(instance)), created=(instance.pk, instance.name)
+        )
+        return
+    if not _touches(update_fields, (*STAT_VALUE_FIELDS, "name")):
+        return
+    old = getattr(instance, "_statistics_old", None)
+    delta = {}
+    if old is not None:
+        delta = subtract(
+            building_contribution(_building_values(instance, old)), building_contribution(old)
+        )
+    renamed = (instance.pk, instance.name) if "name" in instance.__dict__ else None
+    apply_delta(delta, renamed=renamed)
+
+
+@receiver(post_delete, sender=Building)
+def building_statistics_deleted(sender, instance, **kwargs):
+    apply_delta(subtract({}, building_contribution(_building_values(instance))), refresh_last=True)
+
+
+def gwp_statistics_before(sender, instance, **kwargs):
+    instance._statistics_old = None
+    if not instance._state.adding:
+        instance._statistics_old = sender.objects.filter(pk=instance.pk).first()
+
+
+def gwp_statistics_after(sender, instance, **kwargs):
+    contribution = STATISTICS_CONTRIBUTIONS[sender]
+    old = getattr(instance, "_statistics_old", None)
+    apply_delta(subtract(contribution(instance), contribution(old) if old else {}))
+
+
+def gwp_statistics_deleted(sender, instance, **kwargs):
+    apply_delta(subtract({}, STATISTICS_CONTRIBUTIONS[sender](instance)))
+
+
+for _model in STATISTICS_CONTRIBUTIONS:
+    pre_save.connect(gwp_statistics_before, sender=_model)
+    post_save.connect(gwp_statistics_after, sender=_model)
+    post_delete.connect(gwp_statistics_deleted, sender=_model)
+
+
+connection_created.connect(install_query_wrapper, dispatch_uid="energyapp_query_metrics")
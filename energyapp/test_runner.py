@@ -0,0 +1,23 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from energyapp.logic import metrics
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner mit METRICS_DIR in einem temporären Verzeichnis."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._metrics_dir = tempfile.TemporaryDirectory(prefix="energyapp-metrics-")
+        self._metrics_override = override_settings(METRICS_DIR=self._metrics_dir.name)
+        self._metrics_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # verwerfen, damit der Flush beim Beenden nichts nach METRICS_DIR schreibt
+        metrics.reset()
+        self._metrics_override.disable()
+        self._metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,9 +1,1572 @@
-from django.test import TestCase
+import csv
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import product
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
-from .models import Building
+from django.utils import timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
+from openpyxl import Workbook, load_workbook
+
+from .logic.building import (
+    HEATING_INPUT_FIELDS,
+    RESULT_FIELDS,
+    apply_heating_result,
+    buildings_to_arrays,
+    calc_heating_demand,
+    calc_heating_demand_batch,
+    needs_recalculation,
+    stale_buildings,
+)
+from .forms import BuildingForm
+from .views import async_views
+from .logic.climate import COLUMNS, ClimateStore, synthesize_hourly
+from .logic.load_profiles import (
+    MONTHLY_INPUT_FIELDS,
+    EnergyCalculator,
+    calculate_monthly_batch,
+)
+from .logic.exports import BUILDING_ORDERS, XLSX_SHEETS, parse_sheets, write_xlsx
+from .logic.batch_calculation import CALC_FIELDS
+from .logic.benchmark import CASES, check_regressions, run_benchmarks
+from .logic.building_import import BuildingImportError, IMPORT_FIELDS, import_buildings
+from .logic.deletion import deletion_plan, project_buildings, purge_buildings
+from .logic import metrics
+from .logic.jobs import (
+    JOB_HANDLERS,
+    _write_atomic,
+    claim_next_job,
+    run_job,
+    submit_job,
+    worker_name,
+)
+from .logic.statistics import compute_statistics, get_statistics
+from .logic import report_cache
+from .logic.report_cache import cached_report, evict
+from .logic.reports import report_values
+from .logic.portfolio import evaluate_portfolio
+from .logic.sheet01_cache import cached_sheet01
+from .logic.retrofit import COMPONENTS, DEFAULT_MEASURES, G_FIELDS, optimize_retrofit
+from .logic.result_sheet_01 import (
+    SHEET01_DOWNSTREAM,
+    Sheet01Graph,
+    calculate_sheet01,
+    calculate_sheet01_batch,
+    sheet01_buildings,
+    sheet01_inputs,
+)
+from .logic.sweep import SweepError, parse_range
+from .logic.uncertainty import run_uncertainty
+from .models import (
+    BackgroundJob,
+    Building,
+    EnergyResultSheet01,
+    GwpCompensation,
+    GwpManufacturing,
+    PortfolioStatistics,
+    SummerProtection,
+    VentilationScenario,
+    VentilationUsageCategory,
+    VentilationUsageShare,
+)
+
+
+def make_building(seed=0, **overrides):
+    """Zufälliges (ungespeichertes) Testgebäude mit plausiblen Eingaben."""
+    rnd = random.Random(seed)
+    data = {
+        "name": f"Testgebäude {seed}",
+        "length_ns": rnd.uniform(5, 80),
+        "width_ow": rnd.uniform(5, 40),
+        "storeys": rnd.randint(1, 8),
+        "room_height": rnd.uniform(2.5, 3.5),
+        "u_wall": rnd.uniform(0.1, 1.5),
+        "u_roof": rnd.uniform(0.1, 1.0),
+        "u_floor": rnd.uniform(0.1, 1.0),
+        "u_window": rnd.uniform(0.6, 3.0),
+        "window_share_n": rnd.uniform(0, 80),
+        "window_share_e": rnd.uniform(0, 80),
+        "window_share_s": rnd.uniform(0, 80),
+        "window_share_w": rnd.uniform(0, 80),
+        "g_n": rnd.uniform(0.2, 0.8),
+        "g_e": rnd.uniform(0.2, 0.8),
+        "g_s": rnd.uniform(0.2, 0.8),
+        "g_w": rnd.uniform(0.2, 0.8),
+        "person_density": 20,
+        "persons": rnd.randint(0, 500),
+        "air_change_rate": rnd.uniform(0.1, 2.0),
+        "degree_days": rnd.uniform(1500, 4500),
+        "pv_roof_share": rnd.uniform(0, 100),
+        "pv_specific_yield": rnd.uniform(100, 250),
+        "pv_self_consumption_share": rnd.uniform(0, 100),
+        "setpoint_temp": 20.0,
+    }
+    data.update(overrides)
+    return Building(**data)
+
+
 class SimpleTest(TestCase):
 
     def test_homepage_status_code(self):
         """Check that the homepage returns HTTP 200."""
         response = self.client.get(reverse("dashboard"))
         self.assertEqual(response.status_code, 200)
+
+
+class HeatingDemandBatchTest(SimpleTestCase):
+
+    def test_batch_matches_scalar_exactly(self):
+        """Die Batch-Berechnung liefert bitgenau dieselben Werte wie calc_heating_demand."""
+        buildings = [make_building(seed) for seed in range(200)]
+        # Randfall: Q_h < 0 wird auf 0 begrenzt
+        buildings.append(make_building(999, persons=100000))
+
+        batch = calc_heating_demand_batch(buildings_to_arrays(buildings))
+
+        for i, building in enumerate(buildings):
+            scalar = calc_heating_demand(building)
+            for key, value in scalar.items():
+                self.assertEqual(batch[key][i], value, f"{key} (Gebäude {i})")
+        self.assertEqual(batch["Q_h"][-1], 0.0)
+
+
+class RecalculateBuildingsCommandTest(TestCase):
+
+    def setUp(self):
+        # Gebäude mit veralteten (leeren) Ergebnissen anlegen
+        self.buildings = [make_building(seed) for seed in range(7)]
+        for building in self.buildings:
+            building.save()
+
+    def assertResultsCurrent(self, buildings):
+        for building in buildings:
+            building.refresh_from_db()
+            expected = calc_heating_demand(building)
+            for key, field in RESULT_FIELDS.items():
+                self.assertEqual(getattr(building, field), expected[key])
+
+    def test_recalculates_all_buildings_in_chunks(self):
+        call_command("recalculate_buildings", chunk_size=3, stdout=StringIO())
+        self.assertResultsCurrent(self.buildings)
+
+    def test_recalculates_on_process_pool(self):
+        call_command(
+            "recalculate_buildings", chunk_size=2, workers=2, stdout=StringIO()
+        )
+        self.assertResultsCurrent(self.buildings)
+
+    def test_resume_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "recalc.json"
+            checkpoint.write_text(json.dumps({"last_id": self.buildings[3].id}))
+
+            call_command(
+                "recalculate_buildings", chunk_size=2,
+                checkpoint=checkpoint, resume=True, stdout=StringIO(),
+            )
+
+            self.assertEqual(
+                json.loads(checkpoint.read_text())["last_id"], self.buildings[-1].id
+            )
+        self.assertResultsCurrent(self.buildings[4:])
+        self.buildings[0].refresh_from_db()
+        self.assertIsNone(self.buildings[0].result_Q_h)
+
+    def test_skips_buildings_with_current_fingerprint(self):
+        call_command("recalculate_buildings", stdout=StringIO())
+        self.assertFalse(stale_buildings().exists())
+
+        Building.objects.filter(pk=self.buildings[2].pk).update(u_wall=0.11)
+        out = StringIO()
+        call_command("recalculate_buildings", stdout=out)
+        self.assertIn("1 Gebäude neu berechnet", out.getvalue())
+        self.assertResultsCurrent(self.buildings[2:3])
+
+        out = StringIO()
+        call_command("recalculate_buildings", force=True, stdout=out)
+        self.assertIn(f"{len(self.buildings)} Gebäude neu berechnet", out.getvalue())
+
+
+class BuildingEditTest(TestCase):
+
+    def setUp(self):
+        self.building = make_building(2, name="Alt")
+        apply_heating_result(self.building, calc_heating_demand(self.building))
+        self.building.save()
+        self.form_data = {
+            field: getattr(self.building, field) for field in BuildingForm.Meta.fields
+        }
+
+    def test_cosmetic_edit_skips_calculation(self):
+        url = reverse("building_edit", args=[self.building.pk])
+        with self.assertNumQueries(3):  # SELECT + ein schmales UPDATE + Statistik-Zeile (Name)
+            response = self.client.post(url, {**self.form_data, "name": "Neu"})
+        self.assertEqual(response.status_code, 302)
+
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.name, "Neu")
+        self.assertFalse(needs_recalculation(self.building))
+
+        with self.assertNumQueries(1):  # keine Änderung -> kein UPDATE
+            self.client.post(url, {**self.form_data, "name": "Neu"})
+
+    def test_input_change_recalculates(self):
+        url = reverse("building_edit", args=[self.building.pk])
+        self.client.post(url, {**self.form_data, "u_wall": 0.15})
+
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.u_wall, 0.15)
+        self.assertEqual(self.building.result_Q_h, calc_heating_demand(self.building)["Q_h"])
+        self.assertFalse(needs_recalculation(self.building))
+
+
+class HourlyLoadProfileTest(TestCase):
+
+    def test_monthly_totals_are_derived_from_hourly_values(self):
+        results = EnergyCalculator(make_building(3)).calculate_hourly()
+        hourly = results["hourly"]
+
+        self.assertEqual(hourly["q_h"].shape, (8760,))
+        self.assertEqual(hourly["q_h"].dtype.name, "float32")
+        self.assertAlmostEqual(
+            sum(m["q_h"] for m in results["monthly_data"]),
+            results["annual_heating_demand"],
+            delta=1.0,
+        )
+        self.assertAlmostEqual(
+            float(hourly["q_h"].sum()), results["annual_heating_demand"], delta=1.0
+        )
+
+    def test_load_profile_view_hourly_mode(self):
+        building = make_building(4)
+        building.save()
+        response = self.client.get(
+            reverse("energy_balance", args=[building.pk]), {"mode": "hourly"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Heizlast (max.)")
+
+
+class ClimateStoreTest(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = Path(tmp.name) / "data"
+        self.data_dir.mkdir()
+        self.store = ClimateStore(self.data_dir, Path(tmp.name) / "cache", "Würzburg")
+
+    def test_builtin_site_matches_monthly_excel_values(self):
+        climate = self.store.get("würzburg")
+        self.assertEqual(climate.monthly_temp[0], -1.2)
+        self.assertEqual(climate.monthly_rad["S"][6], 120)
+        self.assertEqual(climate.hourly.shape, (8760, len(COLUMNS)))
+        self.assertFalse(climate.hourly.flags.writeable)
+        # Zweiter Zugriff: gleiches Objekt, kein erneutes Laden
+        self.assertIs(self.store.get("Würzburg"), climate)
+
+    def test_try_file_is_converted_and_memory_mapped(self):
+        monthly = {column: [10.0] * 12 for column in COLUMNS}
+        rows = synthesize_hourly(monthly)
+        lines = [";".join(COLUMNS)] + [
+            ";".join(f"{v:.3f}".replace(".", ",") for v in row) for row in rows
+        ]
+        (self.data_dir / "Teststadt.csv").write_text("\n".join(lines), encoding="utf-8")
+
+        climate = self.store.get("Teststadt")
+
+        self.assertTrue(self.store.cache_path("Teststadt").exists())
+        self.assertEqual(climate.monthly_temp, [10.0] * 12)
+        results = EnergyCalculator(make_building(1), climate=climate).calculate()
+        self.assertEqual(results["monthly_data"][0]["temp"], 10.0)
+
+    def test_unknown_site_falls_back_to_default(self):
+        with self.assertLogs("energyapp.logic.climate", "WARNING"):
+            climate = self.store.get("Atlantis")
+        self.assertIs(climate, self.store.get("Würzburg"))
+
+    def test_missing_default_site_is_configuration_error(self):
+        store = ClimateStore(self.data_dir, self.store.cache_dir, "Atlantis")
+        with self.assertRaises(ImproperlyConfigured):
+            store.get("Atlantis")
+        with self.assertRaises(ImproperlyConfigured), self.assertLogs("energyapp.logic.climate"):
+            store.get("Lemuria")
+
+
+class ParameterSweepTest(TestCase):
+
+    def test_monthly_batch_matches_energy_calculator(self):
+        buildings = [make_building(seed) for seed in range(20)]
+        inputs = {
+            field: [getattr(b, field) for b in buildings]
+            for field in MONTHLY_INPUT_FIELDS
+        }
+        batch = calculate_monthly_batch(inputs)
+        for i, building in enumerate(buildings):
+            expected = EnergyCalculator(building).calculate()
+            self.assertEqual(
+                round(batch["annual_heating_demand"][i], 1),
+                expected["annual_heating_demand"],
+            )
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("0.7:1.3:0.2"), [0.7, 0.9, 1.1, 1.3])
+        self.assertEqual(parse_range("20,40"), [20.0, 40.0])
+        # wird vor dem Anlegen der Werte abgelehnt
+        for text in ("0:1e9:1", "0:inf:1", "0:1:1e-300", "0:1:0", "nan", "1,-inf"):
+            with self.assertRaises(SweepError):
+                parse_range(text)
+
+    def test_sweep_json_and_csv(self):
+        building = make_building(5)
+        building.save()
+        url = reverse("building_sweep", args=[building.pk])
+        params = {"u_window": "0.7:1.3:0.1", "window_share_s": "20:60:10"}
+
+        response = self.client.get(url, params)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data["rows"]), 7 * 5)
+        self.assertEqual(data["columns"][:2], ["u_window", "window_share_s"])
+
+        # Variante mit den Werten des Basisgebäudes = calc_heating_demand
+        building.u_window, building.window_share_s = 1.0, 40.0
+        expected = calc_heating_demand(building)["Q_h"]
+        row = dict(zip(data["columns"], data["rows"][3 * 5 + 2]))
+        self.assertEqual(row["Q_h"], expected)
+
+        response = self.client.get(url, {**params, "format": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1 + 35)
+
+        response = self.client.get(url, {"format": "csv"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"u_window": "0:1e9:1"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_large_sweep_becomes_job(self):
+        building = make_building(5)
+        building.save()
+        url = reverse("building_sweep", args=[building.pk])
+        params = {"u_window": "0.7:1.3:0.1", "window_share_s": "20:60:10"}
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(EXPORT_ROOT=Path(tmp)), \
+                mock.patch("energyapp.views.sweep.SYNC_SWEEP_LIMIT", 10):
+            response = self.client.get(url, params)
+            job = BackgroundJob.objects.get()
+            self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+            self.assertEqual(job.params, {"building_id": building.pk, **params})
+
+            call_command("run_jobs", once=True, stdout=StringIO())
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+            lines = (Path(tmp) / job.artifact).read_text().splitlines()
+        self.assertEqual(len(lines), 1 + 35)
+
+        # jede Achse für sich erlaubt, das Gitter insgesamt zu groß: gar kein Job
+        too_big = {"u_wall": "0:999:1", "u_roof": "0:999:1", "u_floor": "0:999:1"}
+        response = self.client.get(url, too_big)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+
+class Sheet01BatchTest(SimpleTestCase):
+
+    def test_batch_matches_scalar_sheet01(self):
+        rnd = random.Random(7)
+        buildings, sheets = [], []
+        for seed in range(50):
+            building = make_building(seed)
+            result = calc_heating_demand(building)
+            building.result_Q_h = result["Q_h"]
+            building.result_Q_PV_total = result["Q_PV_total"] * rnd.choice([0.0, 0.1, 1.0, 10.0])
+            building.ngf_t = rnd.choice([result["ngf_t"], 0.0])
+            buildings.append(building)
+            sheets.append(EnergyResultSheet01(E42_solar_generation_factor=rnd.uniform(0, 0.5)))
+
+        batch = calculate_sheet01_batch({
+            "heating_kwh_a": [b.result_Q_h for b in buildings],
+            "pv_total_kwh_a": [b.result_Q_PV_total for b in buildings],
+            "ngf_m2": [b.ngf_t for b in buildings],
+            "E42_solar_generation_factor": [s.E42_solar_generation_factor for s in sheets],
+        })
+
+        for i, (building, sheet) in enumerate(zip(buildings, sheets)):
+            for key, value in calculate_sheet01(building, sheet).items():
+                if key == "I79":
+                    continue
+                self.assertEqual(round(batch[key][i], 3), value, f"{key} (Gebäude {i})")
+
+
+class Sheet01GraphTest(SimpleTestCase):
+
+    def setUp(self):
+        self.inputs = {
+            "heating_kwh_a": 52000.0,
+            "ventilation_kwh_a": 3100.0,
+            "pv_total_kwh_a": 8000.0,
+            "ngf_m2": 640.0,
+            "E42_solar_generation_factor": 0.1,
+        }
+
+    def test_change_recomputes_only_downstream(self):
+        graph = Sheet01Graph(self.inputs)
+        graph.values()
+        computed = graph.evaluations
+
+        invalid = graph.set_inputs({**self.inputs, "E42_solar_generation_factor": 0.25})
+        self.assertEqual(invalid, SHEET01_DOWNSTREAM["E42_solar_generation_factor"])
+        self.assertIn("F80", invalid)
+        self.assertNotIn("F22", invalid)
+        self.assertNotIn("F25", invalid)
+
+        values = graph.values()
+        self.assertEqual(graph.evaluations - computed, len(invalid))
+        self.assertEqual(values, Sheet01Graph(graph.inputs).values())
+
+        # unveränderte Eingaben -> nichts zu rechnen
+        self.assertEqual(graph.set_inputs(graph.inputs), set())
+        graph.values()
+        self.assertEqual(graph.evaluations - computed, len(invalid))
+
+    def test_requested_cells_only(self):
+        graph = Sheet01Graph(self.inputs)
+        self.assertEqual(graph.values(["G22", "unbekannt"]), {"G22": round(52000.0 / 640.0, 3)})
+        # G22 braucht nur F22 und NGF_t
+        self.assertEqual(graph.evaluations, 3)
+
+
+class SummaryDashboardTest(TestCase):
+
+    def test_dashboard_uses_cell_graph(self):
+        building = make_building(4)
+        apply_heating_result(building, calc_heating_demand(building))
+        building.save()
+
+        response = self.client.get(reverse("summary_dashboard"), {"building": building.pk})
+        self.assertEqual(response.status_code, 200)
+        sheet = EnergyResultSheet01.objects.get(building=building)
+        expected = Sheet01Graph(sheet01_inputs(building, sheet)).values()
+        for key, value in response.context["calc"].items():
+            self.assertEqual(value, expected[key], key)
+
+
+class ViewQueryBudgetTest(TestCase):
+    """Gebäude mit Blatt 01, Lüftung und GWP -> je Seite genau eine Abfrage."""
+
+    def setUp(self):
+        caches["sheet01"].clear()
+        self.building = make_building(2)
+        apply_heating_result(self.building, calc_heating_demand(self.building))
+        self.building.save()
+        VentilationScenario.objects.create(building=self.building, total_area=300, result_energy_kwh=800)
+        GwpManufacturing.objects.create(
+            building=self.building, kg300_new_qty=100, kg300_new_factor=45, service_life_years=40,
+        )
+        GwpCompensation.objects.create(building=self.building, gas_kwh=9000)
+
+    def test_summary_dashboard(self):
+        url = reverse("summary_dashboard")
+        self.client.get(url, {"building": self.building.pk})  # legt Blatt 01 an
+        self.assertTrue(EnergyResultSheet01.objects.filter(building=self.building).exists())
+
+        caches["sheet01"].clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"building": self.building.pk})
+        building = Building.objects.get(pk=self.building.pk)
+        expected = calculate_sheet01(building, building.sheet01)
+        for key, value in response.context["calc"].items():
+            self.assertEqual(value, expected[key], key)
+
+        with self.assertNumQueries(1):  # ohne ?building: letztes Gebäude
+            self.client.get(url)
+
+    def test_gwp_views(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("gwp_overview", args=[self.building.pk]))
+        self.assertEqual(response.context["compensation"].gas_kwh, 9000)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("gwp_compensation_edit", args=[self.building.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class PortfolioSheet01Test(TestCase):
+
+    def setUp(self):
+        self.buildings = []
+        for seed in range(6):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            self.buildings.append(building)
+
+        first, second, third = self.buildings[:3]
+        EnergyResultSheet01.objects.create(building=first, E42_solar_generation_factor=0.2)
+        VentilationScenario.objects.create(building=first, total_area=500, result_energy_kwh=1234.5)
+        GwpManufacturing.objects.create(
+            building=second, kg300_new_qty=100, kg300_new_factor=45, kg400_existing_qty=20,
+            kg400_existing_factor=12, service_life_years=40,
+        )
+        GwpCompensation.objects.create(building=second, gas_kwh=9000, electricity_kwh=2500)
+        GwpCompensation.objects.create(building=third, heat_district_avg_kwh=4000)
+
+    def test_portfolio_matches_single_building_sheet(self):
+        with self.assertNumQueries(1):
+            portfolio = evaluate_portfolio()
+        self.assertEqual(portfolio["count"], len(self.buildings))
+
+        for i, pk in enumerate(portfolio["id"]):
+            building = Building.objects.get(pk=pk)
+            sheet = getattr(building, "sheet01", None) or EnergyResultSheet01(building=building)
+            for key, value in calculate_sheet01(building, sheet).items():
+                if key == "I79":
+                    continue
+                self.assertEqual(round(portfolio["cells"][key][i], 3), value, f"{key} ({pk})")
+
+    def test_portfolio_view_and_csv(self):
+        response = self.client.get(reverse("portfolio_sheet01"), {"sort": "F80", "dir": "desc"})
+        self.assertEqual(response.status_code, 200)
+        values = [row[6] for row in response.context["rows"]]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+        response = self.client.get(reverse("portfolio_sheet01_csv"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), len(self.buildings) + 1)
+        self.assertTrue(lines[0].startswith("ID;Name;F22;G22"))
+
+
+class Sheet01CacheTest(TestCase):
+
+    def setUp(self):
+        caches["sheet01"].clear()
+        self.building = make_building(5)
+        apply_heating_result(self.building, calc_heating_demand(self.building))
+        self.building.result_Q_h = 48000.0
+        self.building.save()
+        self.sheet = EnergyResultSheet01.objects.create(building=self.building)
+
+    def load(self):
+        # wie im Dashboard: frisch geladenes Gebäude samt Relationen (eine Abfrage)
+        building = sheet01_buildings().get(pk=self.building.pk)
+        return building, building.sheet01
+
+    def test_repeated_views_hit_cache(self):
+        building, sheet = self.load()
+        first = cached_sheet01(building, sheet)
+        self.assertEqual(first, calculate_sheet01(building, sheet))
+
+        building, sheet = self.load()
+        with self.assertNumQueries(0), \
+                mock.patch("energyapp.logic.sheet01_cache.evaluate_sheet01") as evaluate:
+            self.assertEqual(cached_sheet01(building, sheet, ["F80", "G80"]),
+                             {"F80": first["F80"], "G80": first["G80"]})
+            evaluate.assert_not_called()
+
+    def test_changed_inputs_miss_cache(self):
+        before = cached_sheet01(*self.load())
+
+        GwpCompensation.objects.create(building=self.building, gas_kwh=5000)
+        after_gwp = cached_sheet01(*self.load())
+        self.assertGreater(after_gwp["gwp_operation_per_year"], 0)
+
+        # Änderung ohne Signale (wie bulk_update in recalculate_buildings / anderer Prozess)
+        EnergyResultSheet01.objects.filter(pk=self.sheet.pk).update(E42_solar_generation_factor=0.3)
+        after_e42 = cached_sheet01(*self.load())
+        self.assertNotEqual(after_e42["F42"], before["F42"])
+
+        # gleiche Eingaben wie vorher -> gleicher Hash, vorhandenes Ergebnis
+        EnergyResultSheet01.objects.filter(pk=self.sheet.pk).update(E42_solar_generation_factor=0.0)
+        GwpCompensation.objects.filter(building=self.building).delete()
+        self.assertEqual(cached_sheet01(*self.load()), before)
+
+
+class BatchCalculationApiTest(TestCase):
+
+    def setUp(self):
+        self.buildings = [make_building(seed) for seed in range(5)]
+        self.records = [
+            {"id": f"ext-{i}", **{field: getattr(b, field) for field in CALC_FIELDS}}
+            for i, b in enumerate(self.buildings)
+        ]
+        self.url = reverse("batch_calculate")
+
+    def post(self, payload, **kwargs):
+        return self.client.post(self.url, json.dumps(payload), content_type="application/json", **kwargs)
+
+    def assert_matches_scalar(self, result, building):
+        expected = calc_heating_demand(building)
+        for key, value in result["heating"].items():
+            self.assertAlmostEqual(value, expected[key], places=6, msg=key)
+        self.assertEqual(len(result["monthly"]["q_h"]), 12)
+        self.assertAlmostEqual(sum(result["monthly"]["q_h"]), result["monthly"]["annual_heating_demand"])
+
+        apply_heating_result(building, expected)
+        sheet = calculate_sheet01(building, EnergyResultSheet01())
+        for key, value in result["sheet01"].items():
+            self.assertEqual(round(value, 3), sheet[key], key)
+
+    def test_single_and_batch(self):
+        with self.assertNumQueries(0):
+            response = self.post(self.records[0])
+        self.assertEqual(response.status_code, 200)
+        self.assert_matches_scalar(response.json(), self.buildings[0])
+
+        broken = dict(self.records[1], u_wall="abc", u_walls=1)
+        del broken["length_ns"]
+        response = self.post([self.records[0], broken, self.records[2]])
+        data = response.json()
+        self.assertEqual((data["count"], data["error_count"]), (3, 1))
+        self.assertEqual(
+            sorted(error["field"] for error in data["results"][1]["errors"]),
+            ["length_ns", "u_wall", "u_walls"],
+        )
+        self.assertEqual(data["results"][2]["id"], "ext-2")
+        self.assert_matches_scalar(data["results"][2], self.buildings[2])
+        self.assertFalse(Building.objects.exists())
+
+        self.assertEqual(self.post(broken).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_ndjson(self):
+        response = self.post(self.records, QUERY_STRING="format=ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [r["id"] for r in self.records])
+
+        body = "\n".join(json.dumps(r) for r in self.records[:2]) + "\n{kaputt\n"
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+        results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(results), 3)
+        self.assert_matches_scalar(results[1], self.buildings[1])
+        self.assertIn("Ungültiges JSON", results[2]["errors"][0]["message"])
+
+
+class BuildingExportCsvTest(TestCase):
+
+    def setUp(self):
+        self.buildings = []
+        for seed in range(5):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            self.buildings.append(building)
+
+    def export(self, **params):
+        response = self.client.get(reverse("building_export_csv"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_streams_all_buildings_with_extra_columns(self):
+        lines = self.export()
+        self.assertEqual(len(lines), len(self.buildings) + 1)
+        header = lines[0].split(";")
+        # bisherige Spalten unverändert vorne, neue hinten
+        self.assertEqual(header[:11], [
+            "ID", "Name", "Grundfläche [m²]", "Q_h [kWh/a]", "Q_T [kWh/a]", "Q_V [kWh/a]",
+            "Q_I [kWh/a]", "Q_S [kWh/a]", "PV gesamt [kWh/a]", "PV Eigenverbrauch [kWh/a]",
+            "PV Überschuss [kWh/a]",
+        ])
+        for column in ("H_T [W/K]", "H_V [W/K]", "Q_S Süd [kWh/a]", "NGF_t [m²]"):
+            self.assertIn(column, header[11:])
+        first = dict(zip(header, lines[1].split(";")))
+        self.assertEqual(float(first["H_T [W/K]"]), self.buildings[0].result_H_T)
+
+    def test_filters(self):
+        picked = [self.buildings[1].pk, self.buildings[3].pk]
+        lines = self.export(ids=",".join(map(str, picked)), order="q_h_desc")
+        ids = [int(line.split(";")[0]) for line in lines[1:]]
+        expected = sorted(self.buildings[1::2], key=lambda b: -b.result_Q_h)
+        self.assertEqual(ids, [b.pk for b in expected])
+
+        self.assertEqual(len(self.export(changed_since="2999-01-01")), 1)
+        self.assertEqual(len(self.export(changed_since="2000-01-01T00:00")), 6)
+
+        response = self.client.get(reverse("building_export_csv"), {"changed_since": "gestern"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BuildingExportXlsxTest(TestCase):
+
+    def setUp(self):
+        self.buildings = []
+        for seed in range(5):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            self.buildings.append(building)
+        GwpCompensation.objects.create(building=self.buildings[0], gas_kwh=1000)
+
+    def test_multi_sheet_workbook(self):
+        with tempfile.SpooledTemporaryFile() as output:
+            write_xlsx(Building.objects.order_by("id"), output, parse_sheets("all"), chunk_size=2)
+            output.seek(0)
+            wb = load_workbook(output, read_only=True)
+            self.assertEqual(wb.sheetnames, list(XLSX_SHEETS.values()))
+            sheets = {name: list(wb[name].values) for name in wb.sheetnames}
+
+        for rows in sheets.values():
+            self.assertEqual(len(rows), len(self.buildings) + 1)
+        self.assertEqual(sheets["Gebäude"][0][8:11], (
+            "PV gesamt [kWh/a]", "PV Eigenverb [kWh/a]", "PV Überschuss [kWh/a]"
+        ))
+
+        monthly = sheets["Monatsbilanz"]
+        building = self.buildings[3]
+        expected = EnergyCalculator(building).calculate()
+        self.assertEqual(monthly[4][0], building.pk)
+        self.assertAlmostEqual(monthly[4][-2], expected["annual_heating_demand"], places=0)
+
+        gwp = sheets["GWP"]
+        self.assertEqual(gwp[0][5], "gwp_operation_per_year")
+        self.assertAlmostEqual(gwp[1][5], 1000 * 0.201)
+
+    def test_view_streams_file(self):
+        response = self.client.get(reverse("building_export_xlsx"), {"sheets": "buildings,gwp"})
+        self.assertEqual(response.status_code, 200)
+        wb = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        self.assertEqual(wb.sheetnames, ["Gebäude", "GWP"])
+
+        response = self.client.get(reverse("building_export_xlsx"), {"sheets": "foo"})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewsTest(TestCase):
+    """async_views liefern dasselbe wie die synchronen Views (aufgerufen wie unter ASGI)."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(REPORT_CACHE_DIR=Path(tmp.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.buildings = []
+        for seed in range(4):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            self.buildings.append(building)
+        GwpCompensation.objects.create(building=self.buildings[1], gas_kwh=1000)
+        self.factory = AsyncRequestFactory()
+
+    async def content(self, response):
+        self.assertTrue(response.is_async)
+        return b"".join([part async for part in response.streaming_content])
+
+    def sync_content(self, name, params=None):
+        return b"".join(self.client.get(reverse(name), params or {}).streaming_content)
+
+    async def test_exports_match_sync_views(self):
+        params = {"order": "q_h_desc"}
+        response = await async_views.building_export_csv(self.factory.get("/", params))
+        expected = await sync_to_async(self.sync_content)("building_export_csv", params)
+        self.assertEqual(await self.content(response), expected)
+
+        params = {"sheets": "all"}
+        response = await async_views.building_export_xlsx(self.factory.get("/", params))
+        expected = await sync_to_async(self.sync_content)("building_export_xlsx", params)
+        workbooks = [
+            load_workbook(BytesIO(data), read_only=True)
+            for data in (await self.content(response), expected)
+        ]
+        self.assertEqual(
+            *[{name: list(wb[name].values) for name in wb.sheetnames} for wb in workbooks]
+        )
+
+        response = await async_views.building_export_pdf(self.factory.get("/"))
+        self.assertTrue(response.content.startswith(b"%PDF"))
+        with mock.patch("energyapp.views.async_views.PDF_SYNC_LIMIT", 2):
+            response = await async_views.building_export_pdf(self.factory.get("/"))
+        job = await BackgroundJob.objects.aget()
+        self.assertEqual((response.status_code, response.url), (302, reverse("job_detail", args=[job.pk])))
+
+    async def test_result_pdf(self):
+        pk = self.buildings[0].pk
+        response = await async_views.building_result_pdf(self.factory.get("/"), pk)
+        data = await self.content(response)
+        self.assertTrue(data.startswith(b"%PDF"))
+        self.assertEqual(int(response["Content-Length"]), len(data))
+
+        request = self.factory.get("/", headers={"if-none-match": response["ETag"]})
+        self.assertEqual((await async_views.building_result_pdf(request, pk)).status_code, 304)
+        with self.assertRaises(Http404):
+            await async_views.building_result_pdf(self.factory.get("/"), 0)
+
+    async def test_batch_calculate(self):
+        records = [{field: getattr(b, field) for field in CALC_FIELDS} for b in self.buildings]
+        records.append({"length_ns": "x"})
+        request = self.factory.post("/", json.dumps(records), content_type="application/json")
+        data = json.loads((await async_views.batch_calculate(request)).content)
+        self.assertEqual((data["count"], data["error_count"]), (5, 1))
+
+        body = "".join(json.dumps(r) + "\n" for r in records)
+        request = self.factory.post("/", body, content_type="application/x-ndjson")
+        with mock.patch("energyapp.logic.batch_calculation.CHUNK_SIZE", 2):
+            lines = (await self.content(await async_views.batch_calculate(request))).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], data["results"])
+
+
+class BackgroundJobTest(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(EXPORT_ROOT=Path(tmp.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for seed in range(3):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+
+    def test_submit_run_and_download(self):
+        response = self.client.post(
+            reverse("export_job_submit"), {"format": "xlsx", "sheets": "buildings,gwp"}
+        )
+        job = BackgroundJob.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+        self.assertEqual(job.params, {"sheets": "buildings,gwp"})
+
+        call_command("run_jobs", once=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+        self.assertEqual((job.progress_done, job.progress_total), (3, 3))
+
+        status = self.client.get(reverse("job_detail", args=[job.pk]), {"format": "json"}).json()
+        self.assertTrue(status["download"])
+
+        response = self.client.get(reverse("job_download", args=[job.pk]))
+        wb = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        self.assertEqual(wb.sheetnames, ["Gebäude", "GWP"])
+        response.close()
+
+    def test_pdf_and_csv_jobs(self):
+        pdf = submit_job("export_pdf", {"order": "name"})
+        csv_job = submit_job("export_csv", {"ids": str(Building.objects.first().pk)})
+        call_command("run_jobs", once=True, stdout=StringIO())
+
+        pdf.refresh_from_db()
+        csv_job.refresh_from_db()
+        self.assertEqual(pdf.status, BackgroundJob.STATUS_DONE)
+        self.assertTrue(pdf.artifact.endswith(".pdf"))
+        self.assertEqual(csv_job.status, BackgroundJob.STATUS_DONE)
+        with open(settings.EXPORT_ROOT / csv_job.artifact, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+    def test_failed_job_and_claim(self):
+        job = submit_job("export_xlsx", {"sheets": "foo"})
+        self.assertEqual(claim_next_job("a").pk, job.pk)
+        self.assertIsNone(claim_next_job("b"))
+
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.STATUS_PENDING)
+        call_command("run_jobs", once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertIn("ExportError", job.error)
+
+    def test_stale_running_jobs_recovered(self):
+        crashed = submit_job("export_csv")
+        given_up = submit_job("export_csv")
+        busy = submit_job("export_csv")
+        deleting = submit_job("delete_buildings", {"all": "1"})
+        for job in (crashed, given_up, busy, deleting):
+            self.assertEqual(claim_next_job("tot").pk, job.pk)
+        old = timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER + 1)
+        BackgroundJob.objects.filter(
+            pk__in=[crashed.pk, given_up.pk, deleting.pk]
+        ).update(heartbeat_at=old)
+        BackgroundJob.objects.filter(pk=given_up.pk).update(attempts=settings.JOB_MAX_ATTEMPTS)
+        stale = BackgroundJob.objects.get(pk=crashed.pk)
+
+        call_command("run_jobs", once=True, stdout=StringIO())
+        for job in (crashed, given_up, busy, deleting):
+            job.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.attempts), (BackgroundJob.STATUS_DONE, 2))
+        self.assertEqual(given_up.status, BackgroundJob.STATUS_FAILED)
+        self.assertIn("Lebenszeichen", given_up.error)
+        # Löschen/Import schreiben blockweise fest: kein zweiter Versuch
+        self.assertEqual((deleting.status, deleting.attempts), (BackgroundJob.STATUS_FAILED, 1))
+        self.assertEqual(Building.objects.count(), 3)
+        self.assertEqual(busy.status, BackgroundJob.STATUS_RUNNING)
+
+        # der alte Worker meldet sich zurück: sein Ergebnis zählt nicht mehr
+        run_job(stale)
+        crashed.refresh_from_db()
+        self.assertEqual(crashed.worker, worker_name())
+
+    def test_write_atomic_per_attempt(self):
+        path = Path(settings.EXPORT_ROOT) / "artifact.bin"
+
+        def write(payload):
+            def inner(fileobj):
+                for _ in range(200):
+                    fileobj.write(payload)
+            return inner
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda b: _write_atomic(path, write(b)), [b"a" * 512, b"b" * 512] * 2))
+        data = path.read_bytes()
+        self.assertIn(data, (b"a" * 512 * 200, b"b" * 512 * 200))
+
+        with self.assertRaises(ZeroDivisionError):
+            _write_atomic(path, lambda fileobj: 1 / 0)
+        self.assertEqual([p.name for p in path.parent.iterdir()], ["artifact.bin"])
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.01)
+    def test_heartbeat_without_progress(self):
+        def silent(job, progress):
+            time.sleep(0.2)  # z.B. langes workbook.save ohne Fortschritt
+            return ""
+
+        with mock.patch.dict(JOB_HANDLERS, {"silent": silent}), \
+                mock.patch("energyapp.logic.jobs._beat") as beat:
+            job = submit_job("silent")
+            self.assertTrue(run_job(claim_next_job("w")))
+        self.assertGreater(beat.call_count, 1)
+        self.assertEqual(beat.call_args.args[0].pk, job.pk)
+
+    def test_large_pdf_export_becomes_job(self):
+        response = self.client.get(reverse("building_export_pdf"))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+        with mock.patch("energyapp.views.building_view.PDF_SYNC_LIMIT", 2):
+            response = self.client.get(reverse("building_export_pdf"), {"order": "q_h"})
+        job = BackgroundJob.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+        self.assertEqual((job.kind, job.params), ("export_pdf", {"order": "q_h"}))
+
+        response = self.client.post(reverse("export_job_submit"), {"format": "doc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BuildingReportCacheTest(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        settings_override = override_settings(REPORT_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        state = mock.patch.dict(report_cache._evict_state, {"last": None, "written": 0})
+        state.start()
+        self.addCleanup(state.stop)
+
+        self.building = make_building(1)
+        apply_heating_result(self.building, calc_heating_demand(self.building))
+        self.building.save()
+
+    def test_etag_and_not_modified(self):
+        url = reverse("building_result_pdf", args=[self.building.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        response.close()
+        etag = response["ETag"]
+
+        with mock.patch("energyapp.logic.report_cache.render_building_report") as render:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(url)
+            response.close()
+            render.assert_not_called()
+
+        # neue Ergebnisse -> neuer ETag, altes PDF wird ersetzt
+        Building.objects.filter(pk=self.building.pk).update(result_Q_h=1.0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        response.close()
+        self.assertEqual(len(list(self.cache_dir.glob("*.pdf"))), 1)
+
+        self.assertEqual(self.client.get(reverse("building_result_pdf", args=[0])).status_code, 404)
+
+    def test_lru_eviction(self):
+        values = report_values(self.building)
+        first = cached_report(values)
+        second = cached_report(dict(values, id=values["id"] + 1))
+        os.utime(first, (0, 0))
+        self.assertEqual(evict(max_bytes=second.stat().st_size), 1)
+        self.assertFalse(first.exists())
+        self.assertTrue(second.exists())
+
+    def test_open_report_survives_eviction(self):
+        values = report_values(self.building)
+        real = report_cache.cached_report
+        calls = []
+
+        def evicted_before_open(*args):
+            path = real(*args)
+            calls.append(path)
+            if len(calls) == 1:
+                path.unlink()  # evict() eines anderen Requests
+            return path
+
+        with mock.patch("energyapp.logic.report_cache.cached_report", evicted_before_open):
+            with report_cache.open_report(values) as fileobj:
+                self.assertTrue(fileobj.read().startswith(b"%PDF"))
+        self.assertEqual(len(calls), 2)
+
+    def test_concurrent_render_and_throttled_eviction(self):
+        values = report_values(self.building)
+        pdf = b"%PDF-" + b"x" * 100_000
+
+        def render(_):
+            time.sleep(0.05)
+            return pdf
+
+        with mock.patch("energyapp.logic.report_cache.render_building_report", render), \
+                mock.patch("energyapp.logic.report_cache.evict") as evict_mock, \
+                ThreadPoolExecutor(max_workers=4) as pool:
+            paths = list(pool.map(lambda _: cached_report(values), range(4)))
+            cached_report(dict(values, id=values["id"] + 1))
+
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(paths[0].read_bytes(), pdf)
+        self.assertEqual(list(self.cache_dir.glob("*.part")), [])
+        # nur ein Durchsuchen des Verzeichnisses je EVICT_INTERVAL
+        self.assertEqual(evict_mock.call_count, 1)
+
+
+class BuildingReportZipTest(TestCase):
+
+    def setUp(self):
+        for seed in range(4):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+
+    def test_command_writes_one_report_per_building(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "berichte.zip"
+            call_command("export_reports", str(output), workers=2, stdout=StringIO())
+            with zipfile.ZipFile(output) as archive:
+                names = sorted(archive.namelist())
+                pdf = archive.read(names[0])
+
+        ids = sorted(Building.objects.values_list("id", flat=True))
+        self.assertEqual(names, sorted(f"building_{pk}_bericht.pdf" for pk in ids))
+        self.assertTrue(pdf.startswith(b"%PDF"))
+
+    @override_settings(EXPORT_ROOT=Path(tempfile.gettempdir()) / "energyapp-test-exports")
+    def test_job(self):
+        pk = Building.objects.first().pk
+        job = submit_job("export_reports", {"ids": str(pk), "workers": 1})
+        call_command("run_jobs", once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+        path = settings.EXPORT_ROOT / job.artifact
+        self.addCleanup(shutil.rmtree, settings.EXPORT_ROOT, True)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.namelist(), [f"building_{pk}_bericht.pdf"])
+
+
+class BuildingImportTest(TestCase):
+
+    def rows(self, count):
+        return [
+            [getattr(make_building(seed), field) for field in IMPORT_FIELDS]
+            for seed in range(count)
+        ]
+
+    def csv_file(self, rows):
+        text = StringIO()
+        writer = csv.writer(text, delimiter=";")
+        writer.writerow(IMPORT_FIELDS)
+        writer.writerows(rows)
+        return BytesIO(text.getvalue().encode("utf-8"))
+
+    def test_csv_with_errors(self):
+        rows = self.rows(5)
+        rows[1][IMPORT_FIELDS.index("length_ns")] = "abc"
+        rows[3][IMPORT_FIELDS.index("name")] = "x" * 150
+        rows[4][IMPORT_FIELDS.index("u_wall")] = str(rows[4][IMPORT_FIELDS.index("u_wall")]).replace(".", ",")
+
+        summary = import_buildings(self.csv_file(rows), "gebaeude.csv", chunk_size=2)
+
+        self.assertEqual((summary["rows"], summary["created"], summary["error_count"]), (5, 3, 2))
+        self.assertEqual([(line, field) for line, field, _ in summary["errors"]],
+                         [(3, "length_ns"), (5, "name")])
+
+        building = Building.objects.get(name="Testgebäude 4")
+        expected = calc_heating_demand(building)
+        self.assertEqual(building.result_Q_h, expected["Q_h"])
+        self.assertFalse(needs_recalculation(building))
+
+    def test_non_finite_numbers_rejected(self):
+        rows = self.rows(4)
+        for i, text in enumerate(("nan", "inf", "1e999")):
+            rows[i][IMPORT_FIELDS.index("u_roof")] = text
+
+        summary = import_buildings(self.csv_file(rows), "gebaeude.csv")
+
+        self.assertEqual((summary["created"], summary["error_count"]), (1, 3))
+        self.assertEqual({field for _, field, _ in summary["errors"]}, {"u_roof"})
+        stats = get_statistics()
+        self.assertEqual(stats.building_count, 1)
+        self.assertTrue(math.isfinite(stats.q_h_sum))
+
+    def test_xlsx_and_missing_columns(self):
+        wb = Workbook()
+        wb.active.append(IMPORT_FIELDS)
+        for row in self.rows(3):
+            wb.active.append(row)
+        output = BytesIO()
+        wb.save(output)
+        output.seek(0)
+
+        summary = import_buildings(output, "gebaeude.xlsx", dry_run=True)
+        self.assertEqual((summary["rows"], summary["created"]), (3, 0))
+        self.assertEqual(Building.objects.count(), 0)
+
+        with self.assertRaises(BuildingImportError):
+            import_buildings(BytesIO(b"name;u_wall\nA;1\n"), "gebaeude.csv")
+
+    def test_upload_runs_as_job(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(EXPORT_ROOT=Path(tmp)):
+            upload = SimpleUploadedFile("gebaeude.csv", self.csv_file(self.rows(2)).getvalue())
+            response = self.client.post(reverse("building_import"), {"file": upload})
+            job = BackgroundJob.objects.get()
+            self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+
+            call_command("run_jobs", once=True, stdout=StringIO())
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJob.STATUS_DONE, job.error)
+            self.assertEqual(job.progress_total, 2)
+            self.assertEqual(Building.objects.count(), 2)
+            self.assertFalse(any((Path(tmp) / "imports").iterdir()))
+
+
+class BuildingListPaginationTest(TestCase):
+
+    def setUp(self):
+        for seed in range(12):
+            building = make_building(seed, name=f"Gebäude {seed % 4}")
+            if seed % 3:
+                apply_heating_result(building, calc_heating_demand(building))
+            if seed % 5 == 0:
+                building.result_Q_h = 1000.0  # gleiche Werte -> id entscheidet
+            building.save()
+
+    def walk(self, order, page_size=5):
+        seen, cursor = [], None
+        with mock.patch("energyapp.views.building_view.BUILDING_LIST_PAGE_SIZE", page_size):
+            while True:
+                params = {"order": order, **({"cursor": cursor} if cursor else {})}
+                response = self.client.get(reverse("building_list"), params)
+                seen += [b.pk for b in response.context["buildings"]]
+                cursor = response.context["next_cursor"]
+                if not cursor:
+                    return seen, response
+
+    def test_pages_match_full_ordering(self):
+        for order, order_by in BUILDING_ORDERS.items():
+            field = order_by.lstrip("-")
+            descending = order_by.startswith("-")
+            expected = sorted(
+                Building.objects.all(),
+                key=lambda b: (getattr(b, field) is None, getattr(b, field) or 0, b.pk)
+                if field != "name" else (b.name, b.pk),
+                reverse=descending,
+            )
+            seen, _ = self.walk(order)
+            self.assertEqual(seen, [b.pk for b in expected], order)
+
+    def test_previous_page_and_invalid_cursor(self):
+        with mock.patch("energyapp.views.building_view.BUILDING_LIST_PAGE_SIZE", 5):
+            first = self.client.get(reverse("building_list"), {"order": "q_h"}).context
+            second = self.client.get(
+                reverse("building_list"), {"order": "q_h", "cursor": first["next_cursor"]}
+            ).context
+            back = self.client.get(
+                reverse("building_list"), {"order": "q_h", "cursor": second["previous_cursor"]}
+            ).context
+            self.assertEqual(list(back["buildings"]), list(first["buildings"]))
+            self.assertIsNone(back["previous_cursor"])
+
+            # Cursor einer anderen Sortierung / manipuliert -> erste Seite
+            response = self.client.get(
+                reverse("building_list"), {"order": "name", "cursor": first["next_cursor"]}
+            )
+            self.assertIsNone(response.context["previous_cursor"])
+            response = self.client.get(reverse("building_list"), {"cursor": "kaputt"})
+            self.assertEqual(response.status_code, 200)
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse("building_list"), {"order": "area_desc"})
+
+
+class PortfolioStatisticsTest(TestCase):
+
+    def assertStatisticsCurrent(self):
+        stats = PortfolioStatistics.objects.get()
+        for field, value in compute_statistics().items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(getattr(stats, field), value, places=6, msg=field)
+            else:
+                self.assertEqual(getattr(stats, field), value, field)
+
+    def test_incremental_updates_match_full_recompute(self):
+        buildings = []
+        for seed in range(4):
+            building = make_building(seed)
+            if seed:
+                apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            buildings.append(building)
+        self.assertStatisticsCurrent()
+
+        # Bearbeiten, Umbenennen des letzten Gebäudes, GWP anlegen/ändern
+        url = reverse("building_edit", args=[buildings[1].pk])
+        form_data = {field: getattr(buildings[1], field) for field in BuildingForm.Meta.fields}
+        self.client.post(url, {**form_data, "u_wall": 0.9})
+        buildings[3].name = "Neu"
+        buildings[3].save(update_fields=["name"])
+        manufacturing = GwpManufacturing.objects.create(
+            building=buildings[2], kg300_new_qty=100, kg300_new_factor=2
+        )
+        GwpCompensation.objects.create(building=buildings[2], gas_kwh=1000)
+        manufacturing.service_life_years = 25
+        manufacturing.save()
+        self.assertStatisticsCurrent()
+        self.assertEqual(PortfolioStatistics.objects.get().last_building_name, "Neu")
+
+        # Löschen (inkl. Kaskade) und Massen-Schreibpfade
+        buildings[3].delete()
+        buildings[2].delete()
+        Building.objects.filter(pk=buildings[0].pk).update(calc_version=None)
+        call_command("recalculate_buildings", stdout=StringIO())
+        self.assertStatisticsCurrent()
+        self.assertEqual(PortfolioStatistics.objects.get().last_building_id, buildings[1].pk)
+
+        rows = [[getattr(make_building(seed), f) for f in IMPORT_FIELDS] for seed in (7, 8)]
+        text = StringIO()
+        csv.writer(text, delimiter=";").writerows([IMPORT_FIELDS, *rows])
+        import_buildings(BytesIO(text.getvalue().encode()), "gebaeude.csv")
+        self.assertStatisticsCurrent()
+        self.assertEqual(PortfolioStatistics.objects.get().building_count, 4)
+
+    def test_dashboard_reads_one_row(self):
+        building = make_building(1)
+        apply_heating_result(building, calc_heating_demand(building))
+        building.save()
+        get_statistics()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, building.name)
+
+    def test_reconcile_command_fixes_drift(self):
+        make_building(1).save()
+        PortfolioStatistics.objects.update(building_count=99)
+        out = StringIO()
+        call_command("reconcile_statistics", stdout=out)
+        self.assertIn("building_count: 99 -> 1", out.getvalue())
+        self.assertStatisticsCurrent()
+
+
+class PurgeBuildingsTest(TestCase):
+
+    def setUp(self):
+        category = VentilationUsageCategory.objects.create(name="Büro")
+        for seed in range(6):
+            building = make_building(seed)
+            apply_heating_result(building, calc_heating_demand(building))
+            building.save()
+            scenario = VentilationScenario.objects.create(building=building, total_area=500)
+            VentilationUsageShare.objects.create(
+                scenario=scenario, category=category, share_percent=100, persons=10,
+                air_change_rate=1, hours_per_day=10, days_per_year=250,
+            )
+            GwpManufacturing.objects.create(building=building, kg300_new_qty=10, kg300_new_factor=1)
+            GwpCompensation.objects.create(building=building, gas_kwh=100)
+            SummerProtection.objects.create(building=building)
+            EnergyResultSheet01.objects.create(
+                building=building, project="Nord" if seed < 4 else "Süd"
+            )
+
+    def test_plan_deletes_leaves_first(self):
+        plan = [(model, lookup) for model, lookup, _ in deletion_plan()]
+        self.assertLess(
+            plan.index((VentilationUsageShare, "scenario__building_id")),
+            plan.index((VentilationScenario, "building_id")),
+        )
+
+    def test_project_purge_is_set_based(self):
+        # Abfragen je Block unabhängig von der Anzahl Gebäude
+        with self.assertNumQueries(15):
+            deleted = purge_buildings(project_buildings("Nord"), chunk_size=10)
+        self.assertEqual(deleted, 4)
+
+        self.assertEqual(Building.objects.count(), 2)
+        for model in (VentilationScenario, VentilationUsageShare, GwpManufacturing,
+                      GwpCompensation, SummerProtection, EnergyResultSheet01):
+            self.assertEqual(model.objects.count(), 2, model.__name__)
+        self.assertEqual(VentilationUsageCategory.objects.count(), 1)
+
+        stats = PortfolioStatistics.objects.get()
+        expected = compute_statistics()
+        self.assertEqual(stats.building_count, expected["building_count"])
+        self.assertAlmostEqual(stats.gwp_operation_sum, expected["gwp_operation_sum"])
+        self.assertEqual(stats.last_building_id, expected["last_building_id"])
+
+    def test_delete_all_view_and_job(self):
+        with mock.patch("energyapp.views.building_view.DELETE_SYNC_LIMIT", 3):
+            response = self.client.post(reverse("building_delete_all"))
+        job = BackgroundJob.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+
+        call_command("run_jobs", once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE, job.error)
+        self.assertEqual(job.progress_done, 6)
+        self.assertFalse(Building.objects.exists())
+        self.assertFalse(VentilationUsageShare.objects.exists())
+        self.assertEqual(PortfolioStatistics.objects.get().building_count, 0)
+
+
+class UncertaintyTest(TestCase):
+
+    def test_monte_carlo_summary(self):
+        building = make_building(8)
+        result = run_uncertainty(building, samples=5000, seed=1)
+
+        q_h = result["results"]["Q_h"]
+        self.assertEqual(sum(q_h["histogram"]["counts"]), 5000)
+        self.assertLessEqual(q_h["percentiles"]["p5"], q_h["percentiles"]["p95"])
+        self.assertAlmostEqual(
+            q_h["percentiles"]["p50"], calc_heating_demand(building)["Q_h"],
+            delta=0.1 * calc_heating_demand(building)["Q_h"],
+        )
+        # reproduzierbar mit seed
+        self.assertEqual(run_uncertainty(building, samples=5000, seed=1), result)
+
+    def test_uncertainty_view(self):
+        building = make_building(9)
+        building.save()
+        url = reverse("building_uncertainty", args=[building.pk])
+
+        response = self.client.get(url, {"samples": 1000, "u_wall": "uniform:0.2:0.4"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["results"]), {"Q_h", "F54", "F80"})
+
+        for params in (
+            {"u_wall": "beta:1"},
+            {"u_wall": "normal:nan"},
+            {"u_wall": "uniform:0:inf"},
+            {"u_wall": "uniform:-1e308:1e308"},
+            {"u_wall": "triangular:0.2:0.5:0.4"},
+            {"seed": "-1"},
+        ):
+            response = self.client.get(url, dict(params, samples=100))
+            self.assertEqual(response.status_code, 400, params)
+
+
+class RetrofitOptimizerTest(TestCase):
+
+    def brute_force(self, building, target):
+        """Referenz: eine calc_heating_demand-Rechnung je Kombination."""
+        areas = calc_heating_demand(building)
+        slots = [
+            [None] + [m for m in DEFAULT_MEASURES if m["component"] == c]
+            for c in COMPONENTS
+        ]
+        best = None
+        for combo in product(*slots):
+            variant = make_building(0, **{f: getattr(building, f) for f in HEATING_INPUT_FIELDS})
+            cost = 0.0
+            for m in filter(None, combo):
+                u_field, area_key = COMPONENTS[m["component"]]
+                setattr(variant, u_field, m["u"])
+                for g_field in G_FIELDS if "g" in m else ():
+                    setattr(variant, g_field, m["g"])
+                cost += m["cost_per_m2"] * areas[area_key]
+            result = calc_heating_demand(variant)
+            if result["Q_h"] / result["ngf_t"] <= target and (best is None or cost < best):
+                best = cost
+        return best
+
+    def test_matches_brute_force_search(self):
+        building = make_building(11, u_wall=1.2, u_roof=0.9, u_window=2.8)
+        # Ziel zwischen Bestand und bestmöglicher Sanierung
+        front = optimize_retrofit(building, float("inf"))["pareto"]
+        target = (front[0]["specific"] + front[-1]["specific"]) / 2
+
+        result = optimize_retrofit(building, target)
+
+        self.assertEqual(result["combinations"], 3 * 3 * 2 * 4)
+        self.assertAlmostEqual(result["best"]["cost"], self.brute_force(building, target), places=1)
+        self.assertLessEqual(result["best"]["specific"], target)
+        # Pareto-Front: Kosten steigen, Q_h fällt
+        costs = [p["cost"] for p in result["pareto"]]
+        q_hs = [p["Q_h"] for p in result["pareto"]]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual(q_hs, sorted(q_hs, reverse=True))
+        self.assertEqual(result["pareto"][0]["measures"], [])
+
+    def test_retrofit_view(self):
+        building = make_building(12)
+        building.save()
+        url = reverse("building_retrofit", args=[building.pk])
+
+        response = self.client.get(url, {"target": 1e9})
+        self.assertEqual(response.json()["best"]["cost"], 0.0)
+
+        window = {"component": "window", "name": "Fenster", "u": 1.0, "cost": 100}
+        for payload in (
+            [1, 2],
+            {"target": 1e9, "measures": [{"component": "door", "u": 1}]},
+            {"target": 1e9, "measures": {"component": "wall"}},
+            {"target": 1e9, "measures": ["wall"]},
+            {"target": 1e9, "measures": [dict(window, u="dick")]},
+            {"target": 1e9, "measures": [dict(window, g=None)]},
+            {"target": 1e9, "measures": [dict(window, name=None)]},
+        ):
+            response = self.client.post(url, json.dumps(payload), content_type="application/json")
+            self.assertEqual(response.status_code, 400, payload)
+
+        response = self.client.post(
+            url, json.dumps({"target": 1e9, "measures": [window]}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class BenchmarkTest(TestCase):
+
+    def test_cases_and_regressions(self):
+        with mock.patch("energyapp.logic.benchmark.MIN_SECONDS", 0), \
+                mock.patch("energyapp.logic.benchmark.MIN_REPEAT", 1):
+            results = run_benchmarks(list(CASES), [3], memory=True)
+        self.assertEqual([r["case"] for r in results], list(CASES))
+        for result in results:
+            self.assertEqual(result["n"], 3)
+            self.assertGreater(result["per_second"], 0)
+            self.assertGreaterEqual(result["peak_bytes"], 0)
+        self.assertFalse(Building.objects.exists())
+
+        run = {"host": "ci", "results": [dict(results[0], per_second=50.0, peak_bytes=10**9)]}
+        previous = dict(results[0], per_second=100.0, peak_bytes=10**6)
+        history = {"runs": [{"host": "ci", "results": [previous]}]}
+        messages = check_regressions(history, run)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(check_regressions(history, dict(run, host="other")), [])
+
+    def test_command_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "history.json"
+            options = {
+                "sizes": "2", "case": ["calc_heating_demand"], "history": str(path),
+                "stdout": StringIO(), "stderr": StringIO(),
+            }
+            call_command("benchmark", **options)
+            history = json.loads(path.read_text())
+            self.assertEqual(len(history["runs"]), 1)
+            self.assertEqual(history["runs"][0]["results"][0]["case"], "calc_heating_demand")
+
+            history["runs"][0]["results"][0]["per_second"] = 1e15
+            path.write_text(json.dumps(history))
+            with self.assertRaises(CommandError):
+                call_command("benchmark", no_save=True, **options)
+
+
+class MetricsTest(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.metrics_dir = Path(tmp.name)
+        override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN="geheim")
+        override.enable()
+        self.addCleanup(override.disable)
+        building = make_building(1)
+        apply_heating_result(building, calc_heating_demand(building))
+        building.save()
+
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def scrape(self):
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer geheim")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if line and not line.startswith("#"):
+                key, value = line.rsplit(" ", 1)
+                samples[key] = float(value)
+        return samples
+
+    def test_requests_queries_and_kernels(self):
+        self.client.get(reverse("building_list"))
+        response = self.client.get(reverse("building_export_csv"))
+        b"".join(response.streaming_content)
+        response.close()
+        calc_heating_demand(make_building(2))
+
+        samples = self.scrape()
+        labels = '{view="building_list",method="GET",status="200"}'
+        self.assertEqual(samples[f"energyapp_http_request_duration_seconds_count{labels}"], 1)
+        self.assertEqual(
+            samples[f'energyapp_http_request_duration_seconds_bucket{labels[:-1]},le="+Inf"}}'], 1
+        )
+        queries = samples['energyapp_http_request_queries_sum{view="building_list"}']
+        self.assertGreater(queries, 0)
+        self.assertEqual(samples['energyapp_db_query_duration_seconds_count{view="building_list"}'], queries)
+        # Abfragen des CSV-Exports laufen erst beim Streamen
+        self.assertGreater(samples['energyapp_http_request_queries_sum{view="building_export_csv"}'], 0)
+        self.assertEqual(samples['energyapp_function_duration_seconds_count{function="calc_heating_demand"}'], 1)
+
+    def test_aggregates_process_files(self):
+        key = 'energyapp_http_request_duration_seconds_count{view="building_list",method="GET",status="200"}'
+        dead = subprocess.Popen([sys.executable, "-c", ""])
+        dead.wait()
+        # Werte zweier beendeter Worker
+        for suffix in ("a", "b"):
+            self.client.get(reverse("building_list"))
+            metrics.flush()
+            own = next(self.metrics_dir.glob(f"{os.getpid()}-*.json"))
+            own.rename(self.metrics_dir / f"{dead.pid}-{suffix}.json")
+            metrics.reset()
+
+        self.client.get(reverse("building_list"))
+        self.assertEqual(self.scrape()[key], 3)
+        # zusammengeführt ins Archiv, gleiche Summe beim nächsten Abruf
+        self.assertEqual(list(self.metrics_dir.glob(f"{dead.pid}-*")), [])
+        self.assertTrue((self.metrics_dir / metrics.ARCHIVE_FILE).exists())
+        self.assertEqual(self.scrape()[key], 3)
+
+    def test_requires_token(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer falsch").status_code, 403)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer geheim").status_code, 404)
+
+    def test_flush_in_background_thread(self):
+        with mock.patch.object(metrics, "flush") as flush:
+            metrics.FUNCTION_DURATION.observe(0.1, "test")
+            flush.assert_not_called()
+        self.assertTrue(metrics._state["flusher"].is_alive())
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import building_view
 from .views import summer_steps as summer_steps_views
@@ -6,6 +7,19 @@ from energyapp.views.gwp_manufacturing_view import gwp_manufacturing_edit
 from energyapp.views.gwp_overview import gwp_overview
 from energyapp.views.gwp_compensation_view import gwp_compensation_edit
 from .views.load_profile import energy_balance_view
+from energyapp.views.sweep import building_sweep
+from energyapp.views.uncertainty import building_uncertainty
+from energyapp.views.retrofit import building_retrofit
+from energyapp.views.portfolio import portfolio_sheet01, portfolio_sheet01_csv
+from energyapp.views.jobs import building_import, export_job_submit, job_detail, job_download
+from energyapp.views import async_views, batch_calculation
+from energyapp.views.metrics import metrics
+
+# unter ASGI (energy_site/asgi.py setzt ASYNC_VIEWS) die async Varianten der
+# Export-, Berichts- und Berechnungs-Views, unter WSGI die synchronen
+export_views = async_views if settings.ASYNC_VIEWS else building_view
+calculation_views = async_views if settings.ASYNC_VIEWS else batch_calculation
+
 urlpatterns = [
     path("", building_view.dashboard, name="dashboard"),
     path("calculator/", building_view.building_create_detailed, name="building_create"),
@@ -15,15 +29,26 @@ urlpatterns = [
     path("buildings/<int:pk>/edit/", building_view.building_edit, name="building_edit"),
     path("buildings/<int:pk>/delete/", building_view.building_delete, name="building_delete"),
     path("buildings/delete_all/", building_view.building_delete_all, name="building_delete_all"),
-    path("buildings/export/csv/", building_view.building_export_csv, name="building_export_csv"),
-    path("buildings/export/xlsx/", building_view.building_export_xlsx, name="building_export_xlsx"),
-    path("buildings/export/pdf/", building_view.building_export_pdf, name="building_export_pdf"),
-    path("buildings/<int:pk>/result/pdf/", building_view.building_result_pdf, name="building_result_pdf"),
+    path("buildings/export/csv/", export_views.building_export_csv, name="building_export_csv"),
+    path("buildings/export/xlsx/", export_views.building_export_xlsx, name="building_export_xlsx"),
+    path("buildings/export/pdf/", export_views.building_export_pdf, name="building_export_pdf"),
+    path("buildings/import/", building_import, name="building_import"),
+    path("buildings/export/job/", export_job_submit, name="export_job_submit"),
+    path("jobs/<int:pk>/", job_detail, name="job_detail"),
+    path("jobs/<int:pk>/download/", job_download, name="job_download"),
+    path("buildings/<int:pk>/result/pdf/", export_views.building_result_pdf, name="building_result_pdf"),
+    path("buildings/<int:pk>/sweep/", building_sweep, name="building_sweep"),
+    path("buildings/<int:pk>/uncertainty/", building_uncertainty, name="building_uncertainty"),
+    path("buildings/<int:pk>/retrofit/", building_retrofit, name="building_retrofit"),
     path("summer/", summer_steps_views.summer_step1, name="summer"),
     path("summer/step1/", summer_steps_views.summer_step1, name="summer_step1"),
     path("summer/step2/", summer_steps_views.summer_step2, name="summer_step2"),
     path("summer/fc-info/", summer_views.fc_info, name="fc_info"),
     path("summary-dashboard/", building_view.summary_dashboard, name="summary_dashboard"),
+    path("api/calculate/", calculation_views.batch_calculate, name="batch_calculate"),
+    path("metrics", metrics, name="metrics"),
+    path("portfolio/", portfolio_sheet01, name="portfolio_sheet01"),
+    path("portfolio/export/csv/", portfolio_sheet01_csv, name="portfolio_sheet01_csv"),
     path("internal-gains/", building_view.internal_gains, name="internal_gains"),
     path(
         "buildings/<int:building_id>/gwp/",
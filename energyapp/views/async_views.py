@@ -0,0 +1,176 @@
+"""
+Async Varianten der Export-, Berichts- und Berechnungs-Views für den
+Betrieb unter ASGI (energy_site/asgi.py setzt ASYNC_VIEWS, urls.py wählt
+dann diese Views).
+
+Gelesen wird mit dem async ORM, gerechnet und gerendert im begrenzten
+Thread-Pool (logic/executor.py), gesendet wird über async Iteratoren.
+Ein Worker bedient so weiter andere Anfragen, während ein Export läuft.
+"""
+import json
+import os
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from energyapp.logic.batch_calculation import calculate_batch, iter_chunks, read_ndjson
+from energyapp.logic.executor import run_cpu
+from energyapp.logic.exports import (
+    CHUNK_SIZE,
+    EXPORT_FILTER_PARAMS,
+    ExportError,
+    XlsxExport,
+    aexport_rows,
+    aiterate,
+    chunk_portfolio_query,
+    filter_buildings,
+    parse_sheets,
+)
+from energyapp.logic.jobs import submit_job
+from energyapp.logic.report_cache import open_report
+from energyapp.logic.reports import (
+    BUILDINGS_PDF_FIELDS,
+    REPORT_FIELDS,
+    report_digest,
+    report_filename,
+    write_buildings_pdf_rows,
+)
+from energyapp.models import Building
+from energyapp.views.batch_calculation import NDJSON, batch_response, wants_ndjson
+from energyapp.views.building_view import PDF_SYNC_LIMIT
+from energyapp.views.streaming import acsv_stream, afile_stream, ndjson_lines
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _attachment(response, filename):
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+async def building_export_csv(request):
+    """Wie building_view.building_export_csv (gestreamt, Filter per GET)."""
+    try:
+        buildings = filter_buildings(request.GET)
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
+
+    response = StreamingHttpResponse(acsv_stream(aexport_rows(buildings)), content_type="text/csv")
+    return _attachment(response, "buildings_export.csv")
+
+
+async def _add_xlsx_chunk(export, rows):
+    portfolio_rows = (
+        [row async for row in chunk_portfolio_query(rows)] if export.needs_portfolio else ()
+    )
+    await run_cpu(export.add_chunk, rows, portfolio_rows)
+
+
+async def building_export_xlsx(request):
+    """Wie building_view.building_export_xlsx; Blöcke werden im Thread-Pool geschrieben."""
+    try:
+        buildings = filter_buildings(request.GET)
+        sheets = parse_sheets(request.GET.get("sheets", "buildings"))
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
+
+    export = XlsxExport(sheets)
+    chunk = []
+    async for row in aiterate(buildings.values_list(*export.fields)):
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            await _add_xlsx_chunk(export, chunk)
+            chunk = []
+    if chunk:
+        await _add_xlsx_chunk(export, chunk)
+
+    # bis 16 MB im RAM, danach auf Platte
+    output = SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    await run_cpu(export.save, output)
+    output.seek(0)
+    response = StreamingHttpResponse(afile_stream(output), content_type=XLSX_CONTENT_TYPE)
+    return _attachment(response, "buildings_export.xlsx")
+
+
+async def building_export_pdf(request):
+    """Wie building_view.building_export_pdf (über PDF_SYNC_LIMIT als Hintergrund-Job)."""
+    try:
+        buildings = filter_buildings(request.GET)
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
+
+    if await buildings.acount() > PDF_SYNC_LIMIT:
+        params = {key: request.GET[key] for key in EXPORT_FILTER_PARAMS if request.GET.get(key)}
+        job = await sync_to_async(submit_job)("export_pdf", params)
+        return redirect("job_detail", pk=job.pk)
+
+    rows = [row async for row in buildings.values_list(*BUILDINGS_PDF_FIELDS)]
+    buffer = BytesIO()
+    await run_cpu(write_buildings_pdf_rows, rows, len(rows), buffer)
+    response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
+    return _attachment(response, "buildings_export.pdf")
+
+
+async def building_result_pdf(request, pk):
+    """Wie building_view.building_result_pdf (Datei-Cache, ETag/304)."""
+    values = await Building.objects.filter(pk=pk).values(*REPORT_FIELDS).afirst()
+    if values is None:
+        raise Http404("Gebäude nicht gefunden.")
+
+    digest = report_digest(values)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    fileobj = await run_cpu(open_report, values, digest)
+    response = StreamingHttpResponse(afile_stream(fileobj), content_type="application/pdf")
+    response["Content-Length"] = os.fstat(fileobj.fileno()).st_size
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return _attachment(response, report_filename(values))
+
+
+async def _ndjson_results(records):
+    """Berechnung blockweise im Thread-Pool (auch Lesen/Parsen der Eingabe), NDJSON-Text je Block."""
+    chunks = iter_chunks(records)
+    while (item := await run_cpu(next, chunks, None)) is not None:
+        start, chunk = item
+        yield await run_cpu(lambda: ndjson_lines(calculate_batch(chunk, start)))
+
+
+@csrf_exempt
+@require_POST
+async def batch_calculate(request):
+    """Wie views.batch_calculation.batch_calculate; gerechnet wird im Thread-Pool."""
+    if request.content_type == NDJSON:
+        return StreamingHttpResponse(_ndjson_results(read_ndjson(request)), content_type=NDJSON)
+
+    limit = settings.CALC_API_MAX_BYTES
+    body = request.read(limit + 1)
+    if len(body) > limit:
+        return JsonResponse(
+            {"error": f"Anfrage größer als {limit} Bytes – bitte als {NDJSON} senden"}, status=413
+        )
+    try:
+        payload = await run_cpu(json.loads, body or b"null")
+    except ValueError:
+        return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+
+    if isinstance(payload, dict):
+        result = (await run_cpu(calculate_batch, [payload]))[0]
+        return JsonResponse(result, status=400 if "errors" in result else 200)
+    if not isinstance(payload, list):
+        return JsonResponse({"error": "Erwartet ein Objekt oder eine Liste von Objekten"}, status=400)
+
+    if wants_ndjson(request):
+        return StreamingHttpResponse(_ndjson_results(payload), content_type=NDJSON)
+    return await run_cpu(batch_response, payload)
@@ -0,0 +1,64 @@
+import json
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from energyapp.logic.batch_calculation import calculate_records, read_ndjson
+from energyapp.views.streaming import ndjson_stream
+
+NDJSON = "application/x-ndjson"
+
+
+def wants_ndjson(request):
+    return request.GET.get("format") == "ndjson" or NDJSON in request.headers.get("Accept", "")
+
+
+@csrf_exempt
+@require_POST
+def batch_calculate(request):
+    """
+    Zustandslose Berechnung (JSON, schreibt nichts in die Datenbank).
+
+    POST /api/calculate/ {"length_ns": 12, ...}          -> ein Ergebnis (400 bei Fehlern)
+    POST /api/calculate/ [{...}, {...}, ...]             -> {"count", "error_count", "results"}
+    ?format=ndjson (oder Accept: application/x-ndjson)   -> eine Ergebniszeile je Datensatz, gestreamt
+    Content-Type: application/x-ndjson                   -> Eingabe zeilenweise gelesen (beliebig groß)
+    """
+    if request.content_type == NDJSON:
+        # Eingabe wird erst beim Streamen der Antwort gelesen
+        return StreamingHttpResponse(
+            ndjson_stream(calculate_records(read_ndjson(request))), content_type=NDJSON
+        )
+
+    limit = settings.CALC_API_MAX_BYTES
+    body = request.read(limit + 1)
+    if len(body) > limit:
+        return JsonResponse(
+            {"error": f"Anfrage größer als {limit} Bytes – bitte als {NDJSON} senden"}, status=413
+        )
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError:
+        return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+
+    if isinstance(payload, dict):
+        result = next(calculate_records([payload]))
+        return JsonResponse(result, status=400 if "errors" in result else 200)
+    if not isinstance(payload, list):
+        return JsonResponse({"error": "Erwartet ein Objekt oder eine Liste von Objekten"}, status=400)
+
+    if wants_ndjson(request):
+        return StreamingHttpResponse(ndjson_stream(calculate_records(payload)), content_type=NDJSON)
+    return batch_response(payload)
+
+
+def batch_response(records):
+    """Alle Ergebnisse als ein JSON-Objekt {"count", "error_count", "results"}."""
+    results = list(calculate_records(records))
+    return JsonResponse({
+        "count": len(results),
+        "error_count": sum(1 for result in results if "errors" in result),
+        "results": results,
+    })
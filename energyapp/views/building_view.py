@@ -1,37 +1,70 @@
-import csv
+import re
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response
 from energyapp.forms import BuildingForm,SimpleBuildingForm, EnergyResultSheet01Form
-from energyapp.logic.building import calc_heating_demand
+from energyapp.logic.building import (
+    CALC_STATE_FIELDS,
+    RESULT_FIELDS,
+    apply_heating_result,
+    calc_heating_demand,
+    needs_recalculation,
+)
 from energyapp.models import Building
 
-from openpyxl import Workbook
-from openpyxl.styles import Font
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
 from energyapp.models import EnergyResultSheet01
-from energyapp.logic.result_sheet_01 import calculate_sheet01
+from energyapp.logic.deletion import purge_buildings
+from energyapp.logic.exports import (
+    BUILDING_ORDERS,
+    EXPORT_FILTER_PARAMS,
+    ExportError,
+    export_rows,
+    filter_buildings,
+    parse_sheets,
+    write_xlsx,
+)
+from energyapp.logic.jobs import submit_job
+from energyapp.logic.keyset import decode_cursor, keyset_page
+from energyapp.logic.report_cache import open_report
+from energyapp.logic.reports import (
+    REPORT_FIELDS,
+    report_digest,
+    report_filename,
+    write_buildings_pdf,
+)
+from energyapp.logic.result_sheet_01 import sheet01_buildings
+from energyapp.logic.sheet01_cache import cached_sheet01
+from energyapp.logic.statistics import get_statistics, specific_distribution
+from energyapp.views.streaming import csv_stream
+
+# größere PDF-Exporte laufen als Hintergrund-Job (logic/jobs.py)
+PDF_SYNC_LIMIT = 500
+
+# bis zu so vielen Gebäuden wird "Alle löschen" direkt ausgeführt
+DELETE_SYNC_LIMIT = 20000
+
+BUILDING_LIST_PAGE_SIZE = 50
+BUILDING_LIST_FIELDS = (
+    "id", "name", "result_floor_area", "result_Q_h", "result_Q_PV_on", "result_Q_PV_off",
+)
 
 
 
 
 
 def dashboard(request):
-    building_count = Building.objects.count()
-    last_building = Building.objects.order_by("-id").first()
+    # Kennzahlen aus der Statistik-Zeile (logic/statistics.py), keine Aggregation
+    stats = get_statistics()
     return render(
         request,
         "energyapp/dashboard.html",
         {
-            "building_count": building_count,
-            "last_building": last_building,
+            "stats": stats,
+            "distribution": specific_distribution(stats),
         },
     )
 
@@ -42,37 +75,13 @@ def building_create_detailed(request):
     if request.method == "POST":
         form = BuildingForm(request.POST)
         if form.is_valid():
-            building = form.save()
+            building = form.save(commit=False)
 
             # Berechnung durchführen
             result = calc_heating_demand(building)
-            building.ngf_t = result["ngf_t"]
-
-
-            # Ergebnisse ins Modell schreiben
-            building.result_Q_T = result["Q_T"]
-            building.result_Q_V = result["Q_V"]
-            building.result_Q_I = result["Q_I"]
-            building.result_Q_S = result["Q_S"]
-            building.result_Q_h = result["Q_h"]
-
-            building.result_H_T = result["H_T"]
-            building.result_H_V = result["H_V"]
-
-            building.result_floor_area = result["floor_area"]
-            building.result_roof_area = result["roof_area"]
-            building.result_opaque_wall_area = result["opaque_wall_area"]
-            building.result_window_area = result["window_area"]
-
-            building.result_Q_S_n = result["Q_S_n"]
-            building.result_Q_S_e = result["Q_S_e"]
-            building.result_Q_S_s = result["Q_S_s"]
-            building.result_Q_S_w = result["Q_S_w"]
-
-            building.result_Q_PV_total = result["Q_PV_total"]
-            building.result_Q_PV_on = result["Q_PV_on"]
-            building.result_Q_PV_off = result["Q_PV_off"]
 
+            # Ergebnisse ins Modell schreiben (ein einziges save)
+            apply_heating_result(building, result)
             building.save()
 
             # >>> HIER wird zur Gebäudeliste umgeleitet <<<
@@ -96,37 +105,13 @@ def building_create_simple(request):
     if request.method == "POST":
         form = SimpleBuildingForm(request.POST)
         if form.is_valid():
-            building = form.save()
+            building = form.save(commit=False)
 
             # Berechnung durchführen
             result = calc_heating_demand(building)
-            building.ngf_t = result["ngf_t"]
-
-
-            # Ergebnisse ins Modell schreiben
-            building.result_Q_T = result["Q_T"]
-            building.result_Q_V = result["Q_V"]
-            building.result_Q_I = result["Q_I"]
-            building.result_Q_S = result["Q_S"]
-            building.result_Q_h = result["Q_h"]
-
-            building.result_H_T = result["H_T"]
-            building.result_H_V = result["H_V"]
-
-            building.result_floor_area = result["floor_area"]
-            building.result_roof_area = result["roof_area"]
-            building.result_opaque_wall_area = result["opaque_wall_area"]
-            building.result_window_area = result["window_area"]
-
-            building.result_Q_S_n = result["Q_S_n"]
-            building.result_Q_S_e = result["Q_S_e"]
-            building.result_Q_S_s = result["Q_S_s"]
-            building.result_Q_S_w = result["Q_S_w"]
-
-            building.result_Q_PV_total = result["Q_PV_total"]
-            building.result_Q_PV_on = result["Q_PV_on"]
-            building.result_Q_PV_off = result["Q_PV_off"]
 
+            # Ergebnisse ins Modell schreiben (ein einziges save)
+            apply_heating_result(building, result)
             building.save()
             return redirect("building_list")
     else:
@@ -145,21 +130,22 @@ def building_create_simple(request):
 
 def building_list(request):
     # erlaubte Sortierfelder
-    order = request.GET.get("order", "-id")
-    allowed_orders = {
-        "name": "name",
-        "name_desc": "-name",
-        "area": "result_floor_area",
-        "area_desc": "-result_floor_area",
-        "q_h": "result_Q_h",
-        "q_h_desc": "-result_Q_h",
-        "id": "-id",
-    }
-    order_by = allowed_orders.get(order, "-id")
-
-    buildings = Building.objects.all().order_by(order_by)
+    order = request.GET.get("order", "id")
+    if order not in BUILDING_ORDERS:
+        order = "id"
+
+    # Keyset-Paginierung: Seite ab dem Cursor, nur die angezeigten Spalten
+    page = keyset_page(
+        Building.objects.only(*BUILDING_LIST_FIELDS),
+        order,
+        BUILDING_ORDERS[order],
+        cursor=decode_cursor(request.GET.get("cursor"), order),
+        page_size=BUILDING_LIST_PAGE_SIZE,
+    )
     context = {
-        "buildings": buildings,
+        "buildings": page["object_list"],
+        "next_cursor": page["next_cursor"],
+        "previous_cursor": page["previous_cursor"],
         "current_order": order,
     }
     return render(request, "energyapp/building_list.html", context)
@@ -176,7 +162,11 @@ def building_delete(request, pk):
 
 def building_delete_all(request):
     if request.method == "POST":
-        Building.objects.all().delete()
+        # mengenbasiert (logic/deletion.py); sehr große Bestände als Hintergrund-Job
+        if Building.objects.count() > DELETE_SYNC_LIMIT:
+            job = submit_job("delete_buildings", {"all": True})
+            return redirect("job_detail", pk=job.pk)
+        purge_buildings()
         return redirect("building_list")
     return redirect("building_list")
 
@@ -187,37 +177,18 @@ def building_edit(request, pk):
     if request.method == "POST":
         form = BuildingForm(request.POST, instance=building)
         if form.is_valid():
-            building = form.save()
-
-            # Berechnung erneut durchführen
-            result = calc_heating_demand(building)
-            building.ngf_t = result["ngf_t"]
-
-
-            building.result_Q_T = result["Q_T"]
-            building.result_Q_V = result["Q_V"]
-            building.result_Q_I = result["Q_I"]
-            building.result_Q_S = result["Q_S"]
-            building.result_Q_h = result["Q_h"]
-
-            building.result_H_T = result["H_T"]
-            building.result_H_V = result["H_V"]
-
-            building.result_floor_area = result["floor_area"]
-            building.result_roof_area = result["roof_area"]
-            building.result_opaque_wall_area = result["opaque_wall_area"]
-            building.result_window_area = result["window_area"]
-
-            building.result_Q_S_n = result["Q_S_n"]
-            building.result_Q_S_e = result["Q_S_e"]
-            building.result_Q_S_s = result["Q_S_s"]
-            building.result_Q_S_w = result["Q_S_w"]
-
-            building.result_Q_PV_total = result["Q_PV_total"]
-            building.result_Q_PV_on = result["Q_PV_on"]
-            building.result_Q_PV_off = result["Q_PV_off"]
-
-            building.save()
+            building = form.save(commit=False)
+            changed = form.changed_data
+
+            if needs_recalculation(building):
+                # Eingaben geändert -> neu rechnen, ein UPDATE mit Ergebnissen
+                apply_heating_result(building, calc_heating_demand(building))
+                building.save(update_fields=[
+                    *changed, *RESULT_FIELDS.values(), *CALC_STATE_FIELDS, "updated_at",
+                ])
+            elif changed:
+                # nur kosmetische Änderungen (z.B. Name) -> keine Berechnung
+                building.save(update_fields=[*changed, "updated_at"])
 
             return redirect("building_detail", pk=building.pk)
     else:
@@ -232,196 +203,62 @@ def building_edit(request, pk):
 
 def building_export_csv(request):
     """
-    Export aller Gebäude als CSV.
+    Export aller Gebäude als CSV (gestreamt, konstanter Speicherbedarf).
+    Optionale Filter: ?ids=1,2,3&order=q_h_desc&changed_since=2025-01-31
     """
-    buildings = Building.objects.all().order_by("id")
+    try:
+        buildings = filter_buildings(request.GET)
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
 
-    response = HttpResponse(content_type="text/csv")
+    response = StreamingHttpResponse(csv_stream(export_rows(buildings)), content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="buildings_export.csv"'
-
-    writer = csv.writer(response, delimiter=";")
-
-    # Kopfzeile
-    writer.writerow([
-        "ID",
-        "Name",
-        "Grundfläche [m²]",
-        "Q_h [kWh/a]",
-        "Q_T [kWh/a]",
-        "Q_V [kWh/a]",
-        "Q_I [kWh/a]",
-        "Q_S [kWh/a]",
-        "PV gesamt [kWh/a]",
-        "PV Eigenverbrauch [kWh/a]",
-        "PV Überschuss [kWh/a]",
-    ])
-
-    # Datenzeilen
-    for b in buildings:
-        writer.writerow([
-            b.id,
-            b.name,
-            b.result_floor_area or "",
-            b.result_Q_h or "",
-            b.result_Q_T or "",
-            b.result_Q_V or "",
-            b.result_Q_I or "",
-            b.result_Q_S or "",
-            b.result_Q_PV_total or "",
-            b.result_Q_PV_on or "",
-            b.result_Q_PV_off or "",
-        ])
-
     return response
 
 
 def building_export_xlsx(request):
     """
-    Export aller Gebäude als Excel-Datei (XLSX).
+    Export aller Gebäude als Excel-Datei (XLSX), write-only über eine Temp-Datei.
+    Filter wie beim CSV-Export, zusätzlich ?sheets=buildings,monthly,sheet01,gwp (oder all).
     """
-    buildings = Building.objects.all().order_by("id")
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Gebäude"
-
-    # Kopfzeile
-    headers = [
-        "ID",
-        "Name",
-        "Grundfläche [m²]",
-        "Q_h [kWh/a]",
-        "Q_T [kWh/a]",
-        "Q_V [kWh/a]",
-        "Q_I [kWh/a]",
-        "Q_S [kWh/a]",
-        "PV gesamt [kWh/a]",
-        "PV Eigenverb [kWh/a]",
-        "PV Überschuss [kWh/a]",
-    ]
-    ws.append(headers)
-
-    # Kopfzeile fett machen
-    bold_font = Font(bold=True)
-    for cell in ws[1]:
-        cell.font = bold_font
-
-    # Datenzeilen
-    for b in buildings:
-        ws.append([
-            b.id,
-            b.name,
-            b.result_floor_area or "",
-            b.result_Q_h or "",
-            b.result_Q_T or "",
-            b.result_Q_V or "",
-            b.result_Q_I or "",
-            b.result_Q_S or "",
-            b.result_Q_PV_total or "",
-            b.result_Q_PV_on or "",
-            b.result_Q_PV_off or "",
-        ])
-
-    # In Memory-Stream schreiben
-    output = BytesIO()
-    wb.save(output)
+    try:
+        buildings = filter_buildings(request.GET)
+        sheets = parse_sheets(request.GET.get("sheets", "buildings"))
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
+
+    # bis 16 MB im RAM, danach auf Platte
+    output = SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    write_xlsx(buildings, output, sheets)
     output.seek(0)
 
-    # HTTP-Response
-    response = HttpResponse(
-        output.getvalue(),
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename="buildings_export.xlsx",
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response["Content-Disposition"] = 'attachment; filename="buildings_export.xlsx"'
-    return response
 
 
 def building_export_pdf(request):
     """
     Export aller Gebäude als übersichtliche PDF-Tabelle.
+    Bis PDF_SYNC_LIMIT Gebäude direkt, darüber als Hintergrund-Job
+    (Weiterleitung auf die Job-Seite mit Fortschritt und Download).
+    Filter wie beim CSV-Export.
     """
-    buildings = Building.objects.all().order_by("id")
+    try:
+        buildings = filter_buildings(request.GET)
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
 
-    # PDF in Memory erzeugen
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        leftMargin=20 * mm,
-        rightMargin=20 * mm,
-        topMargin=25 * mm,
-        bottomMargin=20 * mm,
-    )
+    if buildings.count() > PDF_SYNC_LIMIT:
+        params = {key: request.GET[key] for key in EXPORT_FILTER_PARAMS if request.GET.get(key)}
+        job = submit_job("export_pdf", params)
+        return redirect("job_detail", pk=job.pk)
 
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # Titel
-    elements.append(Paragraph("Gebäude-Export – Energiebilanz", styles["Title"]))
-    elements.append(Spacer(1, 8))
-
-    # kleine Zusammenfassung
-    info_text = f"Anzahl Gebäude: {buildings.count()}"
-    elements.append(Paragraph(info_text, styles["Normal"]))
-    elements.append(Spacer(1, 12))
-
-    # Hilfsfunktion für Zahlenformat
-    def fmt(val, decimals=1):
-        if val is None:
-            return "-"
-        return f"{val:.{decimals}f}"
-
-    # Tabellendaten
-    data = [
-        ["ID", "Name", "Grundfl. [m²]", "Q_h [kWh/a]", "PV on [kWh/a]", "PV off [kWh/a]"]
-    ]
-
-    for b in buildings:
-        data.append([
-            str(b.id),
-            b.name,
-            fmt(b.result_floor_area, 1),
-            fmt(b.result_Q_h, 1),
-            fmt(b.result_Q_PV_on, 1),
-            fmt(b.result_Q_PV_off, 1),
-        ])
-
-    # Tabelle mit Styling
-    table = Table(data, repeatRows=1, hAlign="LEFT")
-
-    table.setStyle(TableStyle([
-        # Header
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e9ecef")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, 0), 10),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-        ("TOPPADDING", (0, 0), (-1, 0), 6),
-
-        # Körper
-        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-        ("FONTSIZE", (0, 1), (-1, -1), 9),
-        ("BOTTOMPADDING", (0, 1), (-1, -1), 4),
-        ("TOPPADDING", (0, 1), (-1, -1), 4),
-
-        # Gitterlinien
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-
-        # Ausrichtung: ID + Zahlen rechts, Name links
-        ("ALIGN", (0, 1), (0, -1), "RIGHT"),
-        ("ALIGN", (2, 1), (-1, -1), "RIGHT"),
-
-        # wechselnde Zeilenfarben im Body
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1),
-         [colors.white, colors.HexColor("#f8f9fa")]),
-    ]))
-
-    elements.append(table)
-
-    # PDF aufbauen
-    doc.build(elements)
-
-    # Response zurückgeben
+    buffer = BytesIO()
+    write_buildings_pdf(buildings, buffer)
     buffer.seek(0)
     response = HttpResponse(
         buffer.getvalue(),
@@ -434,113 +271,28 @@ def building_export_pdf(request):
 def building_result_pdf(request, pk):
     """
     PDF-Bericht für EIN Gebäude inkl. Tabelle und einfachem Balkendiagramm.
+    Das PDF kommt aus dem Datei-Cache (logic/report_cache.py); der Hash der
+    Berichtswerte dient als ETag, bei passendem If-None-Match -> 304.
     """
-    building = get_object_or_404(Building, pk=pk)
-
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        leftMargin=20 * mm,
-        rightMargin=20 * mm,
-        topMargin=25 * mm,
-        bottomMargin=20 * mm,
-    )
-
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # Titel
-    title = f"Energiebericht – {building.name}"
-    elements.append(Paragraph(title, styles["Title"]))
-    elements.append(Spacer(1, 10))
-
-    # Kurzinfo
-    info_lines = [
-        f"Gebäude-ID: {building.id}",
-        f"Grundfläche: {building.result_floor_area or '-'} m²",
-        f"Raum-Solltemperatur: {building.setpoint_temp or '-'} °C",
-    ]
-    for line in info_lines:
-        elements.append(Paragraph(line, styles["Normal"]))
-    elements.append(Spacer(1, 12))
-
-    # Hilfsfunktion Zahlenformat
-    def fmt(val, decimals=1):
-        if val is None:
-            return "-"
-        return f"{val:.{decimals}f}"
-
-    # Ergebnis-Tabelle
-    data = [
-        ["Größe", "Wert"],
-        ["Heizwärmebedarf Q_h [kWh/a]", fmt(building.result_Q_h, 1)],
-        ["Transmissionsverluste Q_T [kWh/a]", fmt(building.result_Q_T, 1)],
-        ["Lüftungsverluste Q_V [kWh/a]", fmt(building.result_Q_V, 1)],
-        ["Interne Gewinne Q_I [kWh/a]", fmt(building.result_Q_I, 1)],
-        ["Solare Gewinne Q_S [kWh/a]", fmt(building.result_Q_S, 1)],
-        ["PV-Gesamt [kWh/a]", fmt(building.result_Q_PV_total, 1)],
-        ["PV-Eigenverbrauch [kWh/a]", fmt(building.result_Q_PV_on, 1)],
-        ["PV-Überschuss [kWh/a]", fmt(building.result_Q_PV_off, 1)],
-    ]
-
-    table = Table(data, hAlign="LEFT", colWidths=[70 * mm, 60 * mm])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e9ecef")),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-    ]))
-    elements.append(Paragraph("Ergebnisse – Übersicht", styles["Heading2"]))
-    elements.append(table)
-    elements.append(Spacer(1, 16))
-
-    # Balkendiagramm Energieflüsse
-    elements.append(Paragraph("Energieflüsse (jährlich)", styles["Heading2"]))
-    elements.append(Spacer(1, 4))
-
-    flows = [
-        ("Q_T", building.result_Q_T or 0),
-        ("Q_V", building.result_Q_V or 0),
-        ("Q_I", building.result_Q_I or 0),
-        ("Q_S", building.result_Q_S or 0),
-        ("Q_h", building.result_Q_h or 0),
-    ]
-
-    data_values = [[v for (_, v) in flows]]
-    labels = [lbl for (lbl, _) in flows]
-
-    drawing = Drawing(400, 200)
-    bc = VerticalBarChart()
-    bc.x = 40
-    bc.y = 40
-    bc.height = 120
-    bc.width = 320
-    bc.data = data_values
-    bc.categoryAxis.categoryNames = labels
-    bc.categoryAxis.labels.boxAnchor = "n"
-    bc.valueAxis.valueMin = 0
-    bc.barWidth = 20
-    bc.groupSpacing = 10
-    bc.barSpacing = 5
-    bc.bars[0].fillColor = colors.HexColor("#0d6efd")
-
-    drawing.add(bc)
-    elements.append(drawing)
-
-    # PDF bauen
-    doc.build(elements)
-
-    buffer.seek(0)
-    response = HttpResponse(
-        buffer.getvalue(),
+    values = Building.objects.filter(pk=pk).values(*REPORT_FIELDS).first()
+    if values is None:
+        raise Http404("Gebäude nicht gefunden.")
+
+    digest = report_digest(values)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = FileResponse(
+        open_report(values, digest),
+        as_attachment=True,
+        filename=report_filename(values),
         content_type="application/pdf",
     )
-    response["Content-Disposition"] = (
-        f'attachment; filename="building_{building.id}_bericht.pdf"'
-    )
+    response["ETag"] = etag
+    # immer beim Server nachfragen, dann aber nur 304
+    response["Cache-Control"] = "private, no-cache"
     return response
 
 def internal_gains(request):
@@ -568,12 +320,19 @@ def building_detail(request, pk):
     building = get_object_or_404(Building, pk=pk)
     return render(request, "energyapp/building_detail.html", {"building": building})
 
+def _template_cells(template_name, var="calc"):
+    """Alle `calc.XYZ`-Zellen, die ein Template tatsächlich verwendet."""
+    source = get_template(template_name).template.source
+    return sorted(set(re.findall(rf"\b{var}\.(\w+)", source)))
+
+
 def summary_dashboard(request):
     building_id = request.GET.get("building")
+    # Gebäude samt Blatt 01, Lüftung und GWP in einer Abfrage
     if building_id:
-        building = get_object_or_404(Building, pk=building_id)
+        building = get_object_or_404(sheet01_buildings(), pk=building_id)
     else:
-        building = Building.objects.order_by("-id").first()
+        building = sheet01_buildings().order_by("-id").first()
 
     if not building:
         return render(
@@ -582,8 +341,10 @@ def summary_dashboard(request):
             {"building": None, "sheet": None, "calc": {}, "form": None},
         )
 
-    # Pro Building genau ein Sheet01-Objekt
-    sheet, _ = EnergyResultSheet01.objects.get_or_create(building=building)
+    # Pro Building genau ein Sheet01-Objekt (nur beim ersten Aufruf anlegen)
+    sheet = getattr(building, "sheet01", None)
+    if sheet is None:
+        sheet, _ = EnergyResultSheet01.objects.get_or_create(building=building)
 
     if request.method == "POST":
         form = EnergyResultSheet01Form(request.POST, instance=sheet)
@@ -593,7 +354,10 @@ def summary_dashboard(request):
     else:
         form = EnergyResultSheet01Form(instance=sheet)
 
-    calc = calculate_sheet01(building, sheet)
+    # nur die Zellen, die das Template anzeigt (Ergebnis aus dem Cache, falls aktuell)
+    calc = cached_sheet01(
+        building, sheet, cells=_template_cells("energyapp/summary_dashboard.html")
+    )
 
     return render(
         request,
@@ -35,14 +35,18 @@ def _find_form_field(form, keywords):
 
 
 def gwp_compensation_edit(request, building_id):
-    building = get_object_or_404(Building, pk=building_id)
+    building = get_object_or_404(
+        Building.objects.select_related("gwp_manufacturing", "gwp_compensation"), pk=building_id
+    )
     manufacturing = getattr(building, "gwp_manufacturing", None)
 
     # optional: erst Kompensation erlauben, wenn Herstellung existiert
     if manufacturing is None:
         return redirect("gwp_manufacturing_edit", building_id=building.id)
 
-    instance, _ = GwpCompensation.objects.get_or_create(building=building)
+    instance = getattr(building, "gwp_compensation", None)
+    if instance is None:
+        instance, _ = GwpCompensation.objects.get_or_create(building=building)
 
     # =========================================================
     # 1) AUTO-WERTE aus "anderen Gruppen" holen (robuste Suche)
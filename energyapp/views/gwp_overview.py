@@ -5,7 +5,9 @@ from energyapp.models import Building
 
 
 def gwp_overview(request, building_id):
-    building = get_object_or_404(Building, pk=building_id)
+    building = get_object_or_404(
+        Building.objects.select_related("gwp_manufacturing", "gwp_compensation"), pk=building_id
+    )
 
     manufacturing = getattr(building, "gwp_manufacturing", None)
     compensation = getattr(building, "gwp_compensation", None)
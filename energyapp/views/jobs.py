@@ -0,0 +1,105 @@
+import uuid
+from pathlib import Path
+
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+
+from energyapp.forms import BuildingImportForm
+from energyapp.logic.building_import import REQUIRED_FIELDS
+from energyapp.logic.exports import EXPORT_FILTER_PARAMS, ExportError, filter_buildings, parse_sheets
+from energyapp.logic.jobs import export_root, submit_job
+from energyapp.models import BackgroundJob
+
+# Formular-Wert "format" -> Job-Art
+EXPORT_JOB_KINDS = {
+    "pdf": "export_pdf",
+    "xlsx": "export_xlsx",
+    "csv": "export_csv",
+    "reports": "export_reports",
+}
+
+
+def export_job_submit(request):
+    """
+    Gebäude-Export als Hintergrund-Job einstellen (POST).
+    format=pdf|xlsx|csv|reports (ZIP mit einem Bericht je Gebäude),
+    Filter wie beim CSV-Export, bei xlsx zusätzlich sheets=...
+    """
+    if request.method != "POST":
+        return redirect("building_list")
+
+    kind = EXPORT_JOB_KINDS.get(request.POST.get("format"))
+    if kind is None:
+        return HttpResponse(
+            f"Unbekanntes Format ({', '.join(EXPORT_JOB_KINDS)})", status=400, content_type="text/plain"
+        )
+
+    params = {key: request.POST[key] for key in EXPORT_FILTER_PARAMS if request.POST.get(key)}
+    if kind == "export_xlsx":
+        params["sheets"] = request.POST.get("sheets", "buildings")
+
+    # Eingaben sofort prüfen, nicht erst im Worker
+    try:
+        filter_buildings(params)
+        if "sheets" in params:
+            parse_sheets(params["sheets"])
+    except ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type="text/plain")
+
+    job = submit_job(kind, params)
+    return redirect("job_detail", pk=job.pk)
+
+
+def job_detail(request, pk):
+    """Status eines Jobs; ?format=json für Abfragen per Skript."""
+    job = get_object_or_404(BackgroundJob, pk=pk)
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "progress_done": job.progress_done,
+            "progress_total": job.progress_total,
+            "progress_percent": job.progress_percent,
+            "error": job.error,
+            "download": bool(job.artifact) and job.status == BackgroundJob.STATUS_DONE,
+        })
+
+    return render(request, "energyapp/job_detail.html", {"job": job})
+
+
+def job_download(request, pk):
+    """Ergebnisdatei eines fertigen Jobs herunterladen."""
+    job = get_object_or_404(BackgroundJob, pk=pk, status=BackgroundJob.STATUS_DONE)
+    if not job.artifact:
+        raise Http404("Job hat keine Ergebnisdatei.")
+
+    path = export_root() / job.artifact
+    if not path.is_file():
+        raise Http404("Ergebnisdatei nicht mehr vorhanden.")
+
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=Path(job.artifact).name)
+
+
+def building_import(request):
+    """Upload einer CSV/XLSX-Datei; der Import selbst läuft als Hintergrund-Job."""
+    if request.method == "POST":
+        form = BuildingImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            relative = Path("imports") / f"{uuid.uuid4().hex}{Path(upload.name).suffix.lower()}"
+            target = export_root() / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "wb") as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+
+            job = submit_job("import_buildings", {"path": str(relative), "filename": upload.name})
+            return redirect("job_detail", pk=job.pk)
+    else:
+        form = BuildingImportForm()
+
+    return render(
+        request, "energyapp/building_import.html", {"form": form, "required": REQUIRED_FIELDS}
+    )
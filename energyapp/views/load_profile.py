@@ -93,13 +93,19 @@ def energy_balance_view(request, pk):
         building.save()
         return redirect('energy_balance', pk=pk)
 
-    # Berechnung ausführen
+    # Berechnung ausführen (Monatsbilanz oder Stundenbilanz über 8760 h)
+    mode = request.GET.get('mode', 'monthly')
     calc = EnergyCalculator(building)
-    results = calc.calculate()
+    if mode == 'hourly':
+        results = calc.calculate_hourly()
+    else:
+        mode = 'monthly'
+        results = calc.calculate()
 
     return render(request, 'energyapp/load_profile.html', {
         'project': building,
-        'results': results
+        'results': results,
+        'mode': mode,
     })
 
 
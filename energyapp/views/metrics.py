@@ -0,0 +1,19 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from energyapp.logic.metrics import render
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    """Metriken aller Worker im Prometheus-Textformat (nur mit METRICS_TOKEN)."""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        raise Http404("Metriken sind nicht aktiviert.")
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        return HttpResponseForbidden("Ungültiges Token.")
+    return HttpResponse(render(), content_type=PROMETHEUS_CONTENT_TYPE)
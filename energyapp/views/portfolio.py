@@ -0,0 +1,55 @@
+import numpy as np
+from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+
+from energyapp.logic.portfolio import PORTFOLIO_COLUMNS, evaluate_portfolio, portfolio_rows
+from energyapp.logic.result_sheet_01 import SHEET01_OUTPUT
+from energyapp.views.streaming import csv_stream
+
+PAGE_SIZE = 100
+
+
+def portfolio_sheet01(request):
+    """Portfolio-Tabelle (Endenergie, Strom, Primärenergie, PV-Überschuss) aller Gebäude."""
+    portfolio = evaluate_portfolio()
+
+    sort = request.GET.get("sort", "id")
+    descending = request.GET.get("dir") == "desc"
+    if sort in PORTFOLIO_COLUMNS:
+        order = np.argsort(portfolio["cells"][sort], kind="stable")
+    else:
+        sort = "id"
+        order = np.arange(portfolio["count"])
+    if descending:
+        order = order[::-1]
+
+    page = Paginator(order, PAGE_SIZE).get_page(request.GET.get("page"))
+
+    return render(
+        request,
+        "energyapp/portfolio.html",
+        {
+            "columns": PORTFOLIO_COLUMNS,
+            "rows": list(portfolio_rows(portfolio, page.object_list)),
+            "totals": [round(v, 1) for v in portfolio["totals"].values()],
+            "count": portfolio["count"],
+            "page": page,
+            "sort": sort,
+            "dir": "desc" if descending else "asc",
+        },
+    )
+
+
+def portfolio_sheet01_csv(request):
+    """CSV-Export aller Blatt-01-Zellen für alle Gebäude."""
+    portfolio = evaluate_portfolio()
+    cells = [key for key in SHEET01_OUTPUT if key != "I79"]
+
+    def rows():
+        yield ["ID", "Name"] + cells
+        yield from portfolio_rows(portfolio, columns=cells)
+
+    response = StreamingHttpResponse(csv_stream(rows()), content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="portfolio_sheet01.csv"'
+    return response
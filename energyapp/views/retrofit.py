@@ -0,0 +1,45 @@
+import json
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+
+from energyapp.logic.retrofit import RetrofitError, optimize_retrofit
+from energyapp.models import Building
+
+
+@csrf_exempt
+def building_retrofit(request, pk):
+    """
+    Sanierungs-Optimierer (JSON, schreibt nichts in die Datenbank).
+
+    GET  /buildings/1/retrofit/?target=50           -> Standard-Maßnahmenkatalog
+    POST /buildings/1/retrofit/ {"target": 50, "measures": [...]}
+    """
+    building = get_object_or_404(Building, pk=pk)
+
+    if request.method == "POST":
+        try:
+            payload = json.loads(request.body or b"{}")
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "JSON-Objekt erwartet"}, status=400)
+        target = payload.get("target")
+        measures = payload.get("measures")
+    else:
+        target = request.GET.get("target")
+        measures = None
+
+    try:
+        target = float(target)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "target [kWh/m²a] fehlt oder ist ungültig"}, status=400)
+
+    try:
+        result = optimize_retrofit(building, target, measures)
+    except RetrofitError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    result["building"] = {"id": building.id, "name": building.name}
+    return JsonResponse(result)
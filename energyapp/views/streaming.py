@@ -0,0 +1,54 @@
+import csv
+import json
+
+
+class Echo:
+    """Pseudo-Datei für csv.writer: gibt die geschriebene Zeile direkt zurück."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows, delimiter=";"):
+    """Zeilen als CSV-Text für StreamingHttpResponse."""
+    writer = csv.writer(Echo(), delimiter=delimiter)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(items):
+    """Objekte als NDJSON-Text (eine Zeile je Objekt)."""
+    return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+
+
+def ndjson_stream(items, buffer_size=64 * 1024):
+    """Objekte als NDJSON (eine Zeile je Objekt), in Blöcken von ~buffer_size Zeichen."""
+    buffer, size = [], 0
+    for item in items:
+        line = json.dumps(item, ensure_ascii=False) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+# Async-Varianten für StreamingHttpResponse unter ASGI (views/async_views.py).
+# Synchrone Iteratoren würde Django dort vor dem Senden komplett einlesen.
+
+async def acsv_stream(rows, delimiter=";"):
+    """csv_stream für einen async Iterator von Zeilen."""
+    writer = csv.writer(Echo(), delimiter=delimiter)
+    async for row in rows:
+        yield writer.writerow(row)
+
+
+async def afile_stream(fileobj, block_size=64 * 1024):
+    """Datei blockweise ausgeben und danach schließen (lokale Temp-/Cache-Dateien)."""
+    try:
+        while block := fileobj.read(block_size):
+            yield block
+    finally:
+        fileobj.close()
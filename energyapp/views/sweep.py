@@ -0,0 +1,75 @@
+import json
+from tempfile import SpooledTemporaryFile
+
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from openpyxl import Workbook
+
+from energyapp.logic.jobs import submit_job
+from energyapp.logic.sweep import (
+    SWEEP_FIELDS,
+    SYNC_SWEEP_LIMIT,
+    SweepError,
+    check_grid,
+    parse_grid,
+    run_sweep,
+)
+from energyapp.models import Building
+from energyapp.views.streaming import csv_stream
+
+
+def _json_stream(rows):
+    header = next(rows)
+    yield '{"columns": ' + json.dumps(header) + ', "rows": ['
+    first = True
+    for row in rows:
+        yield ("" if first else ",") + json.dumps(row)
+        first = False
+    yield "]}"
+
+
+def building_sweep(request, pk):
+    """
+    Parameterstudie für ein Gebäude.
+
+    Beispiel: /buildings/1/sweep/?u_window=0.7:1.3:0.1&window_share_s=20:60:10&format=csv
+    Formate: json (Standard), csv, xlsx
+    Über SYNC_SWEEP_LIMIT Varianten als Hintergrund-Job (CSV, Weiterleitung auf die Job-Seite).
+    """
+    building = get_object_or_404(Building, pk=pk)
+    fmt = request.GET.get("format", "json")
+
+    try:
+        grid = parse_grid(request.GET)
+        if check_grid(grid) > SYNC_SWEEP_LIMIT:
+            params = {field: request.GET[field] for field in SWEEP_FIELDS if field in request.GET}
+            job = submit_job("sweep", {"building_id": building.pk, **params})
+            return redirect("job_detail", pk=job.pk)
+        # im Request ohne Prozess-Pool rechnen
+        rows = run_sweep(building, grid, workers=1)
+    except SweepError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    filename = f"building_{building.id}_sweep"
+
+    if fmt == "csv":
+        response = StreamingHttpResponse(csv_stream(rows), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    if fmt == "xlsx":
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Sweep")
+        for row in rows:
+            ws.append(row)
+        output = SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+        wb.save(output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    return StreamingHttpResponse(_json_stream(rows), content_type="application/json")
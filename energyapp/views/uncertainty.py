@@ -0,0 +1,44 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from energyapp.logic.building import HEATING_INPUT_FIELDS
+from energyapp.logic.uncertainty import (
+    DEFAULT_SAMPLES,
+    UncertaintyError,
+    parse_distribution,
+    run_uncertainty,
+)
+from energyapp.models import Building
+
+
+def building_uncertainty(request, pk):
+    """
+    Monte-Carlo-Analyse für ein Gebäude (JSON).
+
+    Beispiel: /buildings/1/uncertainty/?samples=50000&seed=1&u_wall=normal%25:10&degree_days=uniform:2800:3400
+    Ohne Verteilungen werden die Standard-Unsicherheiten verwendet.
+    """
+    building = get_object_or_404(Building, pk=pk)
+    sheet = getattr(building, "sheet01", None)
+
+    try:
+        samples = int(request.GET.get("samples", DEFAULT_SAMPLES))
+        seed = request.GET.get("seed")
+        seed = int(seed) if seed not in (None, "") else None
+        if seed is not None and seed < 0:
+            raise ValueError(seed)  # default_rng akzeptiert nur Seeds >= 0
+    except ValueError:
+        return JsonResponse({"error": "samples/seed müssen ganze Zahlen sein"}, status=400)
+
+    try:
+        distributions = {
+            field: parse_distribution(request.GET[field])
+            for field in HEATING_INPUT_FIELDS
+            if field in request.GET
+        } or None
+        result = run_uncertainty(building, sheet, distributions, samples, seed)
+    except UncertaintyError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    result["building"] = {"id": building.id, "name": building.name}
+    return JsonResponse(result)